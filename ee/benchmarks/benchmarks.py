@@ -1,22 +1,30 @@
 # isort: skip_file
 # Needs to be first to set up django environment
 from .helpers import *
-from datetime import timedelta
+from django.test import override_settings
+from datetime import datetime, timedelta
 from typing import List, Tuple
+from ee.clickhouse.client import sync_execute
 from ee.clickhouse.materialized_columns import backfill_materialized_columns, get_materialized_columns, materialize
+from ee.clickhouse.models.person import create_person, create_person_distinct_id
 from ee.clickhouse.queries.stickiness.clickhouse_stickiness import ClickhouseStickiness
 from ee.clickhouse.queries.funnels.funnel_correlation import FunnelCorrelation
 from ee.clickhouse.queries.funnels import ClickhouseFunnel
+from ee.clickhouse.queries.paths import ClickhousePaths
 from ee.clickhouse.queries.property_values import get_property_values_for_key, get_person_property_values_for_key
+from ee.clickhouse.queries.trends.breakdown import ClickhouseTrendsBreakdown
 from ee.clickhouse.queries.trends.clickhouse_trends import ClickhouseTrends
 from ee.clickhouse.queries.session_recordings.clickhouse_session_recording_list import ClickhouseSessionRecordingList
-from ee.clickhouse.queries.retention.clickhouse_retention import ClickhouseRetention
+from ee.clickhouse.queries.retention.clickhouse_retention import ClickhouseRetention, CohortKey
 from ee.clickhouse.queries.util import get_earliest_timestamp
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
 from posthog.models import Action, ActionStep, Cohort, Team, Organization
+from posthog.models.entity import Entity
 from posthog.models.filters.retention_filter import RetentionFilter
 from posthog.models.filters.session_recordings_filter import SessionRecordingsFilter
 from posthog.models.filters.stickiness_filter import StickinessFilter
 from posthog.models.filters.filter import Filter
+from posthog.models.filters.path_filter import PathFilter
 from posthog.models.property import PropertyName, TableWithProperties
 from posthog.constants import FunnelCorrelationType
 
@@ -32,6 +40,9 @@ DATE_RANGE = {"date_from": "2021-01-01", "date_to": "2021-10-01", "interval": "w
 SHORT_DATE_RANGE = {"date_from": "2021-07-01", "date_to": "2021-10-01", "interval": "week"}
 SESSIONS_DATE_RANGE = {"date_from": "2021-11-17", "date_to": "2021-11-22"}
 
+HEAVY_TAIL_PERSON_COUNT = 5
+HEAVY_TAIL_EVENTS_PER_PERSON = 500_000
+
 
 class QuerySuite:
     timeout = 3000.0  # Timeout for the whole suite
@@ -153,6 +164,25 @@ class QuerySuite:
         filter = Filter(data={"events": [{"id": "$pageview", "math": "dau"}], **DATE_RANGE,})
         ClickhouseTrends().run(filter, self.team)
 
+    @benchmark_clickhouse
+    def track_trends_multiple_entities(self):
+        filter = Filter(
+            data={
+                "events": [
+                    {"id": "$pageview", "math": "dau", "order": 0},
+                    {"id": "$autocapture", "math": "dau", "order": 1},
+                    {
+                        "id": "$pageview",
+                        "math": "dau",
+                        "order": 2,
+                        "properties": [{"key": "$browser", "value": "Chrome"}],
+                    },
+                ],
+                **DATE_RANGE,
+            }
+        )
+        ClickhouseTrends().run(filter, self.team)
+
     @benchmark_clickhouse
     def track_trends_dau_person_property_filter(self):
         filter = Filter(
@@ -284,6 +314,16 @@ class QuerySuite:
         )
         ClickhouseFunnel(filter, self.team).run()
 
+    @benchmark_clickhouse
+    def track_paths(self):
+        filter = PathFilter(data={"insight": "PATHS", **SHORT_DATE_RANGE}, team=self.team)
+        ClickhousePaths(team=self.team, filter=filter).run()
+
+    @benchmark_clickhouse
+    def track_paths_sampled(self):
+        filter = PathFilter(data={"insight": "PATHS", "path_sample_rate": 0.1, **SHORT_DATE_RANGE}, team=self.team)
+        ClickhousePaths(team=self.team, filter=filter).run()
+
     @benchmark_clickhouse
     def track_correlations_by_events(self):
         filter = Filter(
@@ -362,6 +402,21 @@ class QuerySuite:
 
         ClickhouseStickiness().run(filter, self.team)
 
+    @benchmark_clickhouse
+    def track_stickiness_multiple_entities(self):
+        filter = StickinessFilter(
+            data={
+                "insight": "STICKINESS",
+                "events": [{"id": "$pageview", "order": 0}, {"id": "$autocapture", "order": 1}],
+                "shown_as": "Stickiness",
+                "display": "ActionsLineGraph",
+                **DATE_RANGE,
+            },
+            team=self.team,
+        )
+
+        ClickhouseStickiness().run(filter, self.team)
+
     @benchmark_clickhouse
     def track_stickiness_filter_by_person_property(self):
         filter = StickinessFilter(
@@ -655,3 +710,132 @@ class QuerySuite:
             )
             cohort.calculate_people_ch(pending_version=0)
         self.cohort = cohort
+
+
+class HeavyTailPathsSuite:
+    """Paths for a few bot-like persons, kept in a team of their own so they don't skew the other benchmarks."""
+
+    timeout = 3000.0
+    version = "v001"
+
+    team: Team
+
+    @benchmark_clickhouse
+    def track_paths_heavy_tail_capped(self):
+        # The heavy tail persons dominate event counts, capping sessions keeps their arrays bounded
+        filter = PathFilter(data={"insight": "PATHS", **DATE_RANGE}, team=self.team)
+        with override_settings(PATHS_MAX_EVENTS_IN_SESSION=100):
+            ClickhousePaths(team=self.team, filter=filter).run()
+
+    def setup(self):
+        team = Team.objects.filter(name="Heavy tail bots").first()
+        if team is None:
+            organization = Organization.objects.create()
+            team = Team.objects.create(organization=organization, name="Heavy tail bots")
+        self.team = team
+
+        self.create_heavy_tail_persons()
+
+    def create_heavy_tail_persons(self):
+        "A few bot-like persons with an event every few seconds for weeks, each in one very long session"
+        distinct_ids = [f"heavy_tail_{index}" for index in range(HEAVY_TAIL_PERSON_COUNT)]
+        existing_distinct_ids = {
+            distinct_id
+            for distinct_id, in sync_execute(
+                "SELECT DISTINCT distinct_id FROM events WHERE team_id = %(team_id)s AND distinct_id IN %(distinct_ids)s",
+                {"team_id": self.team.pk, "distinct_ids": distinct_ids},
+            )
+        }
+
+        for distinct_id in distinct_ids:
+            if distinct_id in existing_distinct_ids:
+                continue
+
+            person_id = create_person(team_id=self.team.pk, properties={"email": f"{distinct_id}@bots.com"})
+            create_person_distinct_id(team_id=self.team.pk, distinct_id=distinct_id, person_id=person_id)
+            sync_execute(
+                f"""
+                INSERT INTO {EVENTS_DATA_TABLE()} (uuid, event, properties, timestamp, team_id, distinct_id, elements_chain, created_at, _timestamp, _offset)
+                SELECT
+                    generateUUIDv4(),
+                    '$pageview',
+                    concat('{{"$current_url": "https://app.posthog.com/page/', toString(modulo(number, 50)), '"}}'),
+                    toDateTime64('2021-03-01 00:00:00', 6, 'UTC') + number * 5,
+                    %(team_id)s,
+                    %(distinct_id)s,
+                    '',
+                    now(),
+                    now(),
+                    0
+                FROM numbers(%(event_count)s)
+                """,
+                {"team_id": self.team.pk, "distinct_id": distinct_id, "event_count": HEAVY_TAIL_EVENTS_PER_PERSON},
+            )
+
+
+class ResponseFormattingSuite:
+    """Python-side cost of turning clickhouse results into API responses, measured without hitting clickhouse."""
+
+    version = "v001"
+
+    def setup(self):
+        self.team = Team(id=2)
+        self.filter = Filter(
+            data={
+                "events": [{"id": "$pageview"}],
+                "breakdown": "$browser",
+                "date_from": "2021-01-01",
+                "date_to": "2021-12-31",
+                "interval": "day",
+            }
+        )
+        self.entity = Entity({"id": "$pageview", "type": "events"})
+
+        dates = [datetime(2021, 1, 1) + timedelta(days=day) for day in range(365)]
+        self.breakdown_result = [
+            (dates, [(day * index) % 1000 for day in range(365)], f"value {index}") for index in range(25)
+        ]
+
+        self.retention_filter = RetentionFilter(
+            data={
+                "target_event": {"id": "$pageview"},
+                "returning_event": {"id": "$pageview"},
+                "total_intervals": 90,
+                "period": "Day",
+                "date_to": "2021-10-01",
+            }
+        )
+        self.retention_result = {
+            CohortKey((first_day,), day): {"count": day, "people": [], "people_url": ""}
+            for first_day in range(90)
+            for day in range(90 - first_day)
+        }
+
+        self.funnel_filter = Filter(
+            data={
+                "insight": "FUNNELS",
+                "display": "ActionsLineGraph",
+                "events": [{"id": "$pageview", "order": 0}, {"id": "$pageview", "order": 1}],
+                "funnel_window_interval": 7,
+                "funnel_window_interval_unit": "day",
+                "date_from": "2021-01-01",
+                "date_to": "2021-12-31",
+                "interval": "day",
+            }
+        )
+
+    def time_trends_breakdown_formatting(self):
+        breakdown = ClickhouseTrendsBreakdown(self.entity, self.filter, self.team)
+        parsed = breakdown._parse_trend_result(self.filter, self.entity)(self.breakdown_result)
+        ClickhouseTrends()._format_serialized(self.entity, parsed)
+
+    def time_retention_table_formatting(self):
+        ClickhouseRetention().process_table_result(self.retention_result, self.retention_filter)
+
+    def time_funnel_trends_period_filters(self):
+        # Per-period people filters are derived from the insight filter, which is read in between
+        for date in self.breakdown_result[0][0]:
+            period_filter = self.funnel_filter.with_data({"entrance_period_start": date.isoformat(), "drop_off": False})
+            period_filter.to_params()
+            self.funnel_filter.funnel_window_interval
+            self.funnel_filter.entities
@@ -90,7 +90,10 @@ if PRIMARY_DB != AnalyticsDBMS.CLICKHOUSE:
     def async_execute(query, args=None, settings=None, with_column_types=False):
         raise ClickHouseNotConfigured()
 
-    def sync_execute(query, args=None, settings=None, with_column_types=False):
+    def sync_execute(query, args=None, settings=None, with_column_types=False, query_id=None):
+        raise ClickHouseNotConfigured()
+
+    def sync_execute_iter(query, args=None, settings=None):
         raise ClickHouseNotConfigured()
 
     def cache_sync_execute(query, args=None, redis_client=None, ttl=None, settings=None, with_column_types=False):
@@ -149,7 +152,7 @@ else:
             redis_client.set(key, _serialize(result), ex=ttl)
             return result
 
-    def sync_execute(query, args=None, settings=None, with_column_types=False):
+    def sync_execute(query, args=None, settings=None, with_column_types=False, query_id=None):
         with ch_pool.get_client() as client:
             start_time = perf_counter()
 
@@ -159,7 +162,11 @@ else:
 
             try:
                 result = client.execute(
-                    prepared_sql, params=prepared_args, settings=settings, with_column_types=with_column_types
+                    prepared_sql,
+                    params=prepared_args,
+                    settings=settings,
+                    with_column_types=with_column_types,
+                    query_id=query_id,
                 )
             except Exception as err:
                 err = wrap_query_error(err)
@@ -180,6 +187,34 @@ else:
                     save_query(prepared_sql, execution_time)
         return result
 
+    def sync_execute_iter(query, args=None, settings=None):
+        """
+        Like `sync_execute`, but yields rows as ClickHouse streams them back block by block (see `max_block_size`)
+        instead of materialising the whole result. The pooled connection is held until the iterator is exhausted.
+        """
+        with ch_pool.get_client() as client:
+            start_time = perf_counter()
+
+            prepared_sql, prepared_args, tags = _prepare_query(client=client, query=query, args=args)
+
+            try:
+                yield from client.execute_iter(prepared_sql, params=prepared_args, settings=settings)
+            except GeneratorExit:
+                # The consumer stopped early (e.g. the client went away mid download). The connection still has
+                # unread blocks on it, so drop it rather than handing it back to the pool in that state.
+                client.disconnect()
+                raise
+            except Exception as err:
+                err = wrap_query_error(err)
+                tags["failed"] = True
+                tags["reason"] = type(err).__name__
+                incr("clickhouse_sync_execution_failure", tags=tags)
+
+                raise err
+            finally:
+                execution_time = perf_counter() - start_time
+                timing("clickhouse_sync_execution_time", execution_time * 1000.0, tags=tags)
+
     def substitute_params(query, params):
         """
         Helper method to ease rendering of sql clickhouse queries progressively.
@@ -0,0 +1,86 @@
+import threading
+from concurrent.futures import FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
+from uuid import uuid4
+
+import structlog
+from django.conf import settings
+from sentry_sdk.api import capture_exception
+
+from ee.clickhouse import client
+from posthog.exceptions import QueryDeadlineExceeded
+from posthog.internal_metrics import incr
+
+logger = structlog.get_logger(__name__)
+
+Query = Tuple[str, Dict[str, Any]]
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_query_executor() -> ThreadPoolExecutor:
+    "Returns the process wide pool queries are fanned out on, see CLICKHOUSE_QUERY_EXECUTOR_WORKERS"
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.CLICKHOUSE_QUERY_EXECUTOR_WORKERS, thread_name_prefix="clickhouse-query"
+            )
+        return _executor
+
+
+def execute_concurrently(
+    queries: Sequence[Query], deadline_seconds: Optional[float] = None, query_settings: Optional[Dict] = None,
+) -> List[Any]:
+    """
+    Runs `queries` on the shared query executor and returns their results in the same order.
+
+    If a query fails, the deadline passes or the calling thread is interrupted (e.g. the worker serving a request is
+    aborted after the client went away), queries still running are killed so ClickHouse doesn't finish them for nobody.
+
+    Queries run one after another in tests, so captured queries (and snapshots) stay in a stable order.
+    """
+    if settings.TEST:
+        return [client.sync_execute(query, params, settings=query_settings) for query, params in queries]
+
+    if deadline_seconds is None:
+        deadline_seconds = settings.CLICKHOUSE_QUERY_DEADLINE_SECONDS
+
+    executor = get_query_executor()
+    query_ids = [str(uuid4()) for _ in queries]
+    futures = [
+        executor.submit(client.sync_execute, query, params, settings=query_settings, query_id=query_id)
+        for (query, params), query_id in zip(queries, query_ids)
+    ]
+
+    try:
+        _, pending = wait(futures, timeout=deadline_seconds, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            if future.done() and future.exception() is not None:
+                raise cast(BaseException, future.exception())
+        if pending:
+            incr("clickhouse_query_deadline_exceeded")
+            raise QueryDeadlineExceeded()
+        return [future.result() for future in futures]
+    except BaseException:
+        _cancel_queries(futures, query_ids)
+        raise
+
+
+def _cancel_queries(futures: List[Future], query_ids: List[str]) -> None:
+    # Queries which haven't been picked up by a worker yet can just be dropped, the rest need killing in ClickHouse
+    running_query_ids = [
+        query_id for future, query_id in zip(futures, query_ids) if not future.cancel() and not future.done()
+    ]
+    if not running_query_ids:
+        return
+
+    try:
+        client.sync_execute(
+            f"KILL QUERY ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}' WHERE query_id IN %(query_ids)s ASYNC",
+            {"query_ids": running_query_ids},
+        )
+    except Exception as err:
+        logger.warn("Failed to kill clickhouse queries", query_ids=running_query_ids, err=err)
+        capture_exception(err)
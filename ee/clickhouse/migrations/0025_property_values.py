@@ -0,0 +1,29 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.property_values import (
+    COMMENT_PROPERTY_VALUES_COLUMN_SQL,
+    EVENT_PROPERTY_VALUES_MV_SQL,
+    PERSON_PROPERTY_VALUES_MV_SQL,
+    PERSON_PROPERTY_VALUES_TABLE_SQL,
+    PROPERTY_VALUES_TABLE_SQL,
+)
+
+
+# Events and persons ingested before the materialized views existed are backfilled by the 0005_fill_property_values
+# async migration. On fresh installs there's nothing to backfill, so it's skipped.
+def skip_backfill_if_empty(database):
+    if (
+        len(sync_execute("SELECT 1 FROM events LIMIT 1")) == 0
+        and len(sync_execute("SELECT 1 FROM person LIMIT 1")) == 0
+    ):
+        sync_execute(COMMENT_PROPERTY_VALUES_COLUMN_SQL())
+
+
+operations = [
+    migrations.RunSQL(PROPERTY_VALUES_TABLE_SQL()),
+    migrations.RunSQL(EVENT_PROPERTY_VALUES_MV_SQL()),
+    migrations.RunSQL(PERSON_PROPERTY_VALUES_TABLE_SQL()),
+    migrations.RunSQL(PERSON_PROPERTY_VALUES_MV_SQL()),
+    migrations.RunPython(skip_backfill_if_empty),
+]
@@ -0,0 +1,23 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.session_recording_events import (
+    COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL,
+    SESSION_RECORDING_SUMMARIES_MV_SQL,
+    SESSION_RECORDING_SUMMARIES_TABLE_SQL,
+)
+
+
+# Recordings ingested before the materialized view existed are backfilled by the
+# 0007_fill_session_recording_summaries async migration, and the summaries aren't read until that has completed. On
+# fresh installs there's nothing to backfill, so it's skipped.
+def skip_backfill_if_empty(database):
+    if len(sync_execute("SELECT 1 FROM session_recording_events LIMIT 1")) == 0:
+        sync_execute(COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL())
+
+
+operations = [
+    migrations.RunSQL(SESSION_RECORDING_SUMMARIES_TABLE_SQL()),
+    migrations.RunSQL(SESSION_RECORDING_SUMMARIES_MV_SQL()),
+    migrations.RunPython(skip_backfill_if_empty),
+]
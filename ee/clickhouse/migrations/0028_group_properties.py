@@ -0,0 +1,23 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.groups import (
+    COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL,
+    GROUP_PROPERTY_VALUES_MV_SQL,
+    GROUP_PROPERTY_VALUES_TABLE_SQL,
+)
+
+
+# Groups upserted before the materialized view existed are counted by the 0009_fill_group_property_values async
+# migration, and the counts aren't read until that has completed. On fresh installs there's nothing to backfill, so
+# it's skipped.
+def skip_backfill_if_empty(database):
+    if len(sync_execute("SELECT 1 FROM groups LIMIT 1")) == 0:
+        sync_execute(COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL())
+
+
+operations = [
+    migrations.RunSQL(GROUP_PROPERTY_VALUES_TABLE_SQL()),
+    migrations.RunSQL(GROUP_PROPERTY_VALUES_MV_SQL()),
+    migrations.RunPython(skip_backfill_if_empty),
+]
@@ -0,0 +1,18 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.person import COMMENT_PERSONS_LATEST_COLUMN_SQL, PERSONS_LATEST_MV_SQL, PERSONS_LATEST_TABLE_SQL
+
+
+# Persons written before the materialized view existed are backfilled by the 0010_fill_person_latest async migration,
+# and person_latest isn't read until that has completed. On fresh installs there's nothing to backfill, so it's skipped.
+def skip_backfill_if_empty(database):
+    if len(sync_execute("SELECT 1 FROM person LIMIT 1")) == 0:
+        sync_execute(COMMENT_PERSONS_LATEST_COLUMN_SQL())
+
+
+operations = [
+    migrations.RunSQL(PERSONS_LATEST_TABLE_SQL()),
+    migrations.RunSQL(PERSONS_LATEST_MV_SQL()),
+    migrations.RunPython(skip_backfill_if_empty),
+]
@@ -0,0 +1,5 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.sql.paths.path import PERSON_PATHS_TABLE_SQL
+
+operations = [migrations.RunSQL(PERSON_PATHS_TABLE_SQL())]
@@ -0,0 +1,10 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.sql.paths.path import PERSON_PATHS_DATA_TABLE
+from posthog.settings import CLICKHOUSE_CLUSTER
+
+operations = [
+    migrations.RunSQL(
+        f"ALTER TABLE {PERSON_PATHS_DATA_TABLE()} ON CLUSTER '{CLICKHOUSE_CLUSTER}' ADD COLUMN IF NOT EXISTS truncated UInt8 AFTER timings"
+    ),
+]
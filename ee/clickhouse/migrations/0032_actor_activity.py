@@ -0,0 +1,22 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.actor_activity import (
+    ACTOR_ACTIVITY_MV_SQL,
+    ACTOR_ACTIVITY_TABLE_SQL,
+    COMMENT_ACTOR_ACTIVITY_COLUMN_SQL,
+)
+
+
+# Events ingested before the materialized view existed are backfilled by the 0006_fill_actor_activity async migration,
+# and the rollup isn't read until that has completed. On fresh installs there's nothing to backfill, so it's skipped.
+def skip_backfill_if_empty(database):
+    if len(sync_execute("SELECT 1 FROM events LIMIT 1")) == 0:
+        sync_execute(COMMENT_ACTOR_ACTIVITY_COLUMN_SQL())
+
+
+operations = [
+    migrations.RunSQL(ACTOR_ACTIVITY_TABLE_SQL()),
+    migrations.RunSQL(ACTOR_ACTIVITY_MV_SQL()),
+    migrations.RunPython(skip_backfill_if_empty),
+]
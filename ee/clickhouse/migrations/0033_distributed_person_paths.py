@@ -0,0 +1,14 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.sql.paths.path import DISTRIBUTED_PERSON_PATHS_TABLE_SQL, PERSON_PATHS_TABLE, PERSON_PATHS_TABLE_SQL
+from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_REPLICATION
+
+operations = []
+
+# person_paths only holds short-lived fills, so the replicated table is dropped rather than migrated
+if CLICKHOUSE_REPLICATION:
+    operations = [
+        migrations.RunSQL(f"DROP TABLE IF EXISTS {PERSON_PATHS_TABLE} ON CLUSTER '{CLICKHOUSE_CLUSTER}'"),
+        migrations.RunSQL(PERSON_PATHS_TABLE_SQL()),
+        migrations.RunSQL(DISTRIBUTED_PERSON_PATHS_TABLE_SQL()),
+    ]
@@ -0,0 +1,23 @@
+from infi.clickhouse_orm import migrations
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.events import (
+    COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL,
+    EARLIEST_TIMESTAMPS_MV_SQL,
+    EARLIEST_TIMESTAMPS_TABLE_SQL,
+)
+
+
+# Events ingested before the materialized view existed are backfilled by the 0011_fill_earliest_timestamps async
+# migration, and the earliest timestamps aren't read until that has completed. On fresh installs there's nothing to
+# backfill, so it's skipped.
+def skip_backfill_if_empty(database):
+    if len(sync_execute("SELECT 1 FROM events LIMIT 1")) == 0:
+        sync_execute(COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL())
+
+
+operations = [
+    migrations.RunSQL(EARLIEST_TIMESTAMPS_TABLE_SQL()),
+    migrations.RunSQL(EARLIEST_TIMESTAMPS_MV_SQL()),
+    migrations.RunPython(skip_backfill_if_empty),
+]
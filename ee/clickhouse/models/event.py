@@ -140,22 +140,35 @@ class ClickhouseEventSerializer(serializers.Serializer):
         return event[6]
 
 
-def determine_event_conditions(
-    team: Team, conditions: Dict[str, Union[str, List[str]]], long_date_from: bool
-) -> Tuple[str, Dict]:
+def determine_event_conditions(team: Team, conditions: Dict[str, Union[str, List[str]]]) -> Tuple[str, Dict]:
     result = ""
     params: Dict[str, Union[str, List[str]]] = {}
     for idx, (k, v) in enumerate(conditions.items()):
         if not isinstance(v, str):
             continue
-        if k == "after" and not long_date_from:
+        if k == "after":
             timestamp = isoparse(v).strftime("%Y-%m-%d %H:%M:%S.%f")
-            result += "AND timestamp > %(after)s"
-            params.update({"after": timestamp})
+            if isinstance(conditions.get("after_uuid"), str):
+                # Keyset cursor: the plain timestamp bound keeps the primary key usable, the tuple breaks ties
+                result += (
+                    "AND timestamp >= %(after)s "
+                    "AND (timestamp, uuid) > (toDateTime64(%(after)s, 6, 'UTC'), toUUID(%(after_uuid)s))"
+                )
+                params.update({"after": timestamp, "after_uuid": conditions["after_uuid"]})
+            else:
+                result += "AND timestamp > %(after)s"
+                params.update({"after": timestamp})
         elif k == "before":
             timestamp = isoparse(v).strftime("%Y-%m-%d %H:%M:%S.%f")
-            result += "AND timestamp < %(before)s"
-            params.update({"before": timestamp})
+            if isinstance(conditions.get("before_uuid"), str):
+                result += (
+                    "AND timestamp <= %(before)s "
+                    "AND (timestamp, uuid) < (toDateTime64(%(before)s, 6, 'UTC'), toUUID(%(before_uuid)s))"
+                )
+                params.update({"before": timestamp, "before_uuid": conditions["before_uuid"]})
+            else:
+                result += "AND timestamp < %(before)s"
+                params.update({"before": timestamp})
         elif k == "person_id":
             result += """AND distinct_id IN (%(distinct_ids)s)"""
             person = Person.objects.filter(pk=v, team_id=team.pk).first()
@@ -10,6 +10,10 @@ from django.utils.timezone import now
 from rest_framework import serializers
 
 from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.events import (
+    DELETE_TEAM_EARLIEST_TIMESTAMP_SQL,
+    INSERT_TEAM_EARLIEST_TIMESTAMP_WITHOUT_PERSON_SQL,
+)
 from ee.clickhouse.sql.person import (
     DELETE_PERSON_BY_ID,
     DELETE_PERSON_EVENTS_BY_ID,
@@ -116,6 +120,8 @@ def delete_person(
     try:
         if delete_events:
             sync_execute(DELETE_PERSON_EVENTS_BY_ID, {"id": person_id, "team_id": team_id})
+            sync_execute(DELETE_TEAM_EARLIEST_TIMESTAMP_SQL, {"team_id": team_id})
+            sync_execute(INSERT_TEAM_EARLIEST_TIMESTAMP_WITHOUT_PERSON_SQL, {"id": person_id, "team_id": team_id})
     except:
         pass  # cannot delete if the table is distributed
 
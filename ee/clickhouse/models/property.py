@@ -163,7 +163,10 @@ def parse_prop_clauses(
                     )
                     params = {**params, **cohort_filter_params}
                     final.append(f"{property_operator} {person_id_query}")
-        elif prop.type == "person" and person_properties_mode != PersonPropertiesMode.DIRECT:
+        elif prop.type == "person" and person_properties_mode not in (
+            PersonPropertiesMode.DIRECT,
+            PersonPropertiesMode.DIRECT_ON_LATEST,
+        ):
             # :TODO: Clean this up by using ClickhousePersonQuery over GET_DISTINCT_IDS_BY_PROPERTY_SQL to have access
             #   to materialized columns
             # :TODO: (performance) Avoid subqueries whenever possible, use joins instead
@@ -192,16 +195,22 @@ def parse_prop_clauses(
                     )
                 )
                 params.update(filter_params)
-        elif prop.type == "person" and person_properties_mode == PersonPropertiesMode.DIRECT:
+        elif prop.type == "person":
             # this setting is used to generate the ClickhousePersonQuery SQL.
             # When using direct mode, there should only be person properties in the entire
             # property group
+            # :TRICKY: person_latest has no materialized columns, and holds argMax states rather than versions
+            on_latest = person_properties_mode == PersonPropertiesMode.DIRECT_ON_LATEST
             filter_query, filter_params = prop_filter_json_extract(
                 prop,
                 idx,
                 prepend=f"personquery_{prepend}",
-                allow_denormalized_props=True,
-                transform_expression=lambda column_name: f"argMax(person.{column_name}, _timestamp)",
+                allow_denormalized_props=not on_latest,
+                transform_expression=(
+                    (lambda column_name: f"argMaxMerge(person.{column_name})")
+                    if on_latest
+                    else (lambda column_name: f"argMax(person.{column_name}, _timestamp)")
+                ),
                 property_operator=property_operator,
             )
             final.append(filter_query)
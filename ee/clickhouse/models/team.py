@@ -3,7 +3,11 @@ from typing import List
 import structlog
 
 from ee.clickhouse.client import sync_execute
-from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+from ee.clickhouse.sql.actor_activity import ACTOR_ACTIVITY_TABLE
+from ee.clickhouse.sql.events import EARLIEST_TIMESTAMPS_TABLE, EVENTS_DATA_TABLE
+from ee.clickhouse.sql.groups import GROUP_PROPERTY_VALUES_TABLE
+from ee.clickhouse.sql.person import PERSONS_LATEST_TABLE
+from ee.clickhouse.sql.property_values import PERSON_PROPERTY_VALUES_TABLE, PROPERTY_VALUES_TABLE
 from posthog.settings import CLICKHOUSE_CLUSTER
 
 logger = structlog.get_logger(__name__)
@@ -12,11 +16,18 @@ logger = structlog.get_logger(__name__)
 TABLES_TO_DELETE_FROM = lambda: [
     EVENTS_DATA_TABLE(),
     "person",
+    PERSONS_LATEST_TABLE,
     "person_distinct_id",
     "person_distinct_id2",
     "groups",
     "cohortpeople",
     "person_static_cohort",
+    # Rollups of the above
+    PROPERTY_VALUES_TABLE,
+    PERSON_PROPERTY_VALUES_TABLE,
+    GROUP_PROPERTY_VALUES_TABLE,
+    ACTOR_ACTIVITY_TABLE,
+    EARLIEST_TIMESTAMPS_TABLE,
 ]
 
 
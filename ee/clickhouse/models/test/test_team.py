@@ -39,6 +39,8 @@ class TestDeleteEvents(ClickhouseTestMixin, ClickhouseDestroyTablesMixin, BaseTe
         delete_teams_data([self.teams[0].pk, self.teams[1].pk])
 
         self.assertEqual(self.select_remaining("person", "properties"), ['{"x": 2}'])
+        self.assertEqual(self.select_remaining("person_latest", "id"), [UUID(uuid2)])
+        self.assertEqual(self.select_remaining("person_property_values", "property_value"), ["2"])
         self.assertEqual(self.select_remaining("person_distinct_id", "distinct_id"), ["2"])
 
     def test_delete_groups(self):
@@ -50,6 +52,17 @@ class TestDeleteEvents(ClickhouseTestMixin, ClickhouseDestroyTablesMixin, BaseTe
 
         self.assertEqual(self.select_remaining("groups", "group_key"), ["g2"])
 
+    def test_delete_rollups(self):
+        for index, team in enumerate(self.teams):
+            create_event(uuid4(), "event", team, str(index), properties={"x": index})
+            create_group(team.pk, 0, f"g{index}", properties={"x": index})
+
+        delete_teams_data([self.teams[0].pk, self.teams[1].pk])
+
+        self.assertEqual(self.select_remaining("property_values", "property_value"), ["2"])
+        self.assertEqual(self.select_remaining("actor_activity", "distinct_id"), ["2"])
+        self.assertEqual(self.select_remaining("group_property_values", "property_value"), ["2"])
+
     def test_delete_cohorts(self):
         insert_static_cohort([uuid4()], 0, self.teams[0])
         insert_static_cohort([uuid4()], 1, self.teams[1])
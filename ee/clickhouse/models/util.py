@@ -12,6 +12,8 @@ class PersonPropertiesMode(Enum):
     USING_PERSON_PROPERTIES_COLUMN = auto()
     # Used for generating query on Person table
     DIRECT = auto()
+    # Used for generating query on the pre-collapsed person_latest table
+    DIRECT_ON_LATEST = auto()
 
 
 def is_json(val):
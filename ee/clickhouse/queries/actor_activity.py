@@ -0,0 +1,74 @@
+from datetime import timedelta
+from typing import Optional, Union
+
+from django.conf import settings
+
+from ee.clickhouse.materialized_columns.util import cache_for
+from ee.clickhouse.sql.actor_activity import ACTOR_ACTIVITY_EVENTS_SQL
+from posthog.constants import TREND_FILTER_TYPE_EVENTS
+from posthog.models.async_migration import is_async_migration_complete
+from posthog.models.entity import Entity
+from posthog.models.filters import Filter
+from posthog.models.filters.retention_filter import RetentionFilter
+from posthog.models.filters.stickiness_filter import StickinessFilter
+from posthog.settings import BENCHMARK, TEST
+
+# The rollup only holds all events once 0006_fill_actor_activity has backfilled it
+actor_activity_ready = TEST or BENCHMARK
+
+
+def can_use_actor_activity(
+    filter: Union[Filter, RetentionFilter, StickinessFilter], entity: Entity, interval: Optional[str]
+) -> bool:
+    """
+    Whether `events` can be swapped for the `actor_activity` rollup: the query needs to count persons (or distinct ids)
+    doing a plain event per day or coarser period, without any property filters or breakdowns.
+    """
+    if not settings.ACTOR_ACTIVITY_ROLLUP_ENABLED or not _is_actor_activity_ready():
+        return False
+
+    # Rollup rows don't hold the time of day of all events, so date ranges need to start at midnight
+    if not interval or interval.lower() == "hour" or getattr(filter, "_date_from", None) in ("-24h", "-48h"):
+        return False
+
+    if entity.type != TREND_FILTER_TYPE_EVENTS or entity.property_groups.flat:
+        return False
+
+    if entity.math_group_type_index is not None or getattr(filter, "aggregation_group_type_index", None) is not None:
+        return False
+
+    return not filter.property_groups.flat and not getattr(filter, "breakdowns", None)
+
+
+def get_actor_activity_query(
+    event_param: str, date_from: Optional[str] = None, date_to: Optional[str] = None, *, multiple_events: bool = False
+) -> str:
+    """
+    Subquery with the `team_id`, `event`, `distinct_id` and `timestamp` columns of events, one row per actor and day.
+    With `multiple_events`, `event_param` names a tuple of events rather than a single one.
+
+    `date_from` and `date_to` are DateTime SQL expressions bounding the (inclusive) range of days to read. The query
+    this is used in still needs to filter on `timestamp` itself.
+    """
+    event_filter = f"AND event IN %({event_param})s" if multiple_events else f"AND event = %({event_param})s"
+
+    date_filter = ""
+    if date_from:
+        date_filter += f"AND day >= toDate({date_from})\n"
+    if date_to:
+        date_filter += f"AND day <= toDate({date_to})\n"
+
+    return ACTOR_ACTIVITY_EVENTS_SQL.format(event_filter=event_filter, date_filter=date_filter)
+
+
+def _is_actor_activity_ready() -> bool:
+    global actor_activity_ready
+
+    actor_activity_ready = actor_activity_ready or _fetch_actor_activity_ready_cached()
+    return actor_activity_ready
+
+
+# :TRICKY: Like with person_distinct_id2, negative responses are cached for a minute and a positive one forever.
+@cache_for(timedelta(minutes=1))
+def _fetch_actor_activity_ready_cached() -> bool:
+    return is_async_migration_complete("0006_fill_actor_activity")
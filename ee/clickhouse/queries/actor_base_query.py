@@ -1,3 +1,4 @@
+import json
 import uuid
 from datetime import datetime
 from typing import (
@@ -13,16 +14,25 @@ from typing import (
     cast,
 )
 
+import pytz
 from django.db.models.query import QuerySet
 
-from ee.clickhouse.client import sync_execute
+from ee.clickhouse.client import substitute_params, sync_execute
+from ee.clickhouse.queries.person_query import is_person_latest_ready
+from ee.clickhouse.queries.session_recordings.summaries import is_session_recording_summaries_ready
+from ee.clickhouse.sql.person import (
+    GET_ACTORS_WITH_PERSONS_SQL,
+    PERSONS_FIELDS_SQL,
+    PERSONS_LATEST_FIELDS_SQL,
+    PERSONS_LATEST_TABLE,
+)
 from posthog.constants import INSIGHT_FUNNELS, INSIGHT_PATHS, INSIGHT_TRENDS
 from posthog.models import Entity, Filter, Team
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.filters.retention_filter import RetentionFilter
 from posthog.models.filters.stickiness_filter import StickinessFilter
 from posthog.models.group import Group
-from posthog.models.person import Person
+from posthog.models.person import get_person_display_name
 
 
 class EventInfoForRecording(TypedDict):
@@ -89,11 +99,10 @@ class ActorBaseQuery:
 
     def get_actors(
         self,
-    ) -> Tuple[Union[QuerySet[Person], QuerySet[Group]], Union[List[SerializedGroup], List[SerializedPerson]]]:
+    ) -> Tuple[Union[List[uuid.UUID], QuerySet[Group]], Union[List[SerializedGroup], List[SerializedPerson]]]:
         """ Get actors in data model and dict formats. Builds query and executes """
         query, params = self.actor_query()
-        raw_result = sync_execute(query, params)
-        actors, serialized_actors = self.get_actors_from_result(raw_result)
+        raw_result, actors, serialized_actors = self.query_actors(query, params)
 
         if hasattr(self._filter, "include_recordings") and self._filter.include_recordings and self._filter.insight in [INSIGHT_PATHS, INSIGHT_TRENDS, INSIGHT_FUNNELS]:  # type: ignore
             serialized_actors = self.add_matched_recordings_to_serialized_actors(serialized_actors, raw_result)
@@ -102,14 +111,25 @@ class ActorBaseQuery:
 
     def query_for_session_ids_with_recordings(self, session_ids: Set[str]) -> Set[str]:
         """ Filters a list of session_ids to those that actually have recordings """
-        query = """
-        SELECT DISTINCT session_id
-        FROM session_recording_events
-        WHERE
-            team_id = %(team_id)s
-            and has_full_snapshot = 1
-            and session_id in %(session_ids)s
-        """
+        if is_session_recording_summaries_ready():
+            query = """
+            SELECT session_id
+            FROM session_recording_summaries
+            WHERE
+                team_id = %(team_id)s
+                and session_id in %(session_ids)s
+            GROUP BY session_id
+            HAVING sum(full_snapshot_count) > 0
+            """
+        else:
+            query = """
+            SELECT DISTINCT session_id
+            FROM session_recording_events
+            WHERE
+                team_id = %(team_id)s
+                and has_full_snapshot = 1
+                and session_id in %(session_ids)s
+            """
         params = {"team_id": self._team.pk, "session_ids": list(session_ids)}
         raw_result = sync_execute(query, params)
         return set([row[0] for row in raw_result])
@@ -153,22 +173,24 @@ class ActorBaseQuery:
 
         return serialized_actors_with_recordings
 
-    def get_actors_from_result(
-        self, raw_result
-    ) -> Tuple[Union[QuerySet[Person], QuerySet[Group]], Union[List[SerializedGroup], List[SerializedPerson]]]:
-        actors: Union[QuerySet[Person], QuerySet[Group]]
+    def query_actors(
+        self, query: str, params: Dict
+    ) -> Tuple[
+        List[Tuple], Union[List[uuid.UUID], QuerySet[Group]], Union[List[SerializedGroup], List[SerializedPerson]]
+    ]:
+        """ Executes an actor query, returning its rows along with the actors found in data model and dict formats """
+        actors: Union[List[uuid.UUID], QuerySet[Group]]
         serialized_actors: Union[List[SerializedGroup], List[SerializedPerson]]
 
-        actor_ids = [row[0] for row in raw_result]
-
         if self.is_aggregating_by_groups:
+            raw_result = sync_execute(query, params)
             actors, serialized_actors = get_groups(
-                self._team.pk, cast(int, self.aggregation_group_type_index), actor_ids
+                self._team.pk, cast(int, self.aggregation_group_type_index), [row[0] for row in raw_result]
             )
         else:
-            actors, serialized_actors = get_people(self._team.pk, actor_ids)
+            raw_result, actors, serialized_actors = get_people(self._team.pk, query, params)
 
-        return actors, serialized_actors
+        return raw_result, actors, serialized_actors
 
 
 def get_groups(
@@ -181,27 +203,60 @@ def get_groups(
     return groups, serialize_groups(groups)
 
 
-def get_people(team_id: int, people_ids: List[Any]) -> Tuple[QuerySet[Person], List[SerializedPerson]]:
-    """ Get people from raw SQL results in data model and dict formats """
-    persons: QuerySet[Person] = Person.objects.filter(team_id=team_id, uuid__in=people_ids)
-    return persons, serialize_people(persons)
+def get_people(
+    team_id: int, actor_query: str, params: Dict
+) -> Tuple[List[Tuple], List[uuid.UUID], List[SerializedPerson]]:
+    """
+    Executes an actor query selecting person uuids as `actor_id`, returning its rows along with the people found, as
+    uuids and in dict format, in the order of the rows.
+
+    Persons and their distinct ids are joined on from the collapsed clickhouse tables, rather than read from postgres.
+    """
+    if is_person_latest_ready():
+        person_table, person_fields = PERSONS_LATEST_TABLE, PERSONS_LATEST_FIELDS_SQL
+    else:
+        person_table, person_fields = "person", PERSONS_FIELDS_SQL
+    # The actor query might already be rendered, so only its own params are left for the client to substitute
+    query = substitute_params(GET_ACTORS_WITH_PERSONS_SQL, {"team_id": team_id}).format(
+        actor_query=actor_query, person_table=person_table, person_fields=person_fields
+    )
+    rows = sync_execute(query, params)
 
+    raw_result = [row[:-_PERSON_COLUMNS] for row in rows]
+    serialized_people = [
+        _serialize_person_row(row[-_PERSON_COLUMNS:]) for row in rows if row[-_PERSON_COLUMNS] != _NO_PERSON_ID
+    ]
+    return raw_result, [person["id"] for person in serialized_people], serialized_people
 
-def serialize_people(data: QuerySet[Person]) -> List[SerializedPerson]:
-    from posthog.api.person import get_person_name
 
-    return [
-        SerializedPerson(
-            type="person",
-            id=person.uuid,
-            created_at=person.created_at,
-            properties=person.properties,
-            is_identified=person.is_identified,
-            name=get_person_name(person),
-            distinct_ids=person.distinct_ids,
-        )
-        for person in data
-    ]
+def get_people_by_ids(team_id: int, people_ids: List[Any]) -> Tuple[List[uuid.UUID], List[SerializedPerson]]:
+    """ Get people from a list of uuids in data model and dict formats, in the order given """
+    if not people_ids:
+        return [], []
+
+    _, people, serialized_people = get_people(
+        team_id, "SELECT toUUID(arrayJoin(%(person_ids)s)) AS actor_id", {"person_ids": [str(id) for id in people_ids]},
+    )
+    return people, serialized_people
+
+
+# Columns GET_ACTORS_WITH_PERSONS_SQL appends to the actor query's own
+_PERSON_COLUMNS = 5
+_NO_PERSON_ID = uuid.UUID(int=0)
+
+
+def _serialize_person_row(row: Tuple) -> SerializedPerson:
+    person_uuid, created_at, properties, is_identified, distinct_ids = row
+    properties = json.loads(properties)
+    return SerializedPerson(
+        type="person",
+        id=person_uuid,
+        created_at=created_at.replace(tzinfo=pytz.utc) if created_at.tzinfo is None else created_at,
+        properties=properties,
+        is_identified=bool(is_identified),
+        name=get_person_display_name(properties, distinct_ids) or str(person_uuid),
+        distinct_ids=distinct_ids,
+    )
 
 
 def serialize_groups(data: QuerySet[Group]) -> List[SerializedGroup]:
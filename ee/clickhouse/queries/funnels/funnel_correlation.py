@@ -1,7 +1,7 @@
-import dataclasses
 import urllib.parse
 from typing import (
     Any,
+    Callable,
     Dict,
     List,
     Literal,
@@ -22,7 +22,14 @@ from ee.clickhouse.queries.funnels.utils import get_funnel_order_actor_class
 from ee.clickhouse.queries.groups_join_query import GroupsJoinQuery
 from ee.clickhouse.queries.person_distinct_id_query import get_team_distinct_ids_query
 from ee.clickhouse.queries.person_query import ClickhousePersonQuery
+from ee.clickhouse.queries.util import parse_timestamps
 from ee.clickhouse.sql.clickhouse import trim_quotes_expr
+from ee.settings import (
+    FUNNEL_CORRELATION_MAX_EXECUTION_TIME,
+    FUNNEL_CORRELATION_MAX_MEMORY_USAGE,
+    FUNNEL_CORRELATION_MAX_PROPERTIES,
+    FUNNEL_CORRELATION_SAMPLE_RATE,
+)
 from posthog.constants import AUTOCAPTURE_EVENT, TREND_FILTER_TYPE_ACTIONS, FunnelCorrelationType
 from posthog.models import Team
 from posthog.models.filters import Filter
@@ -68,28 +75,6 @@ class FunnelCorrelationResponse(TypedDict):
     skewed: bool
 
 
-@dataclasses.dataclass
-class EventStats:
-    success_count: int
-    failure_count: int
-
-
-@dataclasses.dataclass
-class EventContingencyTable:
-    """
-    Represents a contingency table for a single event. Note that this isn't a
-    complete contingency table, but rather only includes totals for
-    failure/success as opposed to including the number of successes for cases
-    that a persons _doesn't_ visit an event.
-    """
-
-    event: str
-    visited: EventStats
-
-    success_total: int
-    failure_total: int
-
-
 class FunnelCorrelation:
 
     TOTAL_IDENTIFIER = "Total_Values_In_Query"
@@ -98,6 +83,17 @@ class FunnelCorrelation:
     MIN_PERSON_COUNT = 25
     MIN_PERSON_PERCENTAGE = 0.02
     PRIOR_COUNT = 1
+    # Number of most positively and most negatively correlated events returned
+    CORRELATION_LIMIT = 10
+    # Properties with the most actors per value come first: the long tail of high cardinality properties (ids, urls,
+    # ...) can't reach significance anyway, but is what blows up the number of rows to count
+    CANDIDATE_PROPERTIES_ORDER_BY = "ORDER BY uniq(actor_id) / uniq(prop.2) DESC, prop_key LIMIT %(candidate_limit)s"
+    # Let big aggregations spill to disk rather than run out of memory, and give up on runaway queries
+    QUERY_SETTINGS = {
+        "max_memory_usage": FUNNEL_CORRELATION_MAX_MEMORY_USAGE,
+        "max_bytes_before_external_group_by": FUNNEL_CORRELATION_MAX_MEMORY_USAGE // 2,
+        "max_execution_time": FUNNEL_CORRELATION_MAX_EXECUTION_TIME,
+    }
 
     def __init__(
         self,
@@ -238,6 +234,7 @@ class FunnelCorrelation:
 
         event_join_query = self._get_events_join_query()
 
+        candidate_property_names = None
         if self.support_autocapture_elements():
             event_type_expression, _ = get_property_string_expr(
                 "events", self.AUTOCAPTURE_EVENT_TYPE, f"'{self.AUTOCAPTURE_EVENT_TYPE}'", "properties",
@@ -248,8 +245,14 @@ class FunnelCorrelation:
                 tuple(prop_key, prop_value) as prop
             """
         else:
+            candidate_property_names = self._get_candidate_property_names(
+                self.get_event_property_key_count_query, self.get_event_property_candidates_query
+            )
+            prop_keys_expr = self._filter_candidate_properties(
+                "arrayMap(x -> x.1, JSONExtractKeysAndValuesRaw(properties))", candidate_property_names
+            )
             array_join_query = f"""
-                arrayMap(x -> x.1, JSONExtractKeysAndValuesRaw(properties)) as prop_keys,
+                {prop_keys_expr} as prop_keys,
                 arrayMap(x -> {trim_quotes_expr("JSONExtractRaw(properties, x)")}, prop_keys) as prop_values,
                 arrayJoin(arrayZip(prop_keys, prop_values)) as prop
             """
@@ -305,6 +308,72 @@ class FunnelCorrelation:
             "target_step": len(self._filter.entities),
             "event_names": self._filter.correlation_event_names,
             "exclude_property_names": self._filter.correlation_event_exclude_property_names,
+            "candidate_property_names": candidate_property_names,
+        }
+
+        return query, params
+
+    def get_event_property_candidates_query(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns a query string and params, which pick the event properties worth correlating from a sample of events.
+        """
+        funnel_persons_query, funnel_persons_params = self.get_funnel_actors_cte()
+
+        event_join_query = self._get_events_join_query()
+
+        query = f"""
+            WITH
+                funnel_actors as ({funnel_persons_query}),
+                toDateTime(%(date_to)s) AS date_to,
+                toDateTime(%(date_from)s) AS date_from,
+                %(funnel_step_names)s as funnel_step_names
+
+            SELECT prop.1 as prop_key
+            FROM (
+                SELECT
+                    actors.actor_id as actor_id,
+                    arrayJoin(JSONExtractKeysAndValuesRaw(properties)) as prop
+                FROM events AS event SAMPLE %(sample_rate)s
+                    {event_join_query}
+                    AND event.event IN %(event_names)s
+            )
+            GROUP BY prop_key
+            HAVING prop_key NOT IN %(exclude_property_names)s
+            {self.CANDIDATE_PROPERTIES_ORDER_BY}
+        """
+        params = {
+            **funnel_persons_params,
+            "funnel_step_names": self._get_funnel_step_names(),
+            "event_names": self._filter.correlation_event_names,
+            "exclude_property_names": self._filter.correlation_event_exclude_property_names,
+            "sample_rate": FUNNEL_CORRELATION_SAMPLE_RATE,
+        }
+
+        return query, params
+
+    def get_event_property_key_count_query(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns a query string and params, which estimate how many event properties there are to correlate without
+        working out the funnel actors. Every event of the correlated event names since `date_from` is counted, so this
+        is at least the number of properties of the funnel actors' events in the same sample.
+        """
+        parsed_date_from, _, date_params = parse_timestamps(filter=self._filter, team_id=self._team.pk)
+
+        query = f"""
+            SELECT uniq(prop_key)
+            FROM events SAMPLE %(sample_rate)s
+            ARRAY JOIN JSONExtractKeys(properties) as prop_key
+            WHERE team_id = %(team_id)s
+            AND event IN %(event_names)s
+            {parsed_date_from}
+            AND prop_key NOT IN %(exclude_property_names)s
+        """
+        params = {
+            **date_params,
+            "team_id": self._team.pk,
+            "event_names": self._filter.correlation_event_names,
+            "exclude_property_names": self._filter.correlation_event_exclude_property_names,
+            "sample_rate": FUNNEL_CORRELATION_SAMPLE_RATE,
         }
 
         return query, params
@@ -316,7 +385,13 @@ class FunnelCorrelation:
 
         funnel_actors_query, funnel_actors_params = self.get_funnel_actors_cte()
 
-        person_prop_query, person_prop_params = self._get_properties_prop_clause()
+        candidate_property_names = None
+        if "$all" in cast(list, self._filter.correlation_property_names):
+            candidate_property_names = self._get_candidate_property_names(
+                self.get_properties_key_count_query, self.get_properties_candidates_query
+            )
+
+        person_prop_query, person_prop_params = self._get_properties_prop_clause(candidate_property_names)
 
         aggregation_join_query, aggregation_join_params = self._get_aggregation_join_query()
 
@@ -383,6 +458,105 @@ class FunnelCorrelation:
 
         return query, params
 
+    def get_properties_candidates_query(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns a query string and params, which pick the person or group properties worth correlating from a sample
+        of the funnel actors.
+        """
+        funnel_actors_query, funnel_actors_params = self.get_funnel_actors_cte()
+
+        aggregation_join_query, aggregation_join_params = self._get_aggregation_join_query()
+
+        query = f"""
+            WITH
+                funnel_actors as ({funnel_actors_query})
+            SELECT prop.1 as prop_key
+            FROM (
+                SELECT
+                    funnel_actors.actor_id as actor_id,
+                    arrayJoin(JSONExtractKeysAndValuesRaw({self._get_aggregation_properties_alias()})) as prop
+                FROM funnel_actors
+                {aggregation_join_query}
+                -- Persons and groups can't be sampled like events, so sample the actors by their id instead
+                WHERE modulo(cityHash64(funnel_actors.actor_id), 1000) < 1000 * %(sample_rate)s
+            ) aggregation_target_with_props
+            GROUP BY prop_key
+            HAVING prop_key NOT IN %(exclude_property_names)s
+            {self.CANDIDATE_PROPERTIES_ORDER_BY}
+        """
+        params = {
+            **funnel_actors_params,
+            **aggregation_join_params,
+            "exclude_property_names": self._filter.correlation_property_exclude_names,
+            "sample_rate": FUNNEL_CORRELATION_SAMPLE_RATE,
+        }
+
+        return query, params
+
+    def get_properties_key_count_query(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns a query string and params, which estimate how many person or group properties there are to correlate
+        without working out the funnel actors. All of the team's persons or groups in the same sample are counted.
+        """
+        if self._filter.aggregation_group_type_index is None:
+            query = """
+                SELECT uniq(prop_key)
+                FROM person
+                ARRAY JOIN JSONExtractKeys(properties) as prop_key
+                WHERE team_id = %(team_id)s
+                AND modulo(cityHash64(id), 1000) < 1000 * %(sample_rate)s
+                AND prop_key NOT IN %(exclude_property_names)s
+            """
+        else:
+            query = """
+                SELECT uniq(prop_key)
+                FROM groups
+                ARRAY JOIN JSONExtractKeys(group_properties) as prop_key
+                WHERE team_id = %(team_id)s
+                AND group_type_index = %(group_type_index)s
+                AND modulo(cityHash64(group_key), 1000) < 1000 * %(sample_rate)s
+                AND prop_key NOT IN %(exclude_property_names)s
+            """
+        params = {
+            "team_id": self._team.pk,
+            "group_type_index": self._filter.aggregation_group_type_index,
+            "exclude_property_names": self._filter.correlation_property_exclude_names,
+            "sample_rate": FUNNEL_CORRELATION_SAMPLE_RATE,
+        }
+
+        return query, params
+
+    def _get_candidate_property_names(
+        self,
+        get_key_count_query: Callable[[], Tuple[str, Dict[str, Any]]],
+        get_candidates_query: Callable[[], Tuple[str, Dict[str, Any]]],
+    ) -> Optional[List[str]]:
+        """
+        Returns the names of the properties to correlate, or `None` when there are no more than
+        `FUNNEL_CORRELATION_MAX_PROPERTIES` of them and all properties can be correlated.
+
+        The candidate properties query works out the funnel actors CTE in full again, so it's only run when the cheap
+        key count estimate says there are too many properties to correlate them all.
+        """
+        query, params = get_key_count_query()
+        ((key_count,),) = sync_execute(query, params, settings=self.QUERY_SETTINGS)
+        if key_count <= FUNNEL_CORRELATION_MAX_PROPERTIES:
+            return None
+
+        query, params = get_candidates_query()
+        results = sync_execute(
+            query, {**params, "candidate_limit": FUNNEL_CORRELATION_MAX_PROPERTIES + 1}, settings=self.QUERY_SETTINGS
+        )
+        if len(results) <= FUNNEL_CORRELATION_MAX_PROPERTIES:
+            return None
+        return [prop_key for prop_key, in results[:FUNNEL_CORRELATION_MAX_PROPERTIES]]
+
+    @staticmethod
+    def _filter_candidate_properties(prop_keys_expr: str, candidate_property_names: Optional[List[str]]) -> str:
+        if candidate_property_names is None:
+            return prop_keys_expr
+        return f"arrayFilter(x -> x IN %(candidate_property_names)s, {prop_keys_expr})"
+
     def _get_aggregation_target_join_query(self) -> str:
         aggregation_person_join = f"""
             JOIN ({get_team_distinct_ids_query(self._team.pk)}) AS pdi
@@ -461,20 +635,28 @@ class FunnelCorrelation:
         else:
             return GroupsJoinQuery(self._filter, self._team.pk, join_key="funnel_actors.actor_id").get_join_query()
 
-    def _get_properties_prop_clause(self):
+    def _get_aggregation_properties_alias(self) -> str:
+        if self._filter.aggregation_group_type_index is None:
+            return ClickhousePersonQuery.PERSON_PROPERTIES_ALIAS
+        return self._get_group_properties_field()
 
-        group_properties_field = f"groups_{self._filter.aggregation_group_type_index}.group_properties_{self._filter.aggregation_group_type_index}"
-        aggregation_properties_alias = (
-            ClickhousePersonQuery.PERSON_PROPERTIES_ALIAS
-            if self._filter.aggregation_group_type_index is None
-            else group_properties_field
-        )
+    def _get_group_properties_field(self) -> str:
+        return f"groups_{self._filter.aggregation_group_type_index}.group_properties_{self._filter.aggregation_group_type_index}"
+
+    def _get_properties_prop_clause(self, candidate_property_names: Optional[List[str]] = None):
+
+        group_properties_field = self._get_group_properties_field()
+        aggregation_properties_alias = self._get_aggregation_properties_alias()
 
         if "$all" in cast(list, self._filter.correlation_property_names):
             map_expr = trim_quotes_expr(f"JSONExtractRaw({aggregation_properties_alias}, x)")
+            prop_keys_expr = self._filter_candidate_properties(
+                f"arrayMap(x -> x.1, JSONExtractKeysAndValuesRaw({aggregation_properties_alias}))",
+                candidate_property_names,
+            )
             return (
                 f"""
-            arrayMap(x -> x.1, JSONExtractKeysAndValuesRaw({aggregation_properties_alias})) as person_prop_keys,
+            {prop_keys_expr} as person_prop_keys,
             arrayJoin(
                 arrayZip(
                     person_prop_keys,
@@ -482,7 +664,7 @@ class FunnelCorrelation:
                 )
             ) as prop
             """,
-                {},
+                {"candidate_property_names": candidate_property_names},
             )
         else:
             person_property_expressions = []
@@ -581,7 +763,7 @@ class FunnelCorrelation:
 
         """
 
-        event_contingency_tables, success_total, failure_total = self.get_partial_event_contingency_tables()
+        events, success_total, failure_total = self.get_top_odds_ratios()
 
         if not success_total or not failure_total:
             return [], True
@@ -593,26 +775,6 @@ class FunnelCorrelation:
         if success_total / failure_total > 10 or failure_total / success_total > 10:
             skewed_totals = True
 
-        odds_ratios = [
-            get_entity_odds_ratio(event_stats, FunnelCorrelation.PRIOR_COUNT)
-            for event_stats in event_contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(event_stats)
-        ]
-
-        positively_correlated_events = sorted(
-            [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "success"],
-            key=lambda x: x["odds_ratio"],
-            reverse=True,
-        )
-
-        negatively_correlated_events = sorted(
-            [odds_ratio for odds_ratio in odds_ratios if odds_ratio["correlation_type"] == "failure"],
-            key=lambda x: x["odds_ratio"],
-            reverse=False,
-        )
-
-        # Return the top ten positively correlated events, and top then negatively correlated events
-        events = positively_correlated_events[:10] + negatively_correlated_events[:10]
         return events, skewed_totals
 
     def construct_people_url(self, success: bool, event_definition: EventDefinition) -> Optional[str]:
@@ -719,40 +881,96 @@ class FunnelCorrelation:
 
         return self.format_results(self._run())
 
-    def get_partial_event_contingency_tables(self) -> Tuple[List[EventContingencyTable], int, int]:
+    def get_top_odds_ratios_query(self) -> Tuple[str, Dict[str, Any]]:
+        """
+        Returns a query string and params, which rank the rows of the contingency table query.
+
+        The contingency table can have a row per event property value, so rather than pulling it all across the wire,
+        the odds ratios are worked out in clickhouse and only the top `CORRELATION_LIMIT` most positively and most
+        negatively correlated rows are returned, along with the total success and failure counts.
+        Rows are dropped as insignificant when fewer than `MIN_PERSON_COUNT` actors, or `MIN_PERSON_PERCENTAGE` of all
+        actors if that's fewer, are counted in them.
+        """
+        contingency_table_query, contingency_table_params = self.get_contingency_table_query()
+
+        query = f"""
+            WITH
+                arrayFilter(
+                    x -> x.2 + x.3 >= least(%(min_person_count)s, %(min_person_percentage)s * (success_total + failure_total)),
+                    event_counts
+                ) AS significant_event_counts,
+                -- Add the prior to all values to prevent divide by zero errors, and introduce a prior probability
+                arrayMap(
+                    x -> tuple(
+                        x.1,
+                        x.2,
+                        x.3,
+                        ((x.2 + %(prior_count)s) * (failure_total - x.3 + %(prior_count)s))
+                        / ((success_total - x.2 + %(prior_count)s) * (x.3 + %(prior_count)s))
+                    ),
+                    significant_event_counts
+                ) AS odds_ratios
+            SELECT
+                success_total,
+                failure_total,
+                arraySlice(arraySort(x -> (-x.4, x.1), arrayFilter(x -> x.4 > 1, odds_ratios)), 1, %(correlation_limit)s) AS success_events,
+                arraySlice(arraySort(x -> (x.4, x.1), arrayFilter(x -> x.4 <= 1, odds_ratios)), 1, %(correlation_limit)s) AS failure_events
+            FROM (
+                SELECT
+                    anyIf(success_count, name = '{self.TOTAL_IDENTIFIER}') AS success_total,
+                    anyIf(failure_count, name = '{self.TOTAL_IDENTIFIER}') AS failure_total,
+                    groupArrayIf(tuple(name, success_count, failure_count), name != '{self.TOTAL_IDENTIFIER}') AS event_counts
+                FROM ({contingency_table_query})
+            )
+        """
+        params = {
+            **contingency_table_params,
+            "min_person_count": FunnelCorrelation.MIN_PERSON_COUNT,
+            "min_person_percentage": FunnelCorrelation.MIN_PERSON_PERCENTAGE,
+            "prior_count": FunnelCorrelation.PRIOR_COUNT,
+            "correlation_limit": FunnelCorrelation.CORRELATION_LIMIT,
+        }
+
+        return query, params
+
+    def get_top_odds_ratios(self) -> Tuple[List[EventOddsRatio], int, int]:
         """
         For each event a person that started going through the funnel, gets stats
-        for how many of these users are sucessful and how many are unsuccessful.
+        for how many of these users are sucessful and how many are unsuccessful,
+        and returns the most positively then the most negatively correlated ones.
 
-        It's a partial table as it doesn't include numbers of the negation of the
-        event, but does include the total success/failure numbers, which is enough
-        for us to calculate the odds ratio.
+        The underlying contingency table is partial as it doesn't include numbers
+        of the negation of the event, but does include the total success/failure
+        numbers, which is enough for us to calculate the odds ratio.
         """
 
-        query, params = self.get_contingency_table_query()
-        results_with_total = sync_execute(query, params)
+        query, params = self.get_top_odds_ratios_query()
+        success_total, failure_total, success_events, failure_events = sync_execute(
+            query, params, settings=self.QUERY_SETTINGS
+        )[0]
 
-        # Get the total success/failure counts from the results
-        results = [result for result in results_with_total if result[0] != self.TOTAL_IDENTIFIER]
-        _, success_total, failure_total = [
-            result for result in results_with_total if result[0] == self.TOTAL_IDENTIFIER
-        ][0]
+        positively_correlated_events = [
+            EventOddsRatio(
+                event=event,
+                success_count=success_count,
+                failure_count=failure_count,
+                odds_ratio=odds_ratio,
+                correlation_type="success",
+            )
+            for event, success_count, failure_count, odds_ratio in success_events
+        ]
+        negatively_correlated_events = [
+            EventOddsRatio(
+                event=event,
+                success_count=success_count,
+                failure_count=failure_count,
+                odds_ratio=odds_ratio,
+                correlation_type="failure",
+            )
+            for event, success_count, failure_count, odds_ratio in failure_events
+        ]
 
-        # Add a little structure, and keep it close to the query definition so it's
-        # obvious what's going on with result indices.
-        return (
-            [
-                EventContingencyTable(
-                    event=result[0],
-                    visited=EventStats(success_count=result[1], failure_count=result[2]),
-                    success_total=success_total,
-                    failure_total=failure_total,
-                )
-                for result in results
-            ],
-            success_total,
-            failure_total,
-        )
+        return positively_correlated_events + negatively_correlated_events, success_total, failure_total
 
     def get_funnel_actors_cte(self) -> Tuple[str, Dict[str, Any]]:
 
@@ -760,22 +978,6 @@ class FunnelCorrelation:
             limit_actors=False, extra_fields=["steps", "final_timestamp", "first_timestamp"]
         )
 
-    @staticmethod
-    def are_results_insignificant(event_contingency_table: EventContingencyTable) -> bool:
-        """
-        Check if the results are insignificant, i.e. if the success/failure counts are
-        significantly different from the total counts
-        """
-
-        total_count = event_contingency_table.success_total + event_contingency_table.failure_total
-
-        if event_contingency_table.visited.success_count + event_contingency_table.visited.failure_count < min(
-            FunnelCorrelation.MIN_PERSON_COUNT, FunnelCorrelation.MIN_PERSON_PERCENTAGE * total_count
-        ):
-            return True
-
-        return False
-
     def serialize_event_odds_ratio(self, odds_ratio: EventOddsRatio) -> EventOddsRatioSerialized:
         event_definition = self.serialize_event_with_property(event=odds_ratio["event"])
         return {
@@ -808,26 +1010,6 @@ class FunnelCorrelation:
         return EventDefinition(event=event, properties={}, elements=[])
 
 
-def get_entity_odds_ratio(event_contingency_table: EventContingencyTable, prior_counts: int) -> EventOddsRatio:
-
-    # Add 1 to all values to prevent divide by zero errors, and introduce a [prior](https://en.wikipedia.org/wiki/Prior_probability)
-    odds_ratio = (
-        (event_contingency_table.visited.success_count + prior_counts)
-        * (event_contingency_table.failure_total - event_contingency_table.visited.failure_count + prior_counts)
-    ) / (
-        (event_contingency_table.success_total - event_contingency_table.visited.success_count + prior_counts)
-        * (event_contingency_table.visited.failure_count + prior_counts)
-    )
-
-    return EventOddsRatio(
-        event=event_contingency_table.event,
-        success_count=event_contingency_table.visited.success_count,
-        failure_count=event_contingency_table.visited.failure_count,
-        odds_ratio=odds_ratio,
-        correlation_type="success" if odds_ratio > 1 else "failure",
-    )
-
-
 def build_selector(elements: List[Dict[str, Any]]) -> str:
     # build a CSS select given an "elements_chain"
     # NOTE: my source of what this should be doing is
@@ -1,11 +1,11 @@
-import unittest
+from unittest.mock import patch
 from uuid import uuid4
 
 from rest_framework.exceptions import ValidationError
 
 from ee.clickhouse.models.event import create_event
 from ee.clickhouse.models.group import create_group
-from ee.clickhouse.queries.funnels.funnel_correlation import EventContingencyTable, EventStats, FunnelCorrelation
+from ee.clickhouse.queries.funnels.funnel_correlation import FunnelCorrelation
 from ee.clickhouse.queries.funnels.funnel_correlation_persons import FunnelCorrelationActors
 from ee.clickhouse.test.test_journeys import journeys_for
 from ee.clickhouse.util import ClickhouseTestMixin, snapshot_clickhouse_queries
@@ -1001,6 +1001,60 @@ class TestClickhouseFunnelCorrelation(ClickhouseTestMixin, APIBaseTest):
         result = correlation._run()[0]
         self.assertEqual(len(result), 2)
 
+    def test_discarding_events_below_significance_threshold(self):
+        filters = {
+            "events": [
+                {"id": "user signed up", "type": "events", "order": 0},
+                {"id": "paid", "type": "events", "order": 1},
+            ],
+            "insight": INSIGHT_FUNNELS,
+            "date_from": "2020-01-01",
+            "date_to": "2020-01-14",
+            "funnel_correlation_type": "events",
+        }
+
+        filter = Filter(data=filters)
+
+        # 8 successes and 8 failures
+        for i in range(16):
+            _create_person(distinct_ids=[f"user_{i}"], team_id=self.team.pk)
+            _create_event(
+                team=self.team, event="user signed up", distinct_id=f"user_{i}", timestamp="2020-01-02T14:00:00Z",
+            )
+            if i in (0, 8):
+                _create_event(
+                    team=self.team, event="at_threshold", distinct_id=f"user_{i}", timestamp="2020-01-03T14:00:00Z",
+                )
+            if i == 1:
+                _create_event(
+                    team=self.team, event="below_threshold", distinct_id=f"user_{i}", timestamp="2020-01-03T14:00:00Z",
+                )
+            if i < 8:
+                _create_event(
+                    team=self.team, event="paid", distinct_id=f"user_{i}", timestamp="2020-01-04T14:00:00Z",
+                )
+
+        # Threshold of least(2, 0.5 * 16) = 2 persons, from the count
+        with patch.object(FunnelCorrelation, "MIN_PERSON_COUNT", 2), patch.object(
+            FunnelCorrelation, "MIN_PERSON_PERCENTAGE", 0.5
+        ):
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+        self.assertEqual([item["event"] for item in result], ["at_threshold"])
+
+        # Threshold of least(25, 0.125 * 16) = 2 persons, from the percentage
+        with patch.object(FunnelCorrelation, "MIN_PERSON_COUNT", 25), patch.object(
+            FunnelCorrelation, "MIN_PERSON_PERCENTAGE", 0.125
+        ):
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+        self.assertEqual([item["event"] for item in result], ["at_threshold"])
+
+        # Lowering it to a single person keeps both
+        with patch.object(FunnelCorrelation, "MIN_PERSON_COUNT", 1), patch.object(
+            FunnelCorrelation, "MIN_PERSON_PERCENTAGE", 0.5
+        ):
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+        self.assertCountEqual([item["event"] for item in result], ["at_threshold", "below_threshold"])
+
     def test_events_within_conversion_window_for_correlation(self):
         filters = {
             "events": [
@@ -1434,93 +1488,95 @@ class TestClickhouseFunnelCorrelation(ClickhouseTestMixin, APIBaseTest):
             6,
         )
 
+    @patch("ee.clickhouse.queries.funnels.funnel_correlation.FUNNEL_CORRELATION_SAMPLE_RATE", 1)
+    def test_funnel_correlation_with_all_properties_only_correlates_top_candidates(self):
+        filters = {
+            "events": [
+                {"id": "user signed up", "type": "events", "order": 0},
+                {"id": "paid", "type": "events", "order": 1},
+            ],
+            "insight": INSIGHT_FUNNELS,
+            "date_from": "2020-01-01",
+            "date_to": "2020-01-14",
+            "funnel_correlation_type": "properties",
+            "funnel_correlation_names": ["$all"],
+        }
 
-class TestCorrelationFunctions(unittest.TestCase):
-    def test_are_results_insignificant(self):
-        # Same setup as above test: test_discarding_insignificant_events
-        contingency_tables = [
-            EventContingencyTable(
-                event="negatively_related",
-                visited=EventStats(success_count=0, failure_count=5),
-                success_total=10,
-                failure_total=10,
-            ),
-            EventContingencyTable(
-                event="positively_related",
-                visited=EventStats(success_count=5, failure_count=0),
-                success_total=10,
-                failure_total=10,
-            ),
-            EventContingencyTable(
-                event="low_sig_negatively_related",
-                visited=EventStats(success_count=0, failure_count=2),
-                success_total=10,
-                failure_total=10,
-            ),
-            EventContingencyTable(
-                event="low_sig_positively_related",
-                visited=EventStats(success_count=1, failure_count=0),
-                success_total=10,
-                failure_total=10,
-            ),
-        ]
+        filter = Filter(data=filters)
 
-        # Discard both low_sig due to %
-        FunnelCorrelation.MIN_PERSON_PERCENTAGE = 0.11
-        FunnelCorrelation.MIN_PERSON_COUNT = 25
-        result = [
-            1
-            for contingency_table in contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(contingency_table)
-        ]
-        self.assertEqual(len(result), 2)
+        for i in range(10):
+            # $browser has fewer distinct values than $os, so it's the better candidate
+            _create_person(
+                distinct_ids=[f"user_{i}"],
+                team_id=self.team.pk,
+                properties={"$browser": "Positive" if i < 5 else "Negative", "$os": ["a", "b", "c"][i % 3]},
+            )
+            _create_event(
+                team=self.team, event="user signed up", distinct_id=f"user_{i}", timestamp="2020-01-02T14:00:00Z",
+            )
+            if i < 5:
+                _create_event(
+                    team=self.team, event="paid", distinct_id=f"user_{i}", timestamp="2020-01-04T14:00:00Z",
+                )
 
-        # Discard one low_sig due to %
-        FunnelCorrelation.MIN_PERSON_PERCENTAGE = 0.051
-        FunnelCorrelation.MIN_PERSON_COUNT = 25
-        result = [
-            1
-            for contingency_table in contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(contingency_table)
-        ]
-        self.assertEqual(len(result), 3)
-
-        # Discard both due to count
-        FunnelCorrelation.MIN_PERSON_PERCENTAGE = 0.5
-        FunnelCorrelation.MIN_PERSON_COUNT = 3
-        result = [
-            1
-            for contingency_table in contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(contingency_table)
-        ]
-        self.assertEqual(len(result), 2)
+        # Both properties fit under the cap, so picking the candidates is skipped
+        with patch.object(FunnelCorrelation, "get_properties_candidates_query") as candidates_query:
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+        candidates_query.assert_not_called()
+        self.assertEqual({item["event"].split("::")[0] for item in result}, {"$browser", "$os"})
 
-        # Discard one due to count
-        FunnelCorrelation.MIN_PERSON_PERCENTAGE = 0.5
-        FunnelCorrelation.MIN_PERSON_COUNT = 2
-        result = [
-            1
-            for contingency_table in contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(contingency_table)
-        ]
-        self.assertEqual(len(result), 3)
-
-        # Discard everything due to %
-        FunnelCorrelation.MIN_PERSON_PERCENTAGE = 0.5
-        FunnelCorrelation.MIN_PERSON_COUNT = 100
-        result = [
-            1
-            for contingency_table in contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(contingency_table)
-        ]
-        self.assertEqual(len(result), 0)
-
-        # Discard everything due to count
-        FunnelCorrelation.MIN_PERSON_PERCENTAGE = 0.5
-        FunnelCorrelation.MIN_PERSON_COUNT = 6
-        result = [
-            1
-            for contingency_table in contingency_tables
-            if not FunnelCorrelation.are_results_insignificant(contingency_table)
-        ]
-        self.assertEqual(len(result), 0)
+        with patch("ee.clickhouse.queries.funnels.funnel_correlation.FUNNEL_CORRELATION_MAX_PROPERTIES", 1):
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+
+        self.assertEqual(
+            [(item["event"], item["success_count"], item["failure_count"]) for item in result],
+            [("$browser::Positive", 5, 0), ("$browser::Negative", 0, 5)],
+        )
+
+    @patch("ee.clickhouse.queries.funnels.funnel_correlation.FUNNEL_CORRELATION_SAMPLE_RATE", 1)
+    def test_funnel_correlation_with_event_properties_only_correlates_top_candidates(self):
+        filters = {
+            "events": [
+                {"id": "user signed up", "type": "events", "order": 0},
+                {"id": "paid", "type": "events", "order": 1},
+            ],
+            "insight": INSIGHT_FUNNELS,
+            "date_from": "2020-01-01",
+            "date_to": "2020-01-14",
+            "funnel_correlation_type": "event_with_properties",
+            "funnel_correlation_event_names": ["related"],
+        }
+
+        filter = Filter(data=filters)
+
+        for i in range(10):
+            _create_person(distinct_ids=[f"user_{i}"], team_id=self.team.pk)
+            _create_event(
+                team=self.team, event="user signed up", distinct_id=f"user_{i}", timestamp="2020-01-02T14:00:00Z",
+            )
+            # signup_source has fewer distinct values than plan, so it's the better candidate
+            _create_event(
+                team=self.team,
+                event="related",
+                distinct_id=f"user_{i}",
+                timestamp="2020-01-03T14:00:00Z",
+                properties={"signup_source": "facebook" if i < 5 else "email", "plan": ["a", "b", "c"][i % 3]},
+            )
+            if i < 5:
+                _create_event(
+                    team=self.team, event="paid", distinct_id=f"user_{i}", timestamp="2020-01-04T14:00:00Z",
+                )
+
+        # Both properties fit under the cap, so picking the candidates is skipped
+        with patch.object(FunnelCorrelation, "get_event_property_candidates_query") as candidates_query:
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+        candidates_query.assert_not_called()
+        self.assertEqual({item["event"].split("::")[1] for item in result}, {"signup_source", "plan"})
+
+        with patch("ee.clickhouse.queries.funnels.funnel_correlation.FUNNEL_CORRELATION_MAX_PROPERTIES", 1):
+            result = FunnelCorrelation(filter, self.team)._run()[0]
+
+        self.assertEqual(
+            [(item["event"], item["success_count"], item["failure_count"]) for item in result],
+            [("related::signup_source::facebook", 5, 0), ("related::signup_source::email", 0, 5)],
+        )
@@ -88,6 +88,13 @@ class PathEventQuery(ClickhouseEventQuery):
         groups_query, groups_params = self._get_groups_query()
         self.params.update(groups_params)
 
+        sample_filter = ""
+        if self._filter.path_sample_rate:
+            # Sample persons rather than events: the events SAMPLE BY key is the distinct_id, which would split the
+            # paths of persons with several distinct_ids
+            sample_filter = f"AND modulo(cityHash64({self.DISTINCT_ID_TABLE_ALIAS}.person_id), 1000000) < 1000000 * %(path_sample_rate)s"
+            self.params["path_sample_rate"] = self._filter.path_sample_rate
+
         query = f"""
             SELECT {','.join(_fields)} FROM events {self.EVENT_TABLE_ALIAS}
             {self._get_distinct_id_query()}
@@ -95,6 +102,7 @@ class PathEventQuery(ClickhouseEventQuery):
             {groups_query}
             {funnel_paths_join}
             WHERE team_id = %(team_id)s
+            {sample_filter}
             {event_query}
             {date_query}
             {prop_query}
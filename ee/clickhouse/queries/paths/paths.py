@@ -1,19 +1,30 @@
 import dataclasses
+import json
+import uuid
 from collections import defaultdict
 from re import escape
 from typing import Dict, List, Literal, Optional, Tuple, Union, cast
 
+from django.conf import settings
+from django.core.cache import cache
 from rest_framework.exceptions import ValidationError
 
 from ee.clickhouse.client import sync_execute
 from ee.clickhouse.materialized_columns.columns import ColumnName
 from ee.clickhouse.queries.funnels.funnel_persons import ClickhouseFunnelActors
 from ee.clickhouse.queries.paths.path_event_query import PathEventQuery
-from ee.clickhouse.sql.paths.path import PATH_ARRAY_QUERY
+from ee.clickhouse.sql.paths.path import (
+    INSERT_PERSON_PATHS_SQL,
+    PATH_ARRAY_QUERY,
+    PATH_SESSIONS_QUERY,
+    PERSON_PATHS_SESSIONS_QUERY,
+)
 from posthog.constants import FUNNEL_PATH_BETWEEN_STEPS, LIMIT, PATH_EDGE_LIMIT
+from posthog.internal_metrics import incr
 from posthog.models import Filter, Team
 from posthog.models.filters.path_filter import PathFilter
 from posthog.models.property import PropertyName
+from posthog.utils import generate_cache_key
 
 EVENT_IN_SESSION_LIMIT_DEFAULT = 5
 SESSION_TIME_THRESHOLD_DEFAULT = 1800000  # milliseconds to 30 minutes
@@ -27,8 +38,7 @@ class ExtraEventClauses:
     array_filter_select_statements: str
     limited_path_tuple_elements: str
     path_time_tuple_select_statements: str
-    paths_tuple_elements: str
-    group_array_select_statements: str
+    session_tuple_elements: str
 
 
 class ClickhousePaths:
@@ -47,6 +57,7 @@ class ClickhousePaths:
             "session_time_threshold": SESSION_TIME_THRESHOLD_DEFAULT,
             "groupings": self._filter.path_groupings or None,
             "regex_groupings": None,
+            "max_events_in_session": settings.PATHS_MAX_EVENTS_IN_SESSION,
         }
         self._funnel_filter = funnel_filter
 
@@ -85,6 +96,10 @@ class ClickhousePaths:
     def run(self, *args, **kwargs):
         results = self._exec_query()
 
+        truncated_edges = sum(1 for result in results if result[4])
+        if truncated_edges:
+            incr("paths_query_truncated_edges", truncated_edges, tags={"team_id": self._team.pk})
+
         if not self._filter.min_edge_weight and not self._filter.max_edge_weight:
             results = self.validate_results(results)
 
@@ -148,10 +163,7 @@ class ClickhousePaths:
                 for index, field in enumerate(self.extra_event_fields_and_properties)
             ]
         )
-        paths_tuple_elements = " ".join([f", {field}s" for field in self.extra_event_fields_and_properties])
-        group_array_select_statements = " ".join(
-            [f"groupArray({field}) as {field}s," for field in self.extra_event_fields_and_properties]
-        )
+        session_tuple_elements = " ".join([f", {field}" for field in self.extra_event_fields_and_properties])
 
         return ExtraEventClauses(
             final_select_statements=final_select_statements,
@@ -159,41 +171,108 @@ class ClickhousePaths:
             array_filter_select_statements=array_filter_select_statements,
             limited_path_tuple_elements=limited_path_tuple_elements,
             path_time_tuple_select_statements=path_time_tuple_select_statements,
-            paths_tuple_elements=paths_tuple_elements,
-            group_array_select_statements=group_array_select_statements,
+            session_tuple_elements=session_tuple_elements,
         )
 
     def get_paths_per_person_query(self) -> str:
-        path_event_query, params = PathEventQuery(
-            filter=self._filter,
-            team=self._team,
-            extra_fields=self._extra_event_fields,
-            extra_event_properties=self._extra_event_properties,
-        ).get_query()
-        self.params.update(params)
-
         boundary_event_filter = self.get_target_point_filter()
         target_clause, target_params = self.get_target_clause()
         self.params.update(target_params)
 
-        session_threshold_clause = self.get_session_threshold_clause()
-
         extra_event_clauses = self.get_extra_event_clauses()
 
         return PATH_ARRAY_QUERY.format(
-            path_event_query=path_event_query,
+            session_paths_query=self.get_session_paths_query(),
             boundary_event_filter=boundary_event_filter,
             target_clause=target_clause,
-            session_threshold_clause=session_threshold_clause,
             extra_final_select_statements=extra_event_clauses.final_select_statements,
             extra_joined_path_tuple_select_statements=extra_event_clauses.joined_path_tuple_select_statements,
             extra_array_filter_select_statements=extra_event_clauses.array_filter_select_statements,
             extra_limited_path_tuple_elements=extra_event_clauses.limited_path_tuple_elements,
+        )
+
+    def get_session_paths_query(self) -> str:
+        if self.should_cache_person_paths():
+            self.params["person_paths_fill_id"] = self._get_person_paths_fill_id()
+            return PERSON_PATHS_SESSIONS_QUERY.format(path_expression=self._get_person_paths_path_expression())
+
+        path_event_query, params = PathEventQuery(
+            filter=self._filter,
+            team=self._team,
+            extra_fields=self._extra_event_fields,
+            extra_event_properties=self._extra_event_properties,
+        ).get_query()
+        self.params.update(params)
+
+        extra_event_clauses = self.get_extra_event_clauses()
+
+        return PATH_SESSIONS_QUERY.format(
+            path_event_query=path_event_query,
+            session_threshold_clause=self.get_session_threshold_clause(),
+            session_event_columns=self.get_session_event_columns(),
             extra_path_time_tuple_select_statements=extra_event_clauses.path_time_tuple_select_statements,
-            extra_paths_tuple_elements=extra_event_clauses.paths_tuple_elements,
-            extra_group_array_select_statements=extra_event_clauses.group_array_select_statements,
+            extra_session_tuple_elements=extra_event_clauses.session_tuple_elements,
+        )
+
+    def should_cache_person_paths(self) -> bool:
+        # Funnel paths depend on the funnel actors and recordings on event fields which aren't kept
+        return (
+            settings.PATHS_PERSON_PATHS_CACHE_TTL > 0
+            and not self.should_query_funnel()
+            and not self.extra_event_fields_and_properties
+        )
+
+    def _get_person_paths_fill_id(self) -> str:
+        """
+        Returns the `person_paths` fill holding the session paths of this query, filling it first if there's none.
+
+        Fills are shared by all queries with the same events query. Start and end points, step limit and edge limits
+        only apply to the filled paths, and so do path groupings unless events are excluded (exclusions match the
+        grouped path items).
+        """
+        path_event_query, params = PathEventQuery(filter=self._filter, team=self._team).get_query()
+        groupings_in_fill = bool(self._filter.exclude_events)
+        params = {
+            **params,
+            "session_time_threshold": SESSION_TIME_THRESHOLD_DEFAULT,
+            "max_events_in_session": self.params["max_events_in_session"],
+            "groupings": self.params["groupings"] if groupings_in_fill else None,
+            "regex_groupings": self.params["regex_groupings"] if groupings_in_fill else None,
+        }
+        query = INSERT_PERSON_PATHS_SQL.format(
+            session_paths_query=PATH_SESSIONS_QUERY.format(
+                path_event_query=path_event_query,
+                session_threshold_clause=self.get_session_threshold_clause(),
+                session_event_columns=self.get_session_event_columns(),
+                extra_path_time_tuple_select_statements="",
+                extra_session_tuple_elements="",
+            )
         )
 
+        cache_key = f"person_paths_{self._team.pk}_" + generate_cache_key(
+            query + json.dumps(params, sort_keys=True, default=str)
+        )
+        fill_id = cache.get(cache_key)
+        if fill_id is None:
+            fill_id = str(uuid.uuid4())
+            # The fill is read back over other connections, so it must be on all shards before it's handed out
+            sync_execute(
+                query, {**params, "person_paths_fill_id": fill_id}, settings={"insert_distributed_sync": 1},
+            )
+            cache.set(cache_key, fill_id, settings.PATHS_PERSON_PATHS_CACHE_TTL)
+        return fill_id
+
+    def _get_person_paths_path_expression(self) -> str:
+        # Path cleaning takes the place of path groupings, see PathEventQuery._get_grouping_fields
+        has_path_cleaning = bool(
+            (self._filter.path_replacements and self._team.path_cleaning_filters)
+            or self._filter.local_path_cleaning_filters
+        )
+        if not self._filter.path_groupings or self._filter.exclude_events or has_path_cleaning:
+            return "path"
+
+        return "arrayMap(x -> if(multiMatchAnyIndex(x, %(regex_groupings)s) > 0, %(groupings)s[multiMatchAnyIndex(x, %(regex_groupings)s)], x), path)"
+
     def should_query_funnel(self) -> bool:
         if self._filter.funnel_paths and self._funnel_filter:
             return True
@@ -211,8 +290,9 @@ class ClickhousePaths:
         return f"""
             SELECT last_path_key as source_event,
                 path_key as target_event,
-                COUNT(*) AS event_count,
-                avg(conversion_time) AS average_conversion_time
+                {self.get_event_count_expression()} AS event_count,
+                avg(conversion_time) AS average_conversion_time,
+                max(session_truncated) AS from_truncated_sessions
             FROM ({paths_per_person_query})
             WHERE source_event IS NOT NULL
             GROUP BY source_event,
@@ -224,6 +304,13 @@ class ClickhousePaths:
             {'LIMIT %(edge_limit)s' if self._filter.edge_limit else ''}
         """
 
+    def get_event_count_expression(self) -> str:
+        if self._filter.path_sample_rate:
+            # Scale sampled counts back up so edge weights stay comparable to unsampled ones
+            self.params["path_sample_rate"] = self._filter.path_sample_rate
+            return "toUInt64(round(COUNT(*) / %(path_sample_rate)s))"
+        return "COUNT(*)"
+
     def get_path_query_funnel_cte(self, funnel_filter: Filter):
         funnel_persons_generator = ClickhouseFunnelActors(
             funnel_filter,
@@ -283,9 +370,15 @@ class ClickhousePaths:
                 funnel_window_interval = 14
                 funnel_window_interval_unit = "DAY"
             # Not possible to directly compare two interval data types, so using a proxy Date.
-            return f"arraySplit(x -> if(toDateTime('2018-01-01') + toIntervalSecond(x.3 / 1000) < toDateTime('2018-01-01') + INTERVAL {funnel_window_interval} {funnel_window_interval_unit}, 0, 1), paths_tuple)"
+            return f"if(toDateTime('2018-01-01') + toIntervalSecond(time_since_previous_event / 1000) < toDateTime('2018-01-01') + INTERVAL {funnel_window_interval} {funnel_window_interval_unit}, 0, 1)"
 
-        return "arraySplit(x -> if(x.3 < %(session_time_threshold)s, 0, 1), paths_tuple)"
+        return "if(time_since_previous_event < %(session_time_threshold)s, 0, 1)"
+
+    def get_session_event_columns(self) -> str:
+        # `timestamp` is both a path event column and an extra field when including recordings
+        return ", ".join(
+            dict.fromkeys(["person_id", "timestamp", "path_item", *self.extra_event_fields_and_properties])
+        )
 
     def get_target_clause(self) -> Tuple[str, Dict]:
         params: Dict[str, Union[str, None]] = {"target_point": None, "secondary_target_point": None}
@@ -1,18 +1,27 @@
+from datetime import timedelta
 from typing import Dict, List, Optional, Set, Tuple, Union
 
-from ee.clickhouse.materialized_columns.columns import ColumnName
+from ee.clickhouse.materialized_columns.columns import ColumnName, get_materialized_columns
+from ee.clickhouse.materialized_columns.util import cache_for
 from ee.clickhouse.models.property import extract_tables_and_properties, parse_prop_grouped_clauses
 from ee.clickhouse.models.util import PersonPropertiesMode
 from ee.clickhouse.queries.column_optimizer import ColumnOptimizer
 from ee.clickhouse.sql.cohort import GET_COHORTPEOPLE_BY_COHORT_ID, GET_STATIC_COHORTPEOPLE_BY_COHORT_ID
+from ee.clickhouse.sql.person import PERSONS_LATEST_TABLE
 from posthog.constants import PropertyOperatorType
 from posthog.models import Filter
+from posthog.models.async_migration import is_async_migration_complete
 from posthog.models.cohort import Cohort
 from posthog.models.entity import Entity
+from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.filters.path_filter import PathFilter
 from posthog.models.filters.retention_filter import RetentionFilter
 from posthog.models.filters.stickiness_filter import StickinessFilter
 from posthog.models.property import Property, PropertyGroup
+from posthog.settings import BENCHMARK, TEST
+
+# person_latest only holds every person once 0010_fill_person_latest has backfilled it
+person_latest_ready = TEST or BENCHMARK
 
 
 class ClickhousePersonQuery:
@@ -22,6 +31,7 @@ class ClickhousePersonQuery:
     For sake of performance, this class:
     - Tries to do as much person property filtering as possible here
     - Minimizes the amount of columns read
+    - Reads from the pre-collapsed `person_latest` table unless materialized columns are needed
     """
 
     PERSON_PROPERTIES_ALIAS = "person_props"
@@ -64,9 +74,16 @@ class ClickhousePersonQuery:
         ).inner
 
     def get_query(self, extra_where = '') -> Tuple[str, Dict]:
-        fields = "id" + " ".join(
-            f", argMax({column_name}, _timestamp) as {alias}" for column_name, alias in self._get_fields()
-        )
+        if self._uses_person_latest:
+            table = f"{PERSONS_LATEST_TABLE} AS person"
+            fields = "id" + " ".join(
+                f", argMaxMerge({column_name}) as {alias}" for column_name, alias in self._get_fields()
+            )
+        else:
+            table = "person"
+            fields = "id" + " ".join(
+                f", argMax({column_name}, _timestamp) as {alias}" for column_name, alias in self._get_fields()
+            )
 
         person_filters, params = self._get_person_filters()
         cohort_query, cohort_params = self._get_cohort_query()
@@ -76,7 +93,7 @@ class ClickhousePersonQuery:
         return (
             f"""
             SELECT {fields}
-            FROM person
+            FROM {table}
             {cohort_query}
             WHERE team_id = %(team_id)s {extra_where}
             GROUP BY id
@@ -101,6 +118,23 @@ class ClickhousePersonQuery:
 
         return len(self._column_optimizer.person_columns_to_query) > 0
 
+    @cached_property
+    def _uses_person_latest(self) -> bool:
+        "Returns whether person_latest can be read, which holds every property in `properties` only"
+        if not is_person_latest_ready():
+            return False
+
+        materialized_columns = get_materialized_columns("person")
+        used_properties = {key for key, _, _ in self._column_optimizer._used_properties_with_type("person")}
+        if isinstance(self._filter, Filter) and self._filter.search:
+            used_properties.add("email")
+
+        return not any(property_name in materialized_columns for property_name in used_properties)
+
+    @property
+    def _person_properties_mode(self) -> PersonPropertiesMode:
+        return PersonPropertiesMode.DIRECT_ON_LATEST if self._uses_person_latest else PersonPropertiesMode.DIRECT
+
     def _uses_person_id(self, prop: Property) -> bool:
         return prop.type in ("person", "static-cohort", "precalculated-cohort")
 
@@ -123,7 +157,7 @@ class ClickhousePersonQuery:
             self._inner_person_properties,
             has_person_id_joined=False,
             group_properties_joined=False,
-            person_properties_mode=PersonPropertiesMode.DIRECT,
+            person_properties_mode=self._person_properties_mode,
         )
 
     def _get_cohort_query(self) -> Tuple[str, Dict]:
@@ -184,7 +218,7 @@ class ClickhousePersonQuery:
                 prepend="search",
                 has_person_id_joined=False,
                 group_properties_joined=False,
-                person_properties_mode=PersonPropertiesMode.DIRECT,
+                person_properties_mode=self._person_properties_mode,
                 _top_level=False,
             )
 
@@ -199,3 +233,16 @@ class ClickhousePersonQuery:
             return f"AND (({search_clause}) OR ({distinct_id_clause}))", params
 
         return "", {}
+
+
+def is_person_latest_ready() -> bool:
+    global person_latest_ready
+
+    person_latest_ready = person_latest_ready or _fetch_person_latest_ready_cached()
+    return person_latest_ready
+
+
+# :TRICKY: Like with person_distinct_id2, negative responses are cached for a minute and a positive one forever.
+@cache_for(timedelta(minutes=1))
+def _fetch_person_latest_ready_cached() -> bool:
+    return is_async_migration_complete("0010_fill_person_latest")
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Tuple
 
 from django.utils import timezone
 
@@ -6,11 +6,29 @@ from ee.clickhouse.client import sync_execute
 from ee.clickhouse.models.property import get_property_string_expr
 from ee.clickhouse.sql.events import SELECT_PROP_VALUES_SQL, SELECT_PROP_VALUES_SQL_WITH_FILTER
 from ee.clickhouse.sql.person import SELECT_PERSON_PROP_VALUES_SQL, SELECT_PERSON_PROP_VALUES_SQL_WITH_FILTER
+from ee.clickhouse.sql.property_values import (
+    HAS_PERSON_ROLLED_UP_PROP_VALUES_SQL,
+    HAS_ROLLED_UP_PROP_VALUES_SQL,
+    SELECT_PERSON_ROLLED_UP_PROP_VALUES_SQL,
+    SELECT_ROLLED_UP_PROP_VALUES_SQL,
+)
 from posthog.models.team import Team
 from posthog.utils import relative_date_parse
 
 
 def get_property_values_for_key(key: str, team: Team, value: Optional[str] = None):
+    rolled_up = _get_rolled_up_property_values(
+        SELECT_ROLLED_UP_PROP_VALUES_SQL,
+        HAS_ROLLED_UP_PROP_VALUES_SQL,
+        key,
+        team,
+        value,
+        limit=10,
+        last_seen_after=relative_date_parse("-7d").strftime("%Y-%m-%d 00:00:00"),
+    )
+    if rolled_up is not None:
+        return rolled_up
+
     property_field, _ = get_property_string_expr("events", key, "%(key)s", "properties")
     parsed_date_from = "AND timestamp >= '{}'".format(relative_date_parse("-7d").strftime("%Y-%m-%d 00:00:00"))
     parsed_date_to = "AND timestamp <= '{}'".format(timezone.now().strftime("%Y-%m-%d 23:59:59"))
@@ -31,6 +49,12 @@ def get_property_values_for_key(key: str, team: Team, value: Optional[str] = Non
 
 
 def get_person_property_values_for_key(key: str, team: Team, value: Optional[str] = None):
+    rolled_up = _get_rolled_up_property_values(
+        SELECT_PERSON_ROLLED_UP_PROP_VALUES_SQL, HAS_PERSON_ROLLED_UP_PROP_VALUES_SQL, key, team, value, limit=20
+    )
+    if rolled_up is not None:
+        return rolled_up
+
     property_field, _ = get_property_string_expr("person", key, "%(key)s", "properties")
 
     if value:
@@ -41,3 +65,25 @@ def get_person_property_values_for_key(key: str, team: Team, value: Optional[str
     return sync_execute(
         SELECT_PERSON_PROP_VALUES_SQL.format(property_field=property_field), {"team_id": team.pk, "key": key},
     )
+
+
+def _get_rolled_up_property_values(
+    query: str, has_values_query: str, key: str, team: Team, value: Optional[str], limit: int, **extra_params
+) -> Optional[List[Tuple[str, int]]]:
+    """
+    Serves suggestions from the `property_values` or `person_property_values` rollup, most frequent first.
+
+    Returns None if the rollup knows nothing about the key (e.g. it was last seen before the rollup existed and
+    the 0005_fill_property_values async migration hasn't run yet), in which case callers fall back to scanning the raw
+    table.
+    """
+    params = {"team_id": team.pk, "key": key, "limit": limit, **extra_params}
+    value_filter = ""
+    if value:
+        value_filter = "AND property_value ILIKE %(value)s"
+        params["value"] = "%{}%".format(value)
+
+    result = sync_execute(query.format(value_filter=value_filter), params)
+    if len(result) > 0 or len(sync_execute(has_values_query, params)) > 0:
+        return result
+    return None
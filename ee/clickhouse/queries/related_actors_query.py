@@ -10,7 +10,7 @@ from ee.clickhouse.queries.actor_base_query import (
     SerializedGroup,
     SerializedPerson,
     get_groups,
-    get_people,
+    get_people_by_ids,
 )
 from ee.clickhouse.queries.person_distinct_id_query import get_team_distinct_ids_query
 from posthog.models.filters.utils import validate_group_type_index
@@ -25,31 +25,33 @@ class RelatedActorsQuery:
     Two actors are considered related if they have had shared events in the past 90 days.
     """
 
+    RELATED_ACTORS_LIMIT = 100  # per actor type
+
     def __init__(self, team_id: int, group_type_index: Optional[Union[GroupTypeIndex, str]], id: str):
         self.team_id = team_id
         self.group_type_index = validate_group_type_index("group_type_index", group_type_index)
         self.id = id
 
     def run(self) -> List[SerializedActor]:
-        results: List[SerializedActor] = []
-        results.extend(self._query_related_people())
-        for group_type_mapping in GroupTypeMapping.objects.filter(team_id=self.team_id):
-            results.extend(self._query_related_groups(group_type_mapping.group_type_index))
-        return results
-
-    @property
-    def is_aggregating_by_groups(self) -> bool:
-        return self.group_type_index is not None
-
-    def _query_related_people(self) -> List[SerializedPerson]:
-        if not self.is_aggregating_by_groups:
+        group_type_indexes = [
+            group_type_mapping.group_type_index
+            for group_type_mapping in GroupTypeMapping.objects.filter(team_id=self.team_id).order_by("group_type_index")
+            if group_type_mapping.group_type_index != self.group_type_index
+        ]
+
+        # All related actors are collected in a single pass over events, capped per actor type
+        columns = [
+            f"groupUniqArrayIf(%(limit)s)($group_{index}, $group_{index} != '') AS group_{index}_keys"
+            for index in group_type_indexes
+        ]
+        if self.is_aggregating_by_groups:
+            columns.insert(0, "groupUniqArray(%(limit)s)(person_id) AS person_ids")
+        if not columns:
             return []
 
-        # :KLUDGE: We need to fetch distinct_id + person properties to be able to link to user properly.
-        person_ids = self._take_first(
-            sync_execute(
-                f"""
-            SELECT DISTINCT person_id
+        rows = sync_execute(
+            f"""
+            SELECT {", ".join(columns)}
             FROM events e
             {self._distinct_ids_join}
             WHERE team_id = %(team_id)s
@@ -57,45 +59,29 @@ class RelatedActorsQuery:
               AND timestamp < %(before)s
               AND {self._filter_clause}
             """,
-                self._params,
-            )
+            {**self._params, "limit": self.RELATED_ACTORS_LIMIT},
         )
+        related_actor_ids = list(rows[0]) if rows else [[] for _ in columns]
 
-        _, serialized_people = get_people(self.team_id, person_ids)
-        return serialized_people
-
-    def _query_related_groups(self, group_type_index: GroupTypeIndex) -> List[SerializedGroup]:
-        if group_type_index == self.group_type_index:
-            return []
+        results: List[SerializedActor] = []
+        if self.is_aggregating_by_groups:
+            results.extend(self._serialize_people(related_actor_ids.pop(0)))
+        for group_type_index, group_ids in zip(group_type_indexes, related_actor_ids):
+            results.extend(self._serialize_groups(group_type_index, group_ids))
+        return results
 
-        group_ids = self._take_first(
-            sync_execute(
-                f"""
-            SELECT DISTINCT $group_{group_type_index} AS group_key
-            FROM events e
-            {'' if self.is_aggregating_by_groups else self._distinct_ids_join}
-            JOIN (
-                SELECT group_key
-                FROM groups
-                WHERE team_id = %(team_id)s AND group_type_index = %(group_type_index)s
-                GROUP BY group_key
-            ) groups ON $group_{group_type_index} = groups.group_key
-            WHERE team_id = %(team_id)s
-              AND timestamp > %(after)s
-              AND timestamp < %(before)s
-              AND group_key != ''
-              AND {self._filter_clause}
-            ORDER BY group_key
-            """,
-                {**self._params, "group_type_index": group_type_index},
-            )
-        )
+    @property
+    def is_aggregating_by_groups(self) -> bool:
+        return self.group_type_index is not None
 
-        _, serialize_groups = get_groups(self.team_id, group_type_index, group_ids)
-        return serialize_groups
+    def _serialize_people(self, person_ids: List) -> List[SerializedPerson]:
+        # :KLUDGE: We need to fetch distinct_id + person properties to be able to link to user properly.
+        _, serialized_people = get_people_by_ids(self.team_id, person_ids)
+        return serialized_people
 
-    def _take_first(self, rows: List) -> List:
-        return [row[0] for row in rows]
+    def _serialize_groups(self, group_type_index: GroupTypeIndex, group_ids: List) -> List[SerializedGroup]:
+        _, serialized_groups = get_groups(self.team_id, group_type_index, sorted(group_ids))
+        return sorted(serialized_groups, key=lambda group: group["group_key"])
 
     @property
     def _filter_clause(self):
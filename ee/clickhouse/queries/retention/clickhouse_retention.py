@@ -1,5 +1,4 @@
 from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
-from urllib.parse import urlencode
 
 from ee.clickhouse.client import substitute_params, sync_execute
 from ee.clickhouse.queries.retention.retention_event_query import RetentionEventsQuery
@@ -7,6 +6,7 @@ from ee.clickhouse.sql.retention.retention import RETENTION_BREAKDOWN_SQL
 from posthog.constants import RETENTION_FIRST_TIME, RetentionQueryType
 from posthog.models.filters.retention_filter import RetentionFilter
 from posthog.models.team import Team
+from posthog.utils import PeopleUrlBuilder
 
 BreakdownValues = Tuple[Union[str, int], ...]
 CohortKey = NamedTuple("CohortKey", (("breakdown_values", BreakdownValues), ("period", int)))
@@ -35,12 +35,13 @@ class ClickhouseRetention:
             settings={"timeout_before_checking_execution_speed": 60},
         )
 
+        people_urls = self._people_url_builder(filter)
         result_dict = {
             CohortKey(tuple(breakdown_values), intervals_from_base): {
                 "count": count,
                 "people": [],
                 "people_url": self._construct_people_url_for_trend_breakdown_interval(
-                    filter=filter, breakdown_values=breakdown_values, selected_interval=intervals_from_base,
+                    people_urls, breakdown_values=breakdown_values, selected_interval=intervals_from_base,
                 ),
             }
             for (breakdown_values, intervals_from_base, count) in result
@@ -48,17 +49,19 @@ class ClickhouseRetention:
 
         return result_dict
 
+    def _people_url_builder(self, filter: RetentionFilter, base_uri: Optional[str] = None) -> PeopleUrlBuilder:
+        return PeopleUrlBuilder(f"{base_uri or self._base_uri}api/person/retention/", filter.to_params())
+
     def _construct_people_url_for_trend_breakdown_interval(
-        self, filter: RetentionFilter, selected_interval: int, breakdown_values: BreakdownValues,
+        self, people_urls: PeopleUrlBuilder, selected_interval: int, breakdown_values: BreakdownValues,
     ):
-        params = RetentionFilter(
-            {**filter._data, "breakdown_values": breakdown_values, "selected_interval": selected_interval}
-        ).to_params()
-        return f"{self._base_uri}api/person/retention/?{urlencode(params)}"
+        # A falsy `selected_interval` is left out of the params, as `RetentionFilter.to_dict` would
+        return people_urls.url({"breakdown_values": breakdown_values, "selected_interval": selected_interval or None})
 
     def process_breakdown_table_result(
         self, resultset: Dict[CohortKey, Dict[str, Any]], filter: RetentionFilter,
     ):
+        people_urls = self._people_url_builder(filter, base_uri="/")
         result = [
             {
                 "values": [
@@ -67,10 +70,7 @@ class ClickhouseRetention:
                 ],
                 "label": "::".join(map(str, breakdown_values)),
                 "breakdown_values": breakdown_values,
-                "people_url": (
-                    "/api/person/retention/?"
-                    f"{urlencode(RetentionFilter({**filter._data, 'display': 'ActionsTable', 'breakdown_values': breakdown_values}).to_params())}"
-                ),
+                "people_url": people_urls.url({"display": "ActionsTable", "breakdown_values": breakdown_values}),
             }
             for breakdown_values in set(cohort_key.breakdown_values for cohort_key in resultset.keys())
         ]
@@ -89,11 +89,10 @@ class ClickhouseRetention:
         want to have a result for each cohort between the specified date range.
         """
 
+        people_urls = self._people_url_builder(filter, base_uri="/")
+
         def construct_url(first_day):
-            params = RetentionFilter(
-                {**filter._data, "display": "ActionsTable", "breakdown_values": [first_day]}
-            ).to_params()
-            return "/api/person/retention/?" f"{urlencode(params)}"
+            return people_urls.url({"display": "ActionsTable", "breakdown_values": [first_day]})
 
         result = [
             {
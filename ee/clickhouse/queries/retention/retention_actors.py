@@ -1,7 +1,7 @@
 import dataclasses
 from typing import Dict, List, Optional, Tuple
 
-from ee.clickhouse.client import substitute_params, sync_execute
+from ee.clickhouse.client import substitute_params
 from ee.clickhouse.queries.actor_base_query import ActorBaseQuery
 from ee.clickhouse.queries.retention.clickhouse_retention import (
     BreakdownValues,
@@ -86,15 +86,11 @@ class ClickhouseRetentionActorsByPeriod(ActorBaseQuery):
             ),
         )
 
+        raw_result, _, serialized_actors = self.query_actors(actor_query, {})
         actor_appearances = [
-            AppearanceRow(actor_id=str(row[0]), appearance_count=len(row[1]), appearances=row[1])
-            for row in sync_execute(actor_query)
+            AppearanceRow(actor_id=str(row[0]), appearance_count=len(row[1]), appearances=row[1]) for row in raw_result
         ]
 
-        _, serialized_actors = self.get_actors_from_result(
-            [(actor_appearance.actor_id,) for actor_appearance in actor_appearances]
-        )
-
         actors_lookup = {str(actor["id"]): actor for actor in serialized_actors}
 
         return [
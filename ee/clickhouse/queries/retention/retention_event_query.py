@@ -3,6 +3,7 @@ from typing import Any, Dict, Literal, Optional, Tuple, Union, cast
 from ee.clickhouse.models.action import format_action_filter
 from ee.clickhouse.models.group import get_aggregation_target_field
 from ee.clickhouse.models.property import get_single_or_multi_property_string_expr
+from ee.clickhouse.queries.actor_activity import can_use_actor_activity, get_actor_activity_query
 from ee.clickhouse.queries.event_query import ClickhouseEventQuery
 from ee.clickhouse.queries.util import get_trunc_func_ch
 from posthog.constants import (
@@ -38,19 +39,28 @@ class RetentionEventsQuery(ClickhouseEventQuery):
         self._trunc_func = get_trunc_func_ch(self._filter.period)
 
     def get_query(self) -> Tuple[str, Dict[str, Any]]:
+        entity = (
+            self._filter.target_entity
+            if self._event_query_type == RetentionQueryType.TARGET
+            or self._event_query_type == RetentionQueryType.TARGET_FIRST_TIME
+            else self._filter.returning_entity
+        )
+        use_actor_activity = can_use_actor_activity(self._filter, entity, self._filter.period)
+
+        _fields = [self.get_timestamp_field()]
 
-        _fields = [
-            self.get_timestamp_field(),
-            (
+        # Rollup rows stand for all of an actor's events on a day, so there's no single event to point at
+        if not use_actor_activity:
+            _fields += [
                 f"argMin(e.uuid, {self._trunc_func}(e.timestamp)) as min_uuid"
                 if self._event_query_type == RetentionQueryType.TARGET_FIRST_TIME
                 else f"{self.EVENT_TABLE_ALIAS}.uuid AS uuid"
-            ),
-            (
-                f"argMin(e.event, {self._trunc_func}(e.timestamp)) as min_event"
-                if self._event_query_type == RetentionQueryType.TARGET_FIRST_TIME
-                else f"{self.EVENT_TABLE_ALIAS}.event AS event"
-            ),
+            ]
+
+        _fields += [
+            f"argMin(e.event, {self._trunc_func}(e.timestamp)) as min_event"
+            if self._event_query_type == RetentionQueryType.TARGET_FIRST_TIME
+            else f"{self.EVENT_TABLE_ALIAS}.event AS event"
         ]
 
         if self._aggregate_users_by_distinct_id and not self._filter.aggregation_group_type_index:
@@ -127,12 +137,7 @@ class RetentionEventsQuery(ClickhouseEventQuery):
 
         self.params.update(prop_params)
 
-        entity_query, entity_params = self._get_entity_query(
-            entity=self._filter.target_entity
-            if self._event_query_type == RetentionQueryType.TARGET
-            or self._event_query_type == RetentionQueryType.TARGET_FIRST_TIME
-            else self._filter.returning_entity
-        )
+        entity_query, entity_params = self._get_entity_query(entity=entity)
         self.params.update(entity_params)
 
         person_query, person_params = self._get_person_query()
@@ -141,8 +146,21 @@ class RetentionEventsQuery(ClickhouseEventQuery):
         groups_query, groups_params = self._get_groups_query()
         self.params.update(groups_params)
 
+        events_source = "events"
+        if use_actor_activity:
+            # First time retention needs to know about all earlier activity, so is only bounded by the query itself
+            events_source = "({})".format(
+                get_actor_activity_query(
+                    event_param=f"{self._event_query_type}_event",
+                    date_from=f"toDateTime(%({self._event_query_type}_start_date)s)"
+                    if self._event_query_type != RetentionQueryType.TARGET_FIRST_TIME
+                    else None,
+                    date_to=f"toDateTime(%({self._event_query_type}_end_date)s)",
+                )
+            )
+
         query = f"""
-            SELECT {','.join(_fields)} FROM events {self.EVENT_TABLE_ALIAS}
+            SELECT {','.join(_fields)} FROM {events_source} {self.EVENT_TABLE_ALIAS}
             {self._get_distinct_id_query()}
             {person_query}
             {groups_query}
@@ -7,7 +7,11 @@ from ee.clickhouse.models.property import get_property_string_expr, parse_prop_g
 from ee.clickhouse.models.util import PersonPropertiesMode
 from ee.clickhouse.queries.event_query import ClickhouseEventQuery
 from ee.clickhouse.queries.person_distinct_id_query import get_team_distinct_ids_query
-from posthog.constants import TREND_FILTER_TYPE_ACTIONS
+from ee.clickhouse.queries.session_recordings.summaries import (
+    is_session_event_summaries_ready,
+    is_session_recording_summaries_ready,
+)
+from posthog.constants import TREND_FILTER_TYPE_ACTIONS, TREND_FILTER_TYPE_EVENTS
 from posthog.models import Entity
 from posthog.models.filters.session_recordings_filter import SessionRecordingsFilter
 
@@ -27,6 +31,8 @@ class SessionRecordingQueryResult(NamedTuple):
 class ClickhouseSessionRecordingList(ClickhouseEventQuery):
     _filter: SessionRecordingsFilter
     SESSION_RECORDINGS_DEFAULT_LIMIT = 50
+    # How far events (and summary rows) are looked for beyond a recording's start time
+    RECORDING_TIME_SLACK = timedelta(hours=12)
 
     _core_events_query = """
         SELECT
@@ -66,16 +72,34 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
     _core_session_recordings_query = """
         SELECT
             session_id,
-            any(window_id) as window_id,
+            any(distinct_id) as distinct_id,
+            MIN(first_timestamp) AS start_time,
+            MAX(last_timestamp) AS end_time,
+            dateDiff('second', toDateTime(start_time), toDateTime(end_time)) as duration,
+            SUM(full_snapshot_count) as full_snapshots
+        FROM session_recording_summaries
+        WHERE
+            team_id = %(team_id)s
+            {recordings_timestamp_clause}
+        GROUP BY session_id
+        HAVING full_snapshots > 0
+        {recording_start_time_clause}
+        {duration_clause}
+    """
+
+    # Until the summaries have been backfilled, recordings are aggregated from their snapshots instead
+    _core_session_recording_events_query = """
+        SELECT
+            session_id,
+            any(distinct_id) as distinct_id,
             MIN(timestamp) AS start_time,
             MAX(timestamp) AS end_time,
-            dateDiff('second', toDateTime(MIN(timestamp)), toDateTime(MAX(timestamp))) as duration,
-            any(distinct_id) as distinct_id,
+            dateDiff('second', toDateTime(start_time), toDateTime(end_time)) as duration,
             SUM(has_full_snapshot) as full_snapshots
         FROM session_recording_events
         WHERE
             team_id = %(team_id)s
-            {events_timestamp_clause}
+            {recordings_timestamp_clause}
         GROUP BY session_id
         HAVING full_snapshots > 0
         {recording_start_time_clause}
@@ -109,8 +133,38 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
     GROUP BY session_recordings.session_id
     HAVING 1 = 1
     {event_filter_aggregate_having_clause}
-    ORDER BY start_time DESC
-    LIMIT %(limit)s OFFSET %(offset)s
+    ORDER BY start_time DESC, session_recordings.session_id DESC
+    LIMIT %(limit)s
+    {offset_clause}
+    """
+
+    # Sessions in which each of the filtered events happened. Events carrying a `$session_id` are looked up in the
+    # per-session event summaries, only events without one need matching against recordings by timestamp.
+    _session_ids_with_events_query: str = """
+        SELECT session_id
+        FROM (
+            SELECT session_id, event
+            FROM session_event_summaries
+            WHERE
+                team_id = %(team_id)s
+                AND event IN %(event_names)s
+                {summaries_timestamp_clause}
+            UNION ALL
+            SELECT session_recordings.session_id AS session_id, events.event AS event
+            FROM (
+                {core_events_query}
+            ) AS events
+            JOIN (
+                {core_recordings_query}
+            ) AS session_recordings
+            ON session_recordings.distinct_id = events.distinct_id
+            WHERE
+                events.timestamp >= session_recordings.start_time
+                AND events.timestamp <= session_recordings.end_time
+        )
+        GROUP BY session_id
+        HAVING 1 = 1
+        {event_filter_having_clause}
     """
 
     _session_recordings_query: str = """
@@ -131,9 +185,11 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
     WHERE 1 = 1
         {prop_filter_clause}
         {person_id_clause}
+        {session_ids_clause}
     GROUP BY session_recordings.session_id
-    ORDER BY start_time DESC
-    LIMIT %(limit)s OFFSET %(offset)s
+    ORDER BY start_time DESC, session_recordings.session_id DESC
+    LIMIT %(limit)s
+    {offset_clause}
     """
 
     @property
@@ -154,6 +210,14 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
     def _determine_should_join_events(self):
         return self._filter.entities and len(self._filter.entities) > 0
 
+    # Filtering on plain event names can be answered from the session event summaries, anything else (actions, event
+    # properties) needs the events themselves
+    def _can_use_session_event_summaries(self) -> bool:
+        return is_session_event_summaries_ready() and all(
+            entity.type == TREND_FILTER_TYPE_EVENTS and entity.id is not None and not entity.property_groups.values
+            for entity in self._filter.entities
+        )
+
     def _get_properties_select_clause(self) -> str:
         session_id_clause, _ = get_property_string_expr("events", "$session_id", "'$session_id'", "properties")
         clause = f""",
@@ -184,12 +248,21 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
         timestamp_params = {}
         if self._filter.date_from:
             timestamp_clause += "\nAND timestamp >= %(event_start_time)s"
-            timestamp_params["event_start_time"] = self._filter.date_from - timedelta(hours=12)
+            timestamp_params["event_start_time"] = self._filter.date_from - self.RECORDING_TIME_SLACK
         if self._filter.date_to:
             timestamp_clause += "\nAND timestamp <= %(event_end_time)s"
-            timestamp_params["event_end_time"] = self._filter.date_to + timedelta(hours=12)
+            timestamp_params["event_end_time"] = self._filter.date_to + self.RECORDING_TIME_SLACK
         return timestamp_clause, timestamp_params
 
+    # Summary rows are partial aggregates of a recording, so keep any which overlap the events time range
+    def _get_recordings_timestamp_clause(self) -> str:
+        timestamp_clause = ""
+        if self._filter.date_from:
+            timestamp_clause += "\nAND last_timestamp >= %(event_start_time)s"
+        if self._filter.date_to:
+            timestamp_clause += "\nAND first_timestamp <= %(event_end_time)s"
+        return timestamp_clause
+
     def _get_recording_start_time_clause(self) -> Tuple[str, Dict[str, Any]]:
         start_time_clause = ""
         start_time_params = {}
@@ -201,6 +274,29 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
             start_time_params["end_time"] = self._filter.date_to
         return start_time_clause, start_time_params
 
+    # Keyset pagination: only recordings which start before the previous page's last one are wanted, so the events
+    # and summary rows after that (plus slack for recordings spanning it) never need to be read
+    def _get_cursor_clauses(self) -> Tuple[str, str, str, Dict[str, Any]]:
+        if not self._filter.recordings_cursor:
+            return "", "", "", {}
+
+        before_start_time, before_session_id = self._filter.recordings_cursor
+        events_cursor_clause = "\nAND timestamp <= %(cursor_event_end_time)s"
+        recordings_cursor_clause = "\nAND first_timestamp <= %(cursor_event_end_time)s"
+        recording_cursor_clause = (
+            "\nAND (start_time, session_id) < (toDateTime64(%(before_start_time)s, 6, 'UTC'), %(before_session_id)s)"
+        )
+        return (
+            events_cursor_clause,
+            recordings_cursor_clause,
+            recording_cursor_clause,
+            {
+                "cursor_event_end_time": before_start_time + self.RECORDING_TIME_SLACK,
+                "before_start_time": before_start_time.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "before_session_id": before_session_id,
+            },
+        )
+
     def _get_duration_clause(self) -> Tuple[str, Dict[str, Any]]:
         duration_clause = ""
         duration_params = {}
@@ -261,9 +357,36 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
 
         return EventFiltersSQL(aggregate_select_clause, aggregate_having_clause, where_conditions, params,)
 
+    def _get_session_ids_with_events_clause(
+        self, core_recordings_query: str, events_timestamp_clause: str, summaries_timestamp_clause: str
+    ) -> Tuple[str, Dict[str, Any]]:
+        event_filter_having_clause = ""
+        params: Dict[str, Any] = {"event_names": list(dict.fromkeys(entity.id for entity in self._filter.entities))}
+        for index, entity in enumerate(self._filter.entities):
+            event_filter_having_clause += f"\nAND countIf(event = %(event_matcher_{index})s) > 0"
+            params[f"event_matcher_{index}"] = entity.id
+
+        session_id_clause, _ = get_property_string_expr("events", "$session_id", "'$session_id'", "properties")
+        core_events_query = self._core_events_query.format(
+            properties_select_clause=f", {session_id_clause} as session_id",
+            event_filter_where_conditions="AND event IN %(event_names)s AND empty(session_id)",
+            events_timestamp_clause=events_timestamp_clause,
+        )
+        session_ids_query = self._session_ids_with_events_query.format(
+            summaries_timestamp_clause=summaries_timestamp_clause,
+            core_events_query=core_events_query,
+            core_recordings_query=core_recordings_query,
+            event_filter_having_clause=event_filter_having_clause,
+        )
+        return f"AND session_recordings.session_id IN ({session_ids_query})", params
+
     def get_query(self) -> Tuple[str, Dict[str, Any]]:
-        offset = self._filter.offset or 0
-        base_params = {"team_id": self._team_id, "limit": self.limit + 1, "offset": offset}
+        base_params = {"team_id": self._team_id, "limit": self.limit + 1}
+        # Offsets are still accepted for older clients, but paging with the cursor is what keeps deep pages cheap
+        offset_clause = ""
+        if self._filter.offset:
+            offset_clause = "OFFSET %(offset)s"
+            base_params["offset"] = self._filter.offset
         person_query, person_query_params = self._get_person_query()
 
         prop_query, prop_params = self._get_prop_groups(self._filter.property_groups)
@@ -273,14 +396,34 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
         person_id_clause, person_id_params = self._get_person_id_clause()
         duration_clause, duration_params = self._get_duration_clause()
         properties_select_clause = self._get_properties_select_clause()
+        (
+            events_cursor_clause,
+            recordings_cursor_clause,
+            recording_cursor_clause,
+            cursor_params,
+        ) = self._get_cursor_clauses()
+
+        summaries_timestamp_clause = self._get_recordings_timestamp_clause() + recordings_cursor_clause
+        if is_session_recording_summaries_ready():
+            core_recordings_query = self._core_session_recordings_query.format(
+                recording_start_time_clause=recording_start_time_clause + recording_cursor_clause,
+                duration_clause=duration_clause,
+                recordings_timestamp_clause=summaries_timestamp_clause,
+            )
+        else:
+            core_recordings_query = self._core_session_recording_events_query.format(
+                recording_start_time_clause=recording_start_time_clause + recording_cursor_clause,
+                duration_clause=duration_clause,
+                recordings_timestamp_clause=events_timestamp_clause + events_cursor_clause,
+            )
 
-        core_recordings_query = self._core_session_recordings_query.format(
-            recording_start_time_clause=recording_start_time_clause,
-            duration_clause=duration_clause,
-            events_timestamp_clause=events_timestamp_clause,
-        )
+        session_ids_clause, session_ids_params = "", {}
+        if self._determine_should_join_events() and self._can_use_session_event_summaries():
+            session_ids_clause, session_ids_params = self._get_session_ids_with_events_clause(
+                core_recordings_query, events_timestamp_clause + events_cursor_clause, summaries_timestamp_clause
+            )
 
-        if not self._determine_should_join_events():
+        if not self._determine_should_join_events() or session_ids_clause:
             return (
                 self._session_recordings_query.format(
                     core_recordings_query=core_recordings_query,
@@ -288,6 +431,8 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
                     person_query=person_query,
                     prop_filter_clause=prop_query,
                     person_id_clause=person_id_clause,
+                    session_ids_clause=session_ids_clause,
+                    offset_clause=offset_clause,
                 ),
                 {
                     **base_params,
@@ -297,6 +442,8 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
                     **events_timestamp_params,
                     **duration_params,
                     **recording_start_time_params,
+                    **cursor_params,
+                    **session_ids_params,
                 },
             )
 
@@ -305,7 +452,7 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
         core_events_query = self._core_events_query.format(
             properties_select_clause=properties_select_clause,
             event_filter_where_conditions=event_filters.where_conditions,
-            events_timestamp_clause=events_timestamp_clause,
+            events_timestamp_clause=events_timestamp_clause + events_cursor_clause,
         )
 
         return (
@@ -319,6 +466,7 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
                 prop_filter_clause=prop_query,
                 person_id_clause=person_id_clause,
                 event_filter_aggregate_having_clause=event_filters.aggregate_having_clause,
+                offset_clause=offset_clause,
             ),
             {
                 **base_params,
@@ -328,6 +476,7 @@ class ClickhouseSessionRecordingList(ClickhouseEventQuery):
                 **events_timestamp_params,
                 **duration_params,
                 **recording_start_time_params,
+                **cursor_params,
                 **event_filters.params,
             },
         )
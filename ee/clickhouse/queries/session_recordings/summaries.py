@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from ee.clickhouse.materialized_columns.util import cache_for
+from posthog.models.async_migration import is_async_migration_complete
+from posthog.settings import BENCHMARK, TEST
+
+# The summaries only hold all recordings once 0007_fill_session_recording_summaries has backfilled them
+session_recording_summaries_ready = TEST or BENCHMARK
+# Likewise, session event summaries only hold events of all (unexpired) recordings once
+# 0008_fill_session_event_summaries has backfilled them
+session_event_summaries_ready = TEST or BENCHMARK
+
+
+def is_session_recording_summaries_ready() -> bool:
+    global session_recording_summaries_ready
+
+    session_recording_summaries_ready = (
+        session_recording_summaries_ready or _fetch_session_recording_summaries_ready_cached()
+    )
+    return session_recording_summaries_ready
+
+
+# :TRICKY: Like with person_distinct_id2, negative responses are cached for a minute and a positive one forever.
+@cache_for(timedelta(minutes=1))
+def _fetch_session_recording_summaries_ready_cached() -> bool:
+    return is_async_migration_complete("0007_fill_session_recording_summaries")
+
+
+def is_session_event_summaries_ready() -> bool:
+    global session_event_summaries_ready
+
+    session_event_summaries_ready = session_event_summaries_ready or _fetch_session_event_summaries_ready_cached()
+    return session_event_summaries_ready
+
+
+@cache_for(timedelta(minutes=1))
+def _fetch_session_event_summaries_ready_cached() -> bool:
+    return is_async_migration_complete("0008_fill_session_event_summaries")
@@ -1,12 +1,15 @@
+from unittest.mock import patch
 from uuid import uuid4
 
 from dateutil.relativedelta import relativedelta
 from freezegun.api import freeze_time
 
+from ee.clickhouse.client import sync_execute
 from ee.clickhouse.models.action import Action, ActionStep
 from ee.clickhouse.models.event import create_event
 from ee.clickhouse.models.session_recording_event import create_session_recording_event
 from ee.clickhouse.queries.session_recordings.clickhouse_session_recording_list import ClickhouseSessionRecordingList
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
 from ee.clickhouse.util import ClickhouseTestMixin, snapshot_clickhouse_queries
 from posthog.models import Cohort, Person
 from posthog.models.filters.session_recordings_filter import SessionRecordingsFilter
@@ -128,3 +131,78 @@ class TestClickhouseSessionRecordingsList(ClickhouseTestMixin, factory_session_r
         session_recording_list_instance = ClickhouseSessionRecordingList(filter=filter, team=self.team)
         (session_recordings, _) = session_recording_list_instance.run()
         self.assertEqual(len(session_recordings), 0)
+
+    @freeze_time("2021-01-21T20:00:00.000Z")
+    def test_event_filter_served_from_session_event_summaries(self):
+        Person.objects.create(team=self.team, distinct_ids=["user"], properties={"email": "bla"})
+        self.create_snapshot("user", "1", self.base_time, window_id="1")
+        self.create_snapshot("user", "1", self.base_time + relativedelta(seconds=30), window_id="1")
+        self.create_snapshot("user", "2", self.base_time + relativedelta(minutes=1), window_id="1")
+        self.create_snapshot("user", "2", self.base_time + relativedelta(minutes=2), window_id="1")
+        self.create_event("user", self.base_time, properties={"$session_id": "1"})
+        self.create_event("user", self.base_time, event_name="$autocapture", properties={"$session_id": "1"})
+        self.create_event("user", self.base_time + relativedelta(minutes=1), properties={"$session_id": "2"})
+        # Only the rolled up summaries are left to match recordings against
+        sync_execute(f"TRUNCATE TABLE {EVENTS_DATA_TABLE()}")
+
+        filter = SessionRecordingsFilter(
+            team=self.team,
+            data={
+                "events": [
+                    {"id": "$pageview", "type": "events", "order": 0, "name": "$pageview"},
+                    {"id": "$autocapture", "type": "events", "order": 1, "name": "$autocapture"},
+                ]
+            },
+        )
+        session_recording_list_instance = ClickhouseSessionRecordingList(filter=filter, team=self.team)
+        query, _ = session_recording_list_instance.get_query()
+        (session_recordings, _) = session_recording_list_instance.run()
+
+        self.assertIn("FROM session_event_summaries", query)
+        self.assertEqual([recording["session_id"] for recording in session_recordings], ["1"])
+
+        filter = SessionRecordingsFilter(
+            team=self.team, data={"events": [{"id": "$pageview", "type": "events", "order": 0, "name": "$pageview"}]},
+        )
+        session_recording_list_instance = ClickhouseSessionRecordingList(filter=filter, team=self.team)
+        (session_recordings, _) = session_recording_list_instance.run()
+        self.assertEqual([recording["session_id"] for recording in session_recordings], ["2", "1"])
+
+    @freeze_time("2021-01-21T20:00:00.000Z")
+    @patch("ee.clickhouse.queries.session_recordings.summaries.session_recording_summaries_ready", False)
+    def test_recordings_read_from_snapshots_until_summaries_are_backfilled(self):
+        Person.objects.create(team=self.team, distinct_ids=["user"], properties={"email": "bla"})
+        self.create_snapshot("user", "1", self.base_time)
+        self.create_snapshot("user", "1", self.base_time + relativedelta(seconds=30))
+        self.create_snapshot("user", "2", self.base_time + relativedelta(minutes=1))
+        # As if the snapshots were ingested before the summaries existed
+        sync_execute("TRUNCATE TABLE session_recording_summaries")
+
+        filter = SessionRecordingsFilter(team=self.team, data={"no_filter": None})
+        session_recording_list_instance = ClickhouseSessionRecordingList(filter=filter, team=self.team)
+        query, _ = session_recording_list_instance.get_query()
+        (session_recordings, _) = session_recording_list_instance.run()
+
+        self.assertNotIn("FROM session_recording_summaries", query)
+        self.assertEqual([recording["session_id"] for recording in session_recordings], ["2", "1"])
+        self.assertEqual(session_recordings[1]["duration"], 30)
+
+    @freeze_time("2021-01-21T20:00:00.000Z")
+    @patch("ee.clickhouse.queries.session_recordings.summaries.session_event_summaries_ready", False)
+    def test_event_filter_joins_events_until_session_event_summaries_are_backfilled(self):
+        Person.objects.create(team=self.team, distinct_ids=["user"], properties={"email": "bla"})
+        self.create_snapshot("user", "1", self.base_time, window_id="1")
+        self.create_snapshot("user", "2", self.base_time + relativedelta(minutes=1), window_id="1")
+        self.create_event("user", self.base_time, properties={"$session_id": "1"})
+        # As if the events were ingested before the summaries existed
+        sync_execute("TRUNCATE TABLE session_event_summaries")
+
+        filter = SessionRecordingsFilter(
+            team=self.team, data={"events": [{"id": "$pageview", "type": "events", "order": 0, "name": "$pageview"}]},
+        )
+        session_recording_list_instance = ClickhouseSessionRecordingList(filter=filter, team=self.team)
+        query, _ = session_recording_list_instance.get_query()
+        (session_recordings, _) = session_recording_list_instance.run()
+
+        self.assertNotIn("FROM session_event_summaries", query)
+        self.assertEqual([recording["session_id"] for recording in session_recordings], ["1"])
@@ -1,5 +1,4 @@
 import copy
-import urllib.parse
 from datetime import datetime
 from typing import Any, Dict, List
 
@@ -11,7 +10,7 @@ from sentry_sdk.api import capture_exception
 from ee.clickhouse.client import sync_execute
 from ee.clickhouse.queries.person_distinct_id_query import get_team_distinct_ids_query
 from ee.clickhouse.queries.stickiness.stickiness_actors import ClickhouseStickinessActors
-from ee.clickhouse.queries.stickiness.stickiness_event_query import StickinessEventsQuery
+from ee.clickhouse.queries.stickiness.stickiness_event_query import StickinessEntitiesEventsQuery, StickinessEventsQuery
 from ee.clickhouse.sql.person import GET_LATEST_PERSON_SQL, INSERT_COHORT_ALL_PEOPLE_SQL, PERSON_STATIC_COHORT_TABLE
 from posthog.constants import TREND_FILTER_TYPE_ACTIONS
 from posthog.models.action import Action
@@ -20,17 +19,26 @@ from posthog.models.entity import Entity
 from posthog.models.filters.stickiness_filter import StickinessFilter
 from posthog.models.team import Team
 from posthog.queries.base import handle_compare
-from posthog.utils import encode_get_request_params
+from posthog.utils import PeopleUrlBuilder
 
 
 class ClickhouseStickiness:
     def run(self, filter: StickinessFilter, team: Team, *args, **kwargs) -> List[Dict[str, Any]]:
-
-        response = []
         for entity in filter.entities:
             if entity.type == TREND_FILTER_TYPE_ACTIONS:
                 entity.name = Action.objects.only("name").get(team=team, pk=entity.id).name
 
+        # Entities counting the same kind of actor are computed in a single query rather than one per entity
+        if len(filter.entities) > 1 and len({entity.math_group_type_index for entity in filter.entities}) == 1:
+            response = handle_compare(filter=filter, func=self._serialize_entities, team=team, entities=filter.entities)
+            if filter.compare:
+                # Keep the current and previous series of each entity next to each other
+                current, previous = response[: len(response) // 2], response[len(response) // 2 :]
+                response = [series for pair in zip(current, previous) for series in pair]
+            return response
+
+        response = []
+        for entity in filter.entities:
             entity_resp = handle_compare(filter=filter, func=self._serialize_entity, team=team, entity=entity)
             response.extend(entity_resp)
         return response
@@ -48,6 +56,31 @@ class ClickhouseStickiness:
         counts = sync_execute(query, {**event_params, "num_intervals": filter.total_intervals})
         return self.process_result(counts, filter, entity)
 
+    def stickiness_for_entities(
+        self, entities: List[Entity], filter: StickinessFilter, team: Team
+    ) -> List[Dict[str, Any]]:
+        events_query, event_params = StickinessEntitiesEventsQuery(entities, filter, team).get_query()
+
+        # Zero filled in ClickHouse: `counts` maps num_intervals to the number of actors, and indexOf returns 0 (which
+        # reads the default value) for intervals no actor was active in
+        query = f"""
+        SELECT
+            entity_index,
+            arrayMap(day -> counts.2[indexOf(counts.1, day)], range(1, %(num_intervals)s)) AS data
+        FROM (
+            SELECT entity_index, sumMap([num_intervals], [toUInt64(1)]) AS counts FROM ({events_query})
+            WHERE num_intervals <= %(num_intervals)s
+            GROUP BY entity_index
+        )
+        """
+
+        data_by_entity = dict(sync_execute(query, {**event_params, "num_intervals": filter.total_intervals}))
+        empty_data = [0] * (filter.total_intervals - 1)
+        return [
+            self._format_result(data_by_entity.get(index, empty_data), filter, entity)
+            for index, entity in enumerate(entities)
+        ]
+
     def people(self, target_entity: Entity, filter: StickinessFilter, team: Team, request, *args, **kwargs):
         _, serialized_actors = ClickhouseStickinessActors(entity=target_entity, filter=filter, team=team).get_actors()
         return serialized_actors
@@ -57,12 +90,14 @@ class ClickhouseStickiness:
         for result in counts:
             response[result[1]] = result[0]
 
+        data = [response[day] if day in response else 0 for day in range(1, filter.total_intervals)]
+        return self._format_result(data, filter, entity)
+
+    def _format_result(self, data: List[int], filter: StickinessFilter, entity: Entity) -> Dict[str, Any]:
         labels = []
-        data = []
         for day in range(1, filter.total_intervals):
             label = "{} {}{}".format(day, filter.interval, "s" if day > 1 else "")
             labels.append(label)
-            data.append(response[day] if day in response else 0)
         filter_params = filter.to_params()
 
         return {
@@ -89,20 +124,32 @@ class ClickhouseStickiness:
         response.append(new_dict)
         return response
 
+    def _serialize_entities(self, entities: List[Entity], filter: StickinessFilter, team: Team) -> List[Dict[str, Any]]:
+        response = []
+        for entity, result in zip(entities, self.stickiness_for_entities(entities=entities, filter=filter, team=team)):
+            serialized: Dict[str, Any] = {
+                "action": entity.to_dict(),
+                "label": entity.name,
+                "count": 0,
+                "data": [],
+                "labels": [],
+                "days": [],
+            }
+            serialized.update(result)
+            response.append(serialized)
+        return response
+
     def _get_persons_url(self, filter: StickinessFilter, entity: Entity) -> List[Dict[str, Any]]:
         persons_url = []
+        people_urls = PeopleUrlBuilder("api/person/stickiness/", filter.to_params())
         for interval_idx in range(1, filter.total_intervals):
-            filter_params = filter.to_params()
             extra_params = {
                 "stickiness_days": interval_idx,
                 "entity_id": entity.id,
                 "entity_type": entity.type,
                 "entity_math": entity.math,
             }
-            parsed_params: Dict[str, str] = encode_get_request_params({**filter_params, **extra_params})
-            persons_url.append(
-                {"filter": extra_params, "url": f"api/person/stickiness/?{urllib.parse.urlencode(parsed_params)}",}
-            )
+            persons_url.append({"filter": extra_params, "url": people_urls.url(extra_params)})
         return persons_url
 
 
@@ -1,7 +1,10 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 from ee.clickhouse.models.action import format_action_filter
 from ee.clickhouse.models.group import get_aggregation_target_field
+from ee.clickhouse.models.property import parse_prop_grouped_clauses
+from ee.clickhouse.models.util import PersonPropertiesMode
+from ee.clickhouse.queries.actor_activity import can_use_actor_activity, get_actor_activity_query
 from ee.clickhouse.queries.event_query import ClickhouseEventQuery
 from ee.clickhouse.queries.util import get_trunc_func_ch
 from posthog.constants import TREND_FILTER_TYPE_ACTIONS, PropertyOperatorType
@@ -37,11 +40,21 @@ class StickinessEventsQuery(ClickhouseEventQuery):
         groups_query, groups_params = self._get_groups_query()
         self.params.update(groups_params)
 
+        events_source = "events"
+        if can_use_actor_activity(self._filter, self._entity, self._filter.interval):
+            events_source = "({})".format(
+                get_actor_activity_query(
+                    event_param="event",
+                    date_from="toDateTime(%(date_from)s)" if "date_from" in self.params else None,
+                    date_to="toDateTime(%(date_to)s)",
+                )
+            )
+
         query = f"""
             SELECT
                 {self.aggregation_target()} AS aggregation_target,
                 countDistinct({get_trunc_func_ch(self._filter.interval)}(toDateTime(timestamp))) as num_intervals
-            FROM events {self.EVENT_TABLE_ALIAS}
+            FROM {events_source} {self.EVENT_TABLE_ALIAS}
             {self._get_distinct_id_query()}
             {person_query}
             {groups_query}
@@ -67,3 +80,99 @@ class StickinessEventsQuery(ClickhouseEventQuery):
             return format_action_filter(team_id=self._team_id, action=self._entity.get_action())
         else:
             return "event = %(event)s", {"event": self._entity.id}
+
+
+class StickinessEntitiesEventsQuery(ClickhouseEventQuery):
+    """
+    Like `StickinessEventsQuery`, but for several entities sharing an aggregation target in a single scan. Rows are
+    tagged with the indexes of the entities whose conditions they match, so every (entity_index, aggregation_target)
+    pair comes out with its number of active intervals.
+    """
+
+    _entities: List[Entity]
+    _filter: StickinessFilter
+
+    def __init__(self, entities: List[Entity], *args, **kwargs):
+        self._entities = entities
+        super().__init__(*args, **kwargs)
+
+    def get_query(self) -> Tuple[str, Dict[str, Any]]:
+        prop_query, prop_params = self._get_prop_groups(self._filter.property_groups)
+        self.params.update(prop_params)
+
+        entity_conditions = [self._get_entity_condition(entity, index) for index, entity in enumerate(self._entities)]
+
+        date_query, date_params = self._get_date_filter()
+        self.params.update(date_params)
+
+        person_query, person_params = self._get_person_query()
+        self.params.update(person_params)
+
+        groups_query, groups_params = self._get_groups_query()
+        self.params.update(groups_params)
+
+        events_source = "events"
+        if all(can_use_actor_activity(self._filter, entity, self._filter.interval) for entity in self._entities):
+            self.params["events"] = tuple(entity.id for entity in self._entities)
+            events_source = "({})".format(
+                get_actor_activity_query(
+                    event_param="events",
+                    date_from="toDateTime(%(date_from)s)" if "date_from" in self.params else None,
+                    date_to="toDateTime(%(date_to)s)",
+                    multiple_events=True,
+                )
+            )
+
+        # :TRICKY: Entities can overlap (e.g. the same event with and without a property filter), so rather than
+        # picking the first matching entity with multiIf, rows are repeated for every entity they match.
+        query = f"""
+            SELECT
+                arrayJoin(arrayFilter(
+                    (index, matches) -> matches,
+                    range({len(self._entities)}),
+                    [{", ".join(entity_conditions)}]
+                )) AS entity_index,
+                {self.aggregation_target()} AS aggregation_target,
+                countDistinct({get_trunc_func_ch(self._filter.interval)}(toDateTime(timestamp))) as num_intervals
+            FROM {events_source} {self.EVENT_TABLE_ALIAS}
+            {self._get_distinct_id_query()}
+            {person_query}
+            {groups_query}
+            WHERE team_id = %(team_id)s
+              {date_query}
+              AND ({" OR ".join(entity_conditions)})
+              {prop_query}
+            GROUP BY entity_index, aggregation_target
+        """
+
+        return query, self.params
+
+    def _determine_should_join_distinct_ids(self) -> None:
+        self._should_join_distinct_ids = True
+
+    def aggregation_target(self):
+        return get_aggregation_target_field(
+            self._entities[0].math_group_type_index, self.EVENT_TABLE_ALIAS, self.DISTINCT_ID_TABLE_ALIAS
+        )
+
+    def _get_entity_condition(self, entity: Entity, index: int) -> str:
+        if entity.type == TREND_FILTER_TYPE_ACTIONS:
+            entity_query, entity_params = format_action_filter(
+                team_id=self._team_id, action=entity.get_action(), prepend=f"entity_{index}_action"
+            )
+        else:
+            entity_query, entity_params = f"event = %(entity_{index}_event)s", {f"entity_{index}_event": entity.id}
+        self.params.update(entity_params)
+
+        prop_query, prop_params = parse_prop_grouped_clauses(
+            team_id=self._team_id,
+            property_group=entity.property_groups,
+            prepend=f"entity_{index}",
+            table_name=self.EVENT_TABLE_ALIAS,
+            allow_denormalized_props=True,
+            person_properties_mode=PersonPropertiesMode.USING_PERSON_PROPERTIES_COLUMN,
+            person_id_joined_alias=f"{self.DISTINCT_ID_TABLE_ALIAS}.person_id",
+        )
+        self.params.update(prop_params)
+
+        return f"({entity_query} {prop_query})"
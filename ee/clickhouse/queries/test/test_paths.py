@@ -496,6 +496,41 @@ class TestClickhousePaths(ClickhouseTestMixin, paths_test_factory(ClickhousePath
             ],
         )
 
+    def test_person_paths_are_reused_across_path_variations(self):
+        self._create_sample_data_multiple_dropoffs()
+        data = {
+            "insight": INSIGHT_FUNNELS,
+            "date_from": "2021-05-01 00:00:00",
+            "date_to": "2021-05-07 00:00:00",
+        }
+        variations: List[Dict[str, Any]] = [
+            {},
+            {"path_groupings": ["between_step_1_*", "between_step_2_*", "step drop*"]},
+            {"start_point": "step two", "step_limit": 3},
+            {"end_point": "step three", "edge_limit": 2},
+        ]
+        expected = [
+            ClickhousePaths(team=self.team, filter=PathFilter(data={**data, **extra})).run() for extra in variations
+        ]
+
+        with self.settings(PATHS_PERSON_PATHS_CACHE_TTL=600), self.capture_select_queries() as queries:
+            results = [
+                ClickhousePaths(team=self.team, filter=PathFilter(data={**data, **extra})).run() for extra in variations
+            ]
+
+        for result, expected_result in zip(results, expected):
+            self.assertCountEqual(result, expected_result)
+        # Events are only read once, to fill person_paths
+        self.assertEqual(
+            sync_execute(
+                "SELECT uniq(fill_id) FROM person_paths WHERE team_id = %(team_id)s", {"team_id": self.team.pk}
+            )[0][0],
+            1,
+        )
+        for query in queries:
+            self.assertIn("FROM person_paths", query)
+            self.assertNotIn("FROM events", query)
+
     def test_path_by_grouping_replacement(self):
 
         Person.objects.create(distinct_ids=[f"user_1"], team=self.team)
@@ -1869,6 +1904,29 @@ class TestClickhousePaths(ClickhouseTestMixin, paths_test_factory(ClickhousePath
             ],
         )
 
+    def test_path_caps_events_in_session(self):
+        Person.objects.create(team_id=self.team.pk, distinct_ids=["fake"])
+        _create_all_events(
+            [
+                _create_event(
+                    properties={"$current_url": f"/{index}"},
+                    distinct_id="fake",
+                    event="$pageview",
+                    team=self.team,
+                    timestamp=f"2012-01-01 03:2{index}:34",
+                )
+                for index in range(1, 5)
+            ]
+        )
+
+        filter = PathFilter(data={"date_from": "2012-01-01"})
+        with self.settings(PATHS_MAX_EVENTS_IN_SESSION=2):
+            response = ClickhousePaths(team=self.team, filter=filter).run(team=self.team, filter=filter)
+
+        self.assertEqual(
+            response, [{"source": "1_/1", "target": "2_/2", "value": 1, "average_conversion_time": ONE_MINUTE}],
+        )
+
     def test_path_removes_duplicates(self):
         Person.objects.create(team_id=self.team.pk, distinct_ids=["fake"])
         p1 = [
@@ -2120,6 +2178,59 @@ class TestClickhousePaths(ClickhouseTestMixin, paths_test_factory(ClickhousePath
         )
         self.assertEqual(should_query_list(filter), (False, True))
 
+    def test_path_sample_rate(self):
+        for index in range(20):
+            # Persons move from one distinct_id to another mid path, which sampling must not split
+            Person.objects.create(team_id=self.team.pk, distinct_ids=[f"user_{index}", f"device_{index}"])
+            _create_all_events(
+                [
+                    _create_event(
+                        properties={"$current_url": "/1"},
+                        distinct_id=f"user_{index}",
+                        event="$pageview",
+                        team=self.team,
+                        timestamp="2012-01-01 03:21:34",
+                    ),
+                    _create_event(
+                        properties={"$current_url": "/2"},
+                        distinct_id=f"device_{index}",
+                        event="$pageview",
+                        team=self.team,
+                        timestamp="2012-01-01 03:22:34",
+                    ),
+                ]
+            )
+
+        filter = PathFilter(data={"path_sample_rate": 0.5, "date_from": "2012-01-01", "date_to": "2012-01-02"})
+        query, params = PathEventQuery(filter, self.team).get_query()
+        self.assertIn("cityHash64(pdi.person_id)", query)
+        self.assertEqual(params["path_sample_rate"], 0.5)
+
+        # Persons are sampled as a whole, so whoever is in the sample keeps their edge, which counts twice
+        sampled_persons = sync_execute(
+            """
+            SELECT uniq(person_id) FROM person_distinct_id2
+            WHERE team_id = %(team_id)s AND modulo(cityHash64(person_id), 1000000) < 1000000 * 0.5
+            """,
+            {"team_id": self.team.pk},
+        )[0][0]
+        response = ClickhousePaths(team=self.team, filter=filter).run(team=self.team, filter=filter)
+        self.assertEqual(
+            response,
+            [{"source": "1_/1", "target": "2_/2", "value": 2 * sampled_persons, "average_conversion_time": ONE_MINUTE}]
+            if sampled_persons
+            else [],
+        )
+
+        for sample_rate in [1, 5]:
+            filter = filter.with_data({"path_sample_rate": sample_rate})
+            query, _ = PathEventQuery(filter, self.team).get_query()
+            self.assertNotIn("cityHash64", query)
+            response = ClickhousePaths(team=self.team, filter=filter).run(team=self.team, filter=filter)
+            self.assertEqual(
+                response, [{"source": "1_/1", "target": "2_/2", "value": 20, "average_conversion_time": ONE_MINUTE}]
+            )
+
     def test_path_grouping_across_people(self):
 
         # P1 for pageview event /2/bar/1/foo
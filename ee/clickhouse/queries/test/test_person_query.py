@@ -1,7 +1,12 @@
+from datetime import datetime
+from unittest.mock import patch
+from uuid import UUID
+
 import pytest
 
 from ee.clickhouse.client import sync_execute
 from ee.clickhouse.materialized_columns import materialize
+from ee.clickhouse.models.person import create_person, delete_person
 from ee.clickhouse.queries.person_query import ClickhousePersonQuery
 from posthog.models.filters import Filter
 from posthog.models.person import Person
@@ -207,3 +212,36 @@ def test_person_query_with_entity_filters_and_property_group_filters(testdata, t
 
     assert person_query(team, filter, entity=filter.entities[0]) == snapshot
     assert run_query(team, filter, entity=filter.entities[0]) == {"rows": 2, "columns": 2}
+
+
+def test_person_query_reads_latest_version_of_persons(db, team):
+    changed_person = create_person(team_id=team.pk, properties={"$os": "windows"}, timestamp=datetime(2021, 1, 1))
+    create_person(team_id=team.pk, uuid=changed_person, properties={"$os": "Mac"}, timestamp=datetime(2021, 1, 2))
+    windows_person = create_person(team_id=team.pk, properties={"$os": "windows"}, timestamp=datetime(2021, 1, 1))
+    deleted_person = create_person(team_id=team.pk, properties={"$os": "windows"}, timestamp=datetime(2021, 1, 1))
+    delete_person(UUID(deleted_person), {"$os": "windows"}, False, team_id=team.pk)
+
+    filter = Filter(data={"properties": [{"key": "$os", "type": "person", "value": "windows", "operator": "exact"}]})
+    query, params = ClickhousePersonQuery(filter, team.pk).get_query()
+
+    assert "FROM person_latest" in query
+    assert sync_execute(query, {**params, "team_id": team.pk}) == [(UUID(windows_person),)]
+
+    filter = filter.with_data({"properties": [{"key": "$os", "type": "person", "value": "Mac", "operator": "exact"}]})
+    query, params = ClickhousePersonQuery(filter, team.pk).get_query()
+
+    assert sync_execute(query, {**params, "team_id": team.pk}) == [(UUID(changed_person),)]
+
+
+@patch("ee.clickhouse.queries.person_query.person_latest_ready", False)
+def test_person_query_reads_person_until_person_latest_is_backfilled(db, team):
+    windows_person = create_person(team_id=team.pk, properties={"$os": "windows"}, timestamp=datetime(2021, 1, 1))
+    create_person(team_id=team.pk, properties={"$os": "Mac"}, timestamp=datetime(2021, 1, 1))
+    # As if the persons were written before person_latest existed
+    sync_execute("TRUNCATE TABLE person_latest")
+
+    filter = Filter(data={"properties": [{"key": "$os", "type": "person", "value": "windows", "operator": "exact"}]})
+    query, params = ClickhousePersonQuery(filter, team.pk).get_query()
+
+    assert "FROM person_latest" not in query
+    assert sync_execute(query, {**params, "team_id": team.pk}) == [(UUID(windows_person),)]
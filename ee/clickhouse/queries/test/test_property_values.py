@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from uuid import uuid4
+
+from django.utils import timezone
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.models.event import create_event
+from ee.clickhouse.models.person import create_person, delete_person
+from ee.clickhouse.queries.property_values import get_person_property_values_for_key, get_property_values_for_key
+
+
+def _create_event(**kwargs):
+    pk = uuid4()
+    kwargs.update({"event_uuid": pk})
+    create_event(**kwargs)
+
+
+def _run_and_capture_queries(fn, *args, **kwargs):
+    with patch("ee.clickhouse.queries.property_values.sync_execute", wraps=sync_execute) as spy:
+        result = fn(*args, **kwargs)
+    return result, [call.args[0] for call in spy.call_args_list]
+
+
+def test_event_property_values_served_from_rollup(db, team):
+    for browser in ["Chrome", "Chrome", "Safari"]:
+        _create_event(team=team, event="$pageview", distinct_id="1", properties={"$browser": browser})
+    _create_event(
+        team=team,
+        event="$pageview",
+        distinct_id="1",
+        properties={"$browser": "Opera"},
+        timestamp=timezone.now() - timedelta(days=10),
+    )
+
+    result, queries = _run_and_capture_queries(get_property_values_for_key, "$browser", team)
+
+    assert result == [("Chrome", 2), ("Safari", 1)]
+    assert all("FROM property_values" in query for query in queries)
+
+    result, _ = _run_and_capture_queries(get_property_values_for_key, "$browser", team, "saf")
+    assert result == [("Safari", 1)]
+
+
+def test_event_property_values_fall_back_to_events_for_unknown_key(db, team):
+    _create_event(team=team, event="$pageview", distinct_id="1", properties={"$browser": "Chrome"})
+    # As if the event was ingested before the rollup existed
+    sync_execute("TRUNCATE TABLE property_values")
+
+    result, queries = _run_and_capture_queries(get_property_values_for_key, "$browser", team)
+
+    assert result == [("Chrome",)]
+    assert "property_values" not in queries[-1]
+
+
+def test_person_property_values_served_from_rollup(db, team):
+    create_person(team_id=team.pk, properties={"email": "a@posthog.com"})
+    create_person(team_id=team.pk, properties={"email": "b@posthog.com"})
+    create_person(team_id=team.pk, properties={"email": "b@posthog.com"})
+
+    result, queries = _run_and_capture_queries(get_person_property_values_for_key, "email", team)
+
+    assert result == [("b@posthog.com", 2), ("a@posthog.com", 1)]
+    assert all("FROM person_property_values" in query for query in queries)
+
+
+def test_person_property_values_only_count_latest_values(db, team):
+    changed_person = create_person(
+        team_id=team.pk, properties={"email": "old@posthog.com"}, timestamp=datetime(2021, 1, 1)
+    )
+    create_person(
+        team_id=team.pk, uuid=changed_person, properties={"email": "new@posthog.com"}, timestamp=datetime(2021, 1, 2)
+    )
+    create_person(team_id=team.pk, properties={"email": "new@posthog.com"}, timestamp=datetime(2021, 1, 2))
+    deleted_person = create_person(team_id=team.pk, properties={"email": "old@posthog.com"})
+    delete_person(deleted_person, {"email": "old@posthog.com"}, False, team_id=team.pk)
+
+    assert get_person_property_values_for_key("email", team) == [("new@posthog.com", 2)]
+    assert get_person_property_values_for_key("email", team, "old") == []
+
+
+def test_person_property_values_fall_back_to_persons_for_unknown_key(db, team):
+    create_person(team_id=team.pk, properties={"email": "a@posthog.com"})
+    # As if the person was ingested before the rollup existed
+    sync_execute("TRUNCATE TABLE person_property_values")
+
+    result, queries = _run_and_capture_queries(get_person_property_values_for_key, "email", team)
+
+    assert result == [("a@posthog.com", 1)]
+    assert "person_property_values" not in queries[-1]
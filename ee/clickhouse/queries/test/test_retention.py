@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from uuid import uuid4
 
 from ee.clickhouse.models.event import create_event
@@ -166,3 +167,40 @@ class TestClickhouseRetention(ClickhouseTestMixin, retention_test_factory(Clickh
 
         self.assertTrue(actor_result[1]["person"]["id"] == "org:5")
         self.assertEqual(actor_result[1]["appearances"], [1, 1, 1, 1, 1, 0, 0])
+
+    def test_retention_reads_actor_activity(self):
+        self._create_groups_and_events()
+
+        for retention_type in ["retention_recurring", "retention_first_time"]:
+            filter = RetentionFilter(
+                data={
+                    "date_to": self._date(10, month=1, hour=0),
+                    "period": "Week",
+                    "total_intervals": 7,
+                    "retention_type": retention_type,
+                },
+                team=self.team,
+            )
+
+            with self.settings(ACTOR_ACTIVITY_ROLLUP_ENABLED=False):
+                expected = ClickhouseRetention().run(filter, self.team)
+
+            with self.capture_select_queries() as queries:
+                result = ClickhouseRetention().run(filter, self.team)
+
+            self.assertEqual(self.pluck(result, "values", "count"), self.pluck(expected, "values", "count"))
+            self.assertIn("FROM actor_activity", queries[0])
+            self.assertNotIn("FROM events", queries[0])
+
+    @patch("ee.clickhouse.queries.actor_activity.actor_activity_ready", False)
+    def test_retention_reads_events_until_actor_activity_is_backfilled(self):
+        self._create_groups_and_events()
+
+        filter = RetentionFilter(
+            data={"date_to": self._date(10, month=1, hour=0), "period": "Week", "total_intervals": 7}, team=self.team,
+        )
+
+        with self.capture_select_queries() as queries:
+            ClickhouseRetention().run(filter, self.team)
+
+        self.assertNotIn("FROM actor_activity", queries[0])
@@ -1229,6 +1229,61 @@ class TestClickhouseTrends(ClickhouseTestMixin, trend_test_factory(ClickhouseTre
         response = ClickhouseTrends().run(filter, self.team)
         self.assertEqual(response[0]["count"], 1)
 
+    def test_multiple_entities_read_in_one_query(self):
+        Person.objects.create(team_id=self.team.pk, distinct_ids=["person1"], properties={"key": "value"})
+        Person.objects.create(team_id=self.team.pk, distinct_ids=["person2"])
+        for distinct_id, event, timestamp, properties in [
+            ("person1", "sign up", "2020-01-02T12:00:00Z", {"$browser": "Chrome"}),
+            ("person1", "sign up", "2020-01-03T12:00:00Z", {"$browser": "Safari"}),
+            ("person2", "sign up", "2020-01-03T12:00:00Z", {"$browser": "Chrome"}),
+            ("person2", "$pageview", "2020-01-04T12:00:00Z", {}),
+        ]:
+            _create_event(
+                event=event, distinct_id=distinct_id, team=self.team, timestamp=timestamp, properties=properties
+            )
+        action = _create_action(team=self.team, name="sign up")
+
+        for math in [None, "dau"]:
+            filter = Filter(
+                data={
+                    "date_from": "2020-01-01T00:00:00Z",
+                    "date_to": "2020-01-05T00:00:00Z",
+                    "compare": True,
+                    "events": [
+                        {"id": "sign up", "order": 0, "math": math},
+                        # Overlaps with the first series
+                        {
+                            "id": "sign up",
+                            "order": 1,
+                            "math": math,
+                            "properties": [{"key": "$browser", "value": "Chrome"}],
+                        },
+                        {"id": "$pageview", "order": 2, "math": math},
+                        {
+                            "id": "sign up",
+                            "order": 3,
+                            "math": math,
+                            "properties": [{"key": "key", "value": "value", "type": "person"}],
+                        },
+                    ],
+                    "actions": [{"id": action.pk, "order": 4, "math": math}],
+                },
+                team=self.team,
+            )
+
+            with self.settings(TRENDS_COMBINE_ENTITIES=False):
+                expected = ClickhouseTrends().run(filter, self.team)
+
+            with self.capture_select_queries() as queries:
+                response = ClickhouseTrends().run(filter, self.team)
+
+            # One query for the current and one for the previous period
+            self.assertEqual(len(queries), 2)
+            self.assertEqual(
+                [(series["label"], series["compare_label"], series["data"]) for series in response],
+                [(series["label"], series["compare_label"], series["data"]) for series in expected],
+            )
+
     @patch("ee.clickhouse.queries.trends.clickhouse_trends.sync_execute")
     def test_should_throw_exception(self, patch_sync_execute):
         self._create_events()
@@ -1,13 +1,16 @@
 from datetime import datetime
-from uuid import uuid4
+from unittest.mock import patch
+from uuid import UUID, uuid4
 
 import pytz
 from freezegun.api import freeze_time
 
 from ee.clickhouse.client import sync_execute
 from ee.clickhouse.models.event import create_event
+from ee.clickhouse.models.person import create_person_distinct_id, delete_person
 from ee.clickhouse.queries.breakdown_props import _parse_breakdown_cohorts
 from ee.clickhouse.queries.util import get_earliest_timestamp
+from ee.clickhouse.sql.events import TRUNCATE_EARLIEST_TIMESTAMPS_TABLE_SQL
 from posthog.models.action import Action
 from posthog.models.action_step import ActionStep
 from posthog.models.cohort import Cohort
@@ -33,6 +36,31 @@ def test_get_earliest_timestamp(db, team):
     assert get_earliest_timestamp(team.id) == datetime(2015, 1, 1, 1, tzinfo=pytz.UTC)
 
 
+@freeze_time("2021-01-21")
+def test_get_earliest_timestamp_moves_with_ingested_and_deleted_events(db, team):
+    person_id = str(uuid4())
+    create_person_distinct_id(team_id=team.pk, distinct_id="old", person_id=person_id)
+    _create_event(team=team, event="sign up", distinct_id="1", timestamp="2020-01-04T14:10:00Z")
+
+    assert get_earliest_timestamp(team.id) == datetime(2020, 1, 4, 14, 10, tzinfo=pytz.UTC)
+
+    _create_event(team=team, event="sign up", distinct_id="old", timestamp="2019-06-01T00:00:00Z")
+    assert get_earliest_timestamp(team.id) == datetime(2019, 6, 1, tzinfo=pytz.UTC)
+
+    delete_person(UUID(person_id), {}, False, delete_events=True, team_id=team.pk)
+    assert get_earliest_timestamp(team.id) == datetime(2020, 1, 4, 14, 10, tzinfo=pytz.UTC)
+
+
+@freeze_time("2021-01-21")
+@patch("ee.clickhouse.queries.util.earliest_timestamps_ready", False)
+def test_get_earliest_timestamp_reads_events_until_earliest_timestamps_are_backfilled(db, team):
+    _create_event(team=team, event="sign up", distinct_id="1", timestamp="2020-01-04T14:10:00Z")
+    # As if the event was ingested before events_earliest_timestamps existed
+    sync_execute(TRUNCATE_EARLIEST_TIMESTAMPS_TABLE_SQL())
+
+    assert get_earliest_timestamp(team.id) == datetime(2020, 1, 4, 14, 10, tzinfo=pytz.UTC)
+
+
 @freeze_time("2021-01-21")
 def test_get_earliest_timestamp_with_no_events(db, team):
     assert get_earliest_timestamp(team.id) == datetime(2021, 1, 14, tzinfo=pytz.UTC)
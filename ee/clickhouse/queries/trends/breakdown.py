@@ -1,4 +1,3 @@
-import urllib.parse
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 from ee.clickhouse.models.action import format_action_filter
@@ -14,20 +13,31 @@ from ee.clickhouse.queries.column_optimizer import ColumnOptimizer
 from ee.clickhouse.queries.groups_join_query import GroupsJoinQuery
 from ee.clickhouse.queries.person_distinct_id_query import get_team_distinct_ids_query
 from ee.clickhouse.queries.person_query import ClickhousePersonQuery
-from ee.clickhouse.queries.trends.util import enumerate_time_range, get_active_user_params, parse_response, process_math
+from ee.clickhouse.queries.trends.util import (
+    ResponseDateFormatter,
+    enumerate_time_range,
+    get_active_user_params,
+    parse_response,
+    process_math,
+)
 from ee.clickhouse.queries.util import date_from_clause, get_time_diff, get_trunc_func_ch, parse_timestamps
 from ee.clickhouse.sql.events import EVENT_JOIN_PERSON_SQL
 from ee.clickhouse.sql.trends.breakdown import (
     BREAKDOWN_ACTIVE_USER_CONDITIONS_SQL,
     BREAKDOWN_ACTIVE_USER_INNER_SQL,
     BREAKDOWN_AGGREGATE_QUERY_SQL,
+    BREAKDOWN_AGGREGATE_SINGLE_PASS_QUERY_SQL,
     BREAKDOWN_COHORT_JOIN_SQL,
     BREAKDOWN_CUMULATIVE_INNER_SQL,
     BREAKDOWN_INNER_SQL,
+    BREAKDOWN_PROP_FILTER_SQL,
     BREAKDOWN_PROP_JOIN_SQL,
     BREAKDOWN_QUERY_SQL,
+    BREAKDOWN_SINGLE_PASS_INNER_SQL,
+    BREAKDOWN_SINGLE_PASS_QUERY_SQL,
 )
 from posthog.constants import (
+    BREAKDOWN_VALUES_LIMIT,
     MONTHLY_ACTIVE,
     TREND_FILTER_TYPE_ACTIONS,
     TRENDS_CUMULATIVE,
@@ -38,7 +48,7 @@ from posthog.constants import (
 from posthog.models.entity import Entity
 from posthog.models.filters import Filter
 from posthog.models.team import Team
-from posthog.utils import encode_get_request_params
+from posthog.utils import PeopleUrlBuilder
 
 
 class ClickhouseTrendsBreakdown:
@@ -95,15 +105,19 @@ class ClickhouseTrendsBreakdown:
         }
 
         _params, _breakdown_filter_params = {}, {}
+        # Breakdown values are ranked by event count for DAU
+        rank_operation = "count(*)" if self.entity.math == "dau" else aggregate_operation
 
         if self.filter.breakdown_type == "cohort":
             _params, breakdown_filter, _breakdown_filter_params, breakdown_value = self._breakdown_cohort_params()
+        elif self._is_single_pass:
+            _params, breakdown_filter, _breakdown_filter_params, breakdown_value = self._breakdown_single_pass_params()
         else:
             _params, breakdown_filter, _breakdown_filter_params, breakdown_value = self._breakdown_prop_params(
-                "count(*)" if self.entity.math == "dau" else aggregate_operation, math_params,
+                rank_operation, math_params,
             )
 
-        if len(_params["values"]) == 0:
+        if not self._is_single_pass and len(_params["values"]) == 0:
             # If there are no breakdown values, we are sure that there's no relevant events, so instead of adjusting
             # a "real" SELECT for this, we only include the below dummy SELECT.
             # It's a drop-in replacement for a "real" one, simply always returning 0 rows.
@@ -128,11 +142,14 @@ class ClickhouseTrendsBreakdown:
         self.params = {**self.params, **_params, **person_join_params, **groups_join_params}
 
         if self.filter.display in TRENDS_DISPLAY_BY_VALUE:
-            content_sql = BREAKDOWN_AGGREGATE_QUERY_SQL.format(
+            content_sql = (
+                BREAKDOWN_AGGREGATE_SINGLE_PASS_QUERY_SQL if self._is_single_pass else BREAKDOWN_AGGREGATE_QUERY_SQL
+            ).format(
                 breakdown_filter=breakdown_filter,
                 person_join=person_join_condition,
                 groups_join=groups_join_condition,
                 aggregate_operation=aggregate_operation,
+                rank_operation=rank_operation,
                 breakdown_value=breakdown_value,
             )
             time_range = enumerate_time_range(self.filter, seconds_in_interval)
@@ -172,24 +189,39 @@ class ClickhouseTrendsBreakdown:
                     **breakdown_filter_params,
                 )
             else:
-                inner_sql = BREAKDOWN_INNER_SQL.format(
+                inner_sql = (BREAKDOWN_SINGLE_PASS_INNER_SQL if self._is_single_pass else BREAKDOWN_INNER_SQL).format(
                     breakdown_filter=breakdown_filter,
                     person_join=person_join_condition,
                     groups_join=groups_join_condition,
                     aggregate_operation=aggregate_operation,
+                    rank_operation=rank_operation,
                     interval_annotation=interval_annotation,
                     breakdown_value=breakdown_value,
                 )
 
-            breakdown_query = BREAKDOWN_QUERY_SQL.format(
+            breakdown_query = (BREAKDOWN_SINGLE_PASS_QUERY_SQL if self._is_single_pass else BREAKDOWN_QUERY_SQL).format(
                 interval=interval_annotation, num_intervals=num_intervals, inner_sql=inner_sql,
             )
             self.params.update(
-                {"seconds_in_interval": seconds_in_interval, "num_intervals": num_intervals, }
+                {"seconds_in_interval": seconds_in_interval, "num_intervals": num_intervals,}
             )
 
             return breakdown_query, self.params, self._parse_trend_result(self.filter, self.entity)
 
+    @property
+    def _is_single_pass(self) -> bool:
+        """
+        Whether the top breakdown values are picked in the same query as the series, rather than queried up front.
+
+        Active user and cumulative DAU series aren't aggregated per breakdown value and interval in a single GROUP BY,
+        so these still query the top values first.
+        """
+        return (
+            self.filter.breakdown_type != "cohort"
+            and self.entity.math not in [WEEKLY_ACTIVE, MONTHLY_ACTIVE]
+            and not (self.filter.display == TRENDS_CUMULATIVE and self.entity.math == "dau")
+        )
+
     def _breakdown_cohort_params(self):
         cohort_queries, cohort_ids, cohort_params = format_breakdown_cohort_join_query(
             self.team_id, self.filter, entity=self.entity
@@ -209,7 +241,26 @@ class ClickhouseTrendsBreakdown:
             extra_params=math_params,
             column_optimizer=self.column_optimizer,
         )
+        breakdown_value = self._breakdown_prop_value_expr()
+
+        return (
+            {"values": values_arr},
+            BREAKDOWN_PROP_JOIN_SQL,
+            {"breakdown_value_expr": breakdown_value},
+            breakdown_value,
+        )
 
+    def _breakdown_single_pass_params(self):
+        breakdown_value = self._breakdown_prop_value_expr()
+
+        return (
+            {"limit": BREAKDOWN_VALUES_LIMIT, "offset": self.filter.offset},
+            BREAKDOWN_PROP_FILTER_SQL,
+            {},
+            breakdown_value,
+        )
+
+    def _breakdown_prop_value_expr(self) -> str:
         # :TRICKY: We only support string breakdown for event/person properties
         assert isinstance(self.filter.breakdown, str)
 
@@ -221,35 +272,27 @@ class ClickhouseTrendsBreakdown:
         else:
             breakdown_value, _ = get_property_string_expr("events", self.filter.breakdown, "%(key)s", "properties")
 
-        return (
-            {"values": values_arr},
-            BREAKDOWN_PROP_JOIN_SQL,
-            {"breakdown_value_expr": breakdown_value},
-            breakdown_value,
-        )
+        return breakdown_value
 
     def _parse_single_aggregate_result(
         self, filter: Filter, entity: Entity, additional_values: Dict[str, Any]
     ) -> Callable:
         def _parse(result: List) -> List:
             parsed_results = []
+            filter_params = filter.to_params()
+            people_urls = PeopleUrlBuilder(f"api/projects/{self.team_id}/actions/people/", filter_params)
             for idx, stats in enumerate(result):
                 result_descriptors = self._breakdown_result_descriptors(stats[1], filter, entity)
-                filter_params = filter.to_params()
                 extra_params = {
                     "entity_id": entity.id,
                     "entity_type": entity.type,
                     "breakdown_value": result_descriptors["breakdown_value"],
                     "breakdown_type": filter.breakdown_type or "event",
                 }
-                parsed_params: Dict[str, str] = encode_get_request_params({**filter_params, **extra_params})
                 parsed_result = {
                     "aggregated_value": stats[0],
                     "filter": filter_params,
-                    "persons": {
-                        "filter": extra_params,
-                        "url": f"api/projects/{self.team_id}/actions/people/?{urllib.parse.urlencode(parsed_params)}",
-                    },
+                    "persons": {"filter": extra_params, "url": people_urls.url(extra_params)},
                     **result_descriptors,
                     **additional_values,
                 }
@@ -262,18 +305,20 @@ class ClickhouseTrendsBreakdown:
     def _parse_trend_result(self, filter: Filter, entity: Entity) -> Callable:
         def _parse(result: List) -> List:
             parsed_results = []
-            for idx, stats in enumerate(result):
+            date_formatter = ResponseDateFormatter(filter)
+            filter_dict = filter.to_dict()
+            for stats in result:
                 result_descriptors = self._breakdown_result_descriptors(stats[2], filter, entity)
-                parsed_result = parse_response(stats, filter, result_descriptors)
+                parsed_result = parse_response(stats, filter, result_descriptors, date_formatter)
                 parsed_result.update(
                     {
                         "persons_urls": self._get_persons_url(
                             filter, entity, self.team_id, parsed_result["days"], result_descriptors["breakdown_value"]
-                        )
+                        ),
+                        "filter": filter_dict,
                     }
                 )
                 parsed_results.append(parsed_result)
-                parsed_result.update({"filter": filter.to_dict()})
             return sorted(parsed_results, key=lambda x: 0 if x.get("breakdown_value") != "all" else 1)
 
         return _parse
@@ -282,8 +327,8 @@ class ClickhouseTrendsBreakdown:
         self, filter: Filter, entity: Entity, team_id: int, dates: List[str], breakdown_value: Union[str, int]
     ) -> List[Dict[str, Any]]:
         persons_url = []
+        people_urls = PeopleUrlBuilder(f"api/projects/{team_id}/actions/people/", filter.to_params())
         for date in dates:
-            filter_params = filter.to_params()
             extra_params = {
                 "entity_id": entity.id,
                 "entity_type": entity.type,
@@ -293,13 +338,7 @@ class ClickhouseTrendsBreakdown:
                 "breakdown_value": breakdown_value,
                 "breakdown_type": filter.breakdown_type or "event",
             }
-            parsed_params: Dict[str, str] = encode_get_request_params({**filter_params, **extra_params})
-            persons_url.append(
-                {
-                    "filter": extra_params,
-                    "url": f"api/projects/{team_id}/actions/people/?{urllib.parse.urlencode(parsed_params)}",
-                }
-            )
+            persons_url.append({"filter": extra_params, "url": people_urls.url(extra_params)})
         return persons_url
 
     def _breakdown_result_descriptors(self, breakdown_value, filter: Filter, entity: Entity):
@@ -341,14 +380,13 @@ class ClickhouseTrendsBreakdown:
         # people, it speeds it up from taking 10s to about 0.5s in a 8vCPU,
         # 128GB memory server
         distinct_ids_query = get_team_distinct_ids_query(
-            self.team_id,
-            extra_where=f"AND distinct_id IN (SELECT distinct_id FROM event WHERE {extra_where})"
-        )
-        event_join = EVENT_JOIN_PERSON_SQL.format(
-            GET_TEAM_PERSON_DISTINCT_IDS=distinct_ids_query
+            self.team_id, extra_where=f"AND distinct_id IN (SELECT distinct_id FROM event WHERE {extra_where})"
         )
+        event_join = EVENT_JOIN_PERSON_SQL.format(GET_TEAM_PERSON_DISTINCT_IDS=distinct_ids_query)
         if person_query.is_used:
-            query, params = person_query.get_query(extra_where=f"AND id IN (SELECT person_id FROM ({distinct_ids_query}))")
+            query, params = person_query.get_query(
+                extra_where=f"AND id IN (SELECT person_id FROM ({distinct_ids_query}))"
+            )
             return (
                 f"""
             {event_join}
@@ -1,23 +1,22 @@
-import copy
-import threading
 from itertools import accumulate
-from typing import Any, Callable, Dict, List, Tuple, Union, cast
+from typing import Any, Callable, Dict, List, Tuple
 
 from django.db.models.query import Prefetch
 from django.utils import timezone
 
-from ee.clickhouse.client import sync_execute
+from ee.clickhouse.executor import execute_concurrently
 from ee.clickhouse.queries.trends.breakdown import ClickhouseTrendsBreakdown
 from ee.clickhouse.queries.trends.formula import ClickhouseTrendsFormula
 from ee.clickhouse.queries.trends.lifecycle import ClickhouseLifecycle
 from ee.clickhouse.queries.trends.total_volume import ClickhouseTrendsTotalVolume
+from ee.clickhouse.queries.trends.util import can_combine_entities
 from posthog.constants import TREND_FILTER_TYPE_ACTIONS, TRENDS_CUMULATIVE, TRENDS_LIFECYCLE
 from posthog.models.action import Action
 from posthog.models.action_step import ActionStep
 from posthog.models.entity import Entity
 from posthog.models.filters import Filter
 from posthog.models.team import Team
-from posthog.queries.base import handle_compare
+from posthog.queries.base import convert_to_comparison, determine_compared_filter
 from posthog.utils import relative_date_parse
 
 
@@ -42,55 +41,49 @@ class ClickhouseTrends(ClickhouseTrendsTotalVolume, ClickhouseLifecycle, Clickho
 
         return sql, params, parse_function
 
-    def _run_query(self, filter: Filter, entity: Entity, team: Team) -> List[Dict[str, Any]]:
-        sql, params, parse_function = self._get_sql_for_entity(filter, entity, team)
-        result = sync_execute(sql, params)
-
-        result = parse_function(result)
-        serialized_data = self._format_serialized(entity, result)
-
-        if filter.display == TRENDS_CUMULATIVE:
-            serialized_data = self._handle_cumulative(serialized_data)
-        return serialized_data
-
-    def _run_query_for_threading(self, result: List, index: int, sql, params):
-        result[index] = sync_execute(sql, params)
-
-    def _run_parallel(self, filter: Filter, team: Team) -> List[Dict[str, Any]]:
-        result: List[Union[None, List[Dict[str, Any]]]] = [None] * len(filter.entities)
-        parse_functions: List[Union[None, Callable]] = [None] * len(filter.entities)
-        jobs = []
-
-        for entity in filter.entities:
+    def _run_queries(self, jobs: List[Tuple[Filter, Entity]], team: Team) -> List[List[Dict[str, Any]]]:
+        queries, parse_functions = [], []
+        for filter, entity in jobs:
             sql, params, parse_function = self._get_sql_for_entity(filter, entity, team)
-            parse_functions[entity.index] = parse_function
-            thread = threading.Thread(target=self._run_query_for_threading, args=(result, entity.index, sql, params),)
-            jobs.append(thread)
+            queries.append((sql, params))
+            parse_functions.append(parse_function)
 
-        # Start the threads (i.e. calculate the random number lists)
-        for j in jobs:
-            j.start()
-
-        # Ensure all of the threads have finished
-        for j in jobs:
-            j.join()
-
-        # Parse results for each thread
-        for entity in filter.entities:
-            serialized_data = cast(List[Callable], parse_functions)[entity.index](result[entity.index])
-            serialized_data = self._format_serialized(entity, serialized_data)
+        results = []
+        for (filter, entity), parse_function, result in zip(jobs, parse_functions, execute_concurrently(queries)):
+            serialized_data = self._format_serialized(entity, parse_function(result))
 
             if filter.display == TRENDS_CUMULATIVE:
                 serialized_data = self._handle_cumulative(serialized_data)
-            result[entity.index] = serialized_data
-
-        # flatten results
-        flat_results: List[Dict[str, Any]] = []
-        for item in result:
-            for flat in cast(List[Dict[str, Any]], item):
-                flat_results.append(flat)
-
-        return flat_results
+            results.append(serialized_data)
+        return results
+
+    def _run_combined_queries(
+        self, period_filters: List[Filter], entities: List[Entity], team: Team
+    ) -> List[List[Dict[str, Any]]]:
+        queries, parse_functions = [], []
+        for filter in period_filters:
+            sql, params, parse_function = self._total_volume_entities_query(entities, filter, team)
+            queries.append((sql, params))
+            parse_functions.append(parse_function)
+
+        results_by_period = [
+            parse_function(result) for parse_function, result in zip(parse_functions, execute_concurrently(queries))
+        ]
+
+        # Same order as `_run_queries`: every period of the first entity, then every period of the next one and so on
+        results = []
+        for entity_index, entity in enumerate(entities):
+            for filter, entity_results in zip(period_filters, results_by_period):
+                serialized_data = self._format_serialized(entity, entity_results[entity_index])
+
+                if filter.display == TRENDS_CUMULATIVE:
+                    serialized_data = self._handle_cumulative(serialized_data)
+                results.append(serialized_data)
+        return results
+
+    def _run_formula_queries(self, filters: List[Filter], team: Team) -> List[List[Dict[str, Any]]]:
+        results = execute_concurrently([self._get_formula_query(filter, team) for filter in filters])
+        return [self._parse_formula_result(filter, result) for filter, result in zip(filters, results)]
 
     def run(self, filter: Filter, team: Team, *args, **kwargs) -> List[Dict[str, Any]]:
         actions = Action.objects.filter(team_id=team.pk).order_by("-id")
@@ -99,44 +92,43 @@ class ClickhouseTrends(ClickhouseTrendsTotalVolume, ClickhouseLifecycle, Clickho
         actions = actions.prefetch_related(Prefetch("steps", queryset=ActionStep.objects.order_by("id")))
 
         filter = self._set_default_dates(filter, team.pk)
+        # The compared period is queried alongside the current one, rather than after it
+        period_filters = [filter, determine_compared_filter(filter)] if filter.compare else [filter]
 
         if filter.formula:
-            return handle_compare(filter, self._run_formula_query, team)
-
-        for entity in filter.entities:
-            if entity.type == TREND_FILTER_TYPE_ACTIONS:
-                try:
-                    entity.name = actions.get(id=entity.id).name
-                except Action.DoesNotExist:
-                    return []
-
-        if len(filter.entities) == 1 or filter.compare:
-            result = []
-            for entity in filter.entities:
-                result.extend(handle_compare(filter, self._run_query, team, entity=entity))
+            results = self._run_formula_queries(period_filters, team)
         else:
-            result = self._run_parallel(filter, team)
+            for entity in filter.entities:
+                if entity.type == TREND_FILTER_TYPE_ACTIONS:
+                    try:
+                        entity.name = actions.get(id=entity.id).name
+                    except Action.DoesNotExist:
+                        return []
+
+            jobs = [(period_filter, entity) for entity in filter.entities for period_filter in period_filters]
+            if can_combine_entities(filter):
+                results = self._run_combined_queries(period_filters, filter.entities, team)
+            else:
+                results = self._run_queries(jobs, team)
+            period_filters = [period_filter for period_filter, _ in jobs]
 
-        return result
+        flat_results: List[Dict[str, Any]] = []
+        for period_filter, result in zip(period_filters, results):
+            if filter.compare:
+                label = "current" if period_filter is filter else "previous"
+                result = convert_to_comparison(result, period_filter, label)
+            flat_results.extend(result)
+        return flat_results
 
     def _format_serialized(self, entity: Entity, result: List[Dict[str, Any]]):
-        serialized_data = []
-
+        # A shallow merge is enough here: the `action` dict is only ever read, so all series can share it
         serialized: Dict[str, Any] = {
             "action": entity.to_dict(),
             "label": entity.name,
             "count": 0,
-            "data": [],
-            "labels": [],
-            "days": [],
         }
 
-        for queried_metric in result:
-            serialized_copy = copy.deepcopy(serialized)
-            serialized_copy.update(queried_metric)
-            serialized_data.append(serialized_copy)
-
-        return serialized_data
+        return [{**serialized, "data": [], "labels": [], "days": [], **queried_metric} for queried_metric in result]
 
     def _handle_cumulative(self, entity_metrics: List) -> List[Dict[str, Any]]:
         for metrics in entity_metrics:
@@ -1,10 +1,9 @@
 import math
 from itertools import accumulate
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
-from ee.clickhouse.client import sync_execute
 from ee.clickhouse.queries.breakdown_props import get_breakdown_cohort_name
-from ee.clickhouse.queries.trends.util import parse_response
+from ee.clickhouse.queries.trends.util import ResponseDateFormatter, parse_response
 from ee.clickhouse.sql.clickhouse import trim_quotes_expr
 from posthog.constants import TRENDS_CUMULATIVE, TRENDS_DISPLAY_BY_VALUE
 from posthog.models.filters.filter import Filter
@@ -12,7 +11,7 @@ from posthog.models.team import Team
 
 
 class ClickhouseTrendsFormula:
-    def _run_formula_query(self, filter: Filter, team: Team):
+    def _get_formula_query(self, filter: Filter, team: Team) -> Tuple[str, Dict[str, Any]]:
         letters = [chr(65 + i) for i in range(0, len(filter.entities))]
         queries = []
         params: Dict[str, Any] = {}
@@ -66,8 +65,12 @@ class ClickhouseTrendsFormula:
                 [" CROSS JOIN ({}) as sub_{}".format(query, letters[i + 1]) for i, query in enumerate(queries[1:])]
             ),
         )
-        result = sync_execute(sql, params)
+        return sql, params
+
+    def _parse_formula_result(self, filter: Filter, result: List) -> List[Dict[str, Any]]:
+        is_aggregate = filter.display in TRENDS_DISPLAY_BY_VALUE
         response = []
+        date_formatter = ResponseDateFormatter(filter)
         for item in result:
             additional_values: Dict[str, Any] = {
                 "label": self._label(filter, item),
@@ -82,7 +85,7 @@ class ClickhouseTrendsFormula:
                 if filter.display == TRENDS_CUMULATIVE:
                     additional_values["data"] = list(accumulate(additional_values["data"]))
             additional_values["count"] = float(sum(additional_values["data"]))
-            response.append(parse_response(item, filter, additional_values))
+            response.append(parse_response(item, filter, additional_values, date_formatter))
         return response
 
     def _label(self, filter: Filter, item: List) -> str:
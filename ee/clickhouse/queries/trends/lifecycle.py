@@ -7,9 +7,11 @@ from rest_framework.request import Request
 from ee.clickhouse.client import sync_execute
 from ee.clickhouse.models.entity import get_entity_filtering_params
 from ee.clickhouse.models.person import get_persons_by_uuids
+from ee.clickhouse.queries.actor_activity import can_use_actor_activity, get_actor_activity_query
 from ee.clickhouse.queries.event_query import ClickhouseEventQuery
+from ee.clickhouse.queries.person_distinct_id_query import get_team_distinct_ids_query
 from ee.clickhouse.queries.person_query import ClickhousePersonQuery
-from ee.clickhouse.queries.trends.util import parse_response
+from ee.clickhouse.queries.trends.util import ResponseDateFormatter, parse_response
 from ee.clickhouse.queries.util import parse_timestamps
 from ee.clickhouse.sql.trends.lifecycle import LIFECYCLE_PEOPLE_SQL, LIFECYCLE_SQL
 from posthog.models.entity import Entity
@@ -25,7 +27,7 @@ from posthog.models.team import Team
 # 4. DORMANT - Users who did not do the action during this period but did an action the previous period
 #
 # To do this, we need for every period (+1 prior to the first period), list of person_ids who did the event/action
-# during that period and their creation dates.
+# during that period and their creation dates. Creation dates are only looked up for the persons active in that range.
 
 
 class ClickhouseLifecycle:
@@ -41,10 +43,11 @@ class ClickhouseLifecycle:
     def _parse_result(self, filter: Filter, entity: Entity) -> Callable:
         def _parse(result: List) -> List:
             res = []
+            date_formatter = ResponseDateFormatter(filter)
             for val in result:
                 label = "{} - {}".format(entity.name, val[2])
                 additional_values = {"label": label, "status": val[2]}
-                parsed_result = parse_response(val, filter, additional_values)
+                parsed_result = parse_response(val, filter, additional_values, date_formatter)
                 res.append(parsed_result)
 
             return res
@@ -91,35 +94,92 @@ class LifecycleEventQuery(ClickhouseEventQuery):
 
         self.params.update(prop_params)
 
+        entity_query, entity_params = self._get_entity_query()
+        self.params.update(entity_params)
+
         person_query, person_params = self._get_person_query()
         self.params.update(person_params)
 
         groups_query, groups_params = self._get_groups_query()
         self.params.update(groups_params)
 
-        entity_params, entity_format_params = get_entity_filtering_params(
-            entity=self._filter.entities[0], team_id=self._team_id, table_name=self.EVENT_TABLE_ALIAS
-        )
-        self.params.update(entity_params)
-
         return (
             f"""
             SELECT DISTINCT
                 person_id,
-                toDateTime(dateTrunc(%(interval)s, events.timestamp)) AS period,
+                toDateTime(dateTrunc(%(interval)s, {self.EVENT_TABLE_ALIAS}.timestamp)) AS period,
                 person.created_at AS created_at
-            FROM events AS {self.EVENT_TABLE_ALIAS}
+            FROM {self._events_source} AS {self.EVENT_TABLE_ALIAS}
             {self._get_distinct_id_query()}
             {person_query}
             {groups_query}
             WHERE team_id = %(team_id)s
-            {entity_format_params["entity_query"]}
+            {entity_query}
             {date_query}
             {prop_query}
         """,
             self.params,
         )
 
+    @cached_property
+    def _entity(self) -> Entity:
+        return self._filter.entities[0]
+
+    @cached_property
+    def _events_source(self) -> str:
+        if can_use_actor_activity(self._filter, self._entity, self._filter.interval):
+            return "({})".format(
+                get_actor_activity_query(
+                    event_param="event",
+                    date_from=self._get_date_from_expression(),
+                    date_to=self._get_date_to_expression(),
+                )
+            )
+        return "events"
+
+    def _get_entity_query(self) -> Tuple[str, Dict]:
+        entity_params, entity_format_params = get_entity_filtering_params(
+            entity=self._entity, team_id=self._team_id, table_name=self.EVENT_TABLE_ALIAS
+        )
+        return entity_format_params["entity_query"], entity_params
+
+    @cached_property
+    def _distinct_ids_query(self) -> str:
+        # Only the distinct ids and persons active in the window (or the period before it) can make it into the chart,
+        # so rather than reading every person of the team to find out when they were created, the person_distinct_id
+        # and person lookups are limited to those. ClickHouse pushes the condition down into the person_distinct_id read.
+        # Property filters are left out here as a superset of the actors is enough.
+        date_query, _ = self._get_date_filter()
+        entity_query, _ = self._get_entity_query()
+        return f"""
+            SELECT distinct_id, person_id
+            FROM ({get_team_distinct_ids_query(self._team_id)})
+            WHERE distinct_id IN (
+                SELECT distinct_id FROM {self._events_source} AS {self.EVENT_TABLE_ALIAS}
+                WHERE team_id = %(team_id)s
+                {entity_query}
+                {date_query}
+            )
+            """
+
+    def _get_distinct_id_query(self) -> str:
+        return f"""
+            INNER JOIN ({self._distinct_ids_query}) AS {self.DISTINCT_ID_TABLE_ALIAS}
+            ON {self.EVENT_TABLE_ALIAS}.distinct_id = {self.DISTINCT_ID_TABLE_ALIAS}.distinct_id
+            """
+
+    def _get_person_query(self) -> Tuple[str, Dict]:
+        person_query, params = self._person_query.get_query(
+            extra_where=f"AND id IN (SELECT person_id FROM ({self._distinct_ids_query}))"
+        )
+        return (
+            f"""
+            INNER JOIN ({person_query}) {self.PERSON_TABLE_ALIAS}
+            ON {self.PERSON_TABLE_ALIAS}.id = {self.DISTINCT_ID_TABLE_ALIAS}.person_id
+            """,
+            params,
+        )
+
     @cached_property
     def _person_query(self):
         return ClickhousePersonQuery(self._filter, self._team_id, self._column_optimizer, extra_fields=["created_at"],)
@@ -130,12 +190,18 @@ class LifecycleEventQuery(ClickhouseEventQuery):
         # :TRICKY: We fetch all data even for the period before the graph starts up until the end of the last period
         return (
             f"""
-            AND timestamp >= toDateTime(dateTrunc(%(interval)s, toDateTime(%(date_from)s))) - INTERVAL 1 {self._filter.interval}
-            AND timestamp < toDateTime(dateTrunc(%(interval)s, toDateTime(%(date_to)s))) + INTERVAL 1 {self._filter.interval}
+            AND timestamp >= {self._get_date_from_expression()}
+            AND timestamp < {self._get_date_to_expression()}
         """,
             params,
         )
 
+    def _get_date_from_expression(self) -> str:
+        return f"toDateTime(dateTrunc(%(interval)s, toDateTime(%(date_from)s))) - INTERVAL 1 {self._filter.interval}"
+
+    def _get_date_to_expression(self) -> str:
+        return f"toDateTime(dateTrunc(%(interval)s, toDateTime(%(date_to)s))) + INTERVAL 1 {self._filter.interval}"
+
     def _determine_should_join_distinct_ids(self) -> None:
         self._should_join_distinct_ids = True
 
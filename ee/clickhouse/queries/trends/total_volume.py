@@ -1,14 +1,15 @@
-import urllib.parse
 from typing import Any, Callable, Dict, List, Tuple
 
-from ee.clickhouse.queries.trends.trend_event_query import TrendsEventQuery
-from ee.clickhouse.queries.trends.util import enumerate_time_range, parse_response, process_math
+from ee.clickhouse.queries.trends.trend_event_query import TrendsEntitiesEventQuery, TrendsEventQuery
+from ee.clickhouse.queries.trends.util import ResponseDateFormatter, enumerate_time_range, parse_response, process_math
 from ee.clickhouse.queries.util import get_interval_func_ch, get_time_diff, get_trunc_func_ch
 from ee.clickhouse.sql.events import NULL_SQL
 from ee.clickhouse.sql.trends.volume import (
     ACTIVE_USER_SQL,
+    AGGREGATE_ENTITIES_SQL,
     AGGREGATE_SQL,
     CUMULATIVE_SQL,
+    VOLUME_ENTITIES_SQL,
     VOLUME_SQL,
     VOLUME_TOTAL_AGGREGATE_SQL,
 )
@@ -16,7 +17,7 @@ from posthog.constants import MONTHLY_ACTIVE, TRENDS_CUMULATIVE, TRENDS_DISPLAY_
 from posthog.models.entity import Entity
 from posthog.models.filters import Filter
 from posthog.models.team import Team
-from posthog.utils import encode_get_request_params
+from posthog.utils import PeopleUrlBuilder
 
 
 class ClickhouseTrendsTotalVolume:
@@ -68,17 +69,60 @@ class ClickhouseTrendsTotalVolume:
             final_query = AGGREGATE_SQL.format(null_sql=null_sql, content_sql=content_sql)
             return final_query, params, self._parse_total_volume_result(filter, entity, team.id)
 
+    def _total_volume_entities_query(
+        self, entities: List[Entity], filter: Filter, team: Team
+    ) -> Tuple[str, Dict, Callable]:
+        "Time series of several entities sharing their math from a single query, see `can_combine_entities`"
+        trunc_func = get_trunc_func_ch(filter.interval)
+        interval_func = get_interval_func_ch(filter.interval)
+        aggregate_operation, join_condition, math_params = process_math(entities[0], team)
+
+        trend_event_query = TrendsEntitiesEventQuery(
+            filter=filter, entities=entities, team=team, should_join_distinct_ids=join_condition != "",
+        )
+        event_query, event_query_params = trend_event_query.get_query()
+
+        content_sql = VOLUME_ENTITIES_SQL.format(
+            event_query=event_query, aggregate_operation=aggregate_operation, interval=trunc_func
+        )
+        null_sql = NULL_SQL.format(trunc_func=trunc_func, interval_func=interval_func)
+        params: Dict = {
+            "team_id": team.id,
+            **math_params,
+            **event_query_params,
+            "interval": filter.interval,
+            "num_entities": len(entities),
+        }
+        return (
+            AGGREGATE_ENTITIES_SQL.format(null_sql=null_sql, content_sql=content_sql),
+            params,
+            self._parse_total_volume_entities_result(filter, entities, team.id),
+        )
+
+    def _parse_total_volume_entities_result(self, filter: Filter, entities: List[Entity], team_id: int) -> Callable:
+        def _parse(result: List) -> List[List]:
+            stats_by_entity = {entity_index: stats for entity_index, *stats in result}
+            return [
+                self._parse_total_volume_result(filter, entity, team_id)([stats_by_entity[index]])
+                for index, entity in enumerate(entities)
+            ]
+
+        return _parse
+
     def _parse_total_volume_result(self, filter: Filter, entity: Entity, team_id: int) -> Callable:
         def _parse(result: List) -> List:
             parsed_results = []
-            for _, stats in enumerate(result):
-                parsed_result = parse_response(stats, filter)
+            date_formatter = ResponseDateFormatter(filter)
+            filter_dict = filter.to_dict()
+            for stats in result:
+                parsed_result = parse_response(stats, filter, date_formatter=date_formatter)
                 parsed_result.update(
-                    {"persons_urls": self._get_persons_url(filter, entity, team_id, parsed_result["days"])}
+                    {
+                        "persons_urls": self._get_persons_url(filter, entity, team_id, parsed_result["days"]),
+                        "filter": filter_dict,
+                    }
                 )
                 parsed_results.append(parsed_result)
-
-                parsed_result.update({"filter": filter.to_dict()})
             return parsed_results
 
         return _parse
@@ -91,17 +135,14 @@ class ClickhouseTrendsTotalVolume:
             time_range = enumerate_time_range(filter, seconds_in_interval)
             filter_params = filter.to_params()
             extra_params = {"entity_id": entity.id, "entity_type": entity.type, "entity_math": entity.math}
-            parsed_params: Dict[str, str] = encode_get_request_params({**filter_params, **extra_params})
+            people_urls = PeopleUrlBuilder(f"api/projects/{team_id}/actions/people/", filter_params)
 
             return [
                 {
                     "aggregated_value": result[0][0] if result and len(result) else 0,
                     "days": time_range,
                     "filter": filter_params,
-                    "persons": {
-                        "filter": extra_params,
-                        "url": f"api/projects/{team_id}/actions/people/?{urllib.parse.urlencode(parsed_params)}",
-                    },
+                    "persons": {"filter": extra_params, "url": people_urls.url(extra_params)},
                 }
             ]
 
@@ -109,8 +150,8 @@ class ClickhouseTrendsTotalVolume:
 
     def _get_persons_url(self, filter: Filter, entity: Entity, team_id: int, dates: List[str]) -> List[Dict[str, Any]]:
         persons_url = []
+        people_urls = PeopleUrlBuilder(f"api/projects/{team_id}/actions/people/", filter.to_params())
         for date in dates:
-            filter_params = filter.to_params()
             extra_params = {
                 "entity_id": entity.id,
                 "entity_type": entity.type,
@@ -118,12 +159,5 @@ class ClickhouseTrendsTotalVolume:
                 "date_from": filter.date_from if filter.display == TRENDS_CUMULATIVE else date,
                 "date_to": date,
             }
-
-            parsed_params: Dict[str, str] = encode_get_request_params({**filter_params, **extra_params})
-            persons_url.append(
-                {
-                    "filter": extra_params,
-                    "url": f"api/projects/{team_id}/actions/people/?{urllib.parse.urlencode(parsed_params)}",
-                }
-            )
+            persons_url.append({"filter": extra_params, "url": people_urls.url(extra_params)})
         return persons_url
@@ -1,12 +1,14 @@
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
+from ee.clickhouse.models.action import format_action_filter
 from ee.clickhouse.models.entity import get_entity_filtering_params
-from ee.clickhouse.models.property import get_property_string_expr
+from ee.clickhouse.models.property import get_property_string_expr, parse_prop_grouped_clauses
+from ee.clickhouse.models.util import PersonPropertiesMode
 from ee.clickhouse.queries.event_query import ClickhouseEventQuery
 from ee.clickhouse.queries.person_query import ClickhousePersonQuery
 from ee.clickhouse.queries.trends.util import get_active_user_params
 from ee.clickhouse.queries.util import date_from_clause, get_time_diff, get_trunc_func_ch, parse_timestamps
-from posthog.constants import MONTHLY_ACTIVE, WEEKLY_ACTIVE, PropertyOperatorType
+from posthog.constants import MONTHLY_ACTIVE, TREND_FILTER_TYPE_ACTIONS, WEEKLY_ACTIVE, PropertyOperatorType
 from posthog.models import Entity
 from posthog.models.filters.filter import Filter
 from posthog.models.filters.mixins.utils import cached_property
@@ -21,36 +23,7 @@ class TrendsEventQuery(ClickhouseEventQuery):
         super().__init__(*args, **kwargs)
 
     def get_query(self) -> Tuple[str, Dict[str, Any]]:
-        _fields = (
-            f"{self.EVENT_TABLE_ALIAS}.timestamp as timestamp"
-            + (
-                " ".join(
-                    f", {self.EVENT_TABLE_ALIAS}.{column_name} as {column_name}"
-                    for column_name in self._column_optimizer.event_columns_to_query
-                )
-            )
-            + " ".join(
-                [
-                    ", "
-                    + get_property_string_expr("events", property, f"'{property}'", "properties", table_alias="e")[0]
-                    + f" as {property}"
-                    for property in self._extra_event_properties
-                ]
-            )
-            + (f", {self.DISTINCT_ID_TABLE_ALIAS}.person_id as person_id" if self._should_join_distinct_ids else "")
-            + (f", {self.EVENT_TABLE_ALIAS}.distinct_id as distinct_id" if self._aggregate_users_by_distinct_id else "")
-            + (
-                " ".join(
-                    f", {self.EVENT_TABLE_ALIAS}.{column_name} as {column_name}" for column_name in self._extra_fields
-                )
-            )
-            + (
-                " ".join(
-                    f", {self.PERSON_TABLE_ALIAS}.{column_name} as {column_name}"
-                    for column_name in self._extra_person_fields
-                )
-            )
-        )
+        _fields = self._get_fields()
 
         date_query, date_params = self._get_date_filter()
         self.params.update(date_params)
@@ -83,6 +56,38 @@ class TrendsEventQuery(ClickhouseEventQuery):
 
         return query, self.params
 
+    def _get_fields(self) -> str:
+        return (
+            f"{self.EVENT_TABLE_ALIAS}.timestamp as timestamp"
+            + (
+                " ".join(
+                    f", {self.EVENT_TABLE_ALIAS}.{column_name} as {column_name}"
+                    for column_name in self._column_optimizer.event_columns_to_query
+                )
+            )
+            + " ".join(
+                [
+                    ", "
+                    + get_property_string_expr("events", property, f"'{property}'", "properties", table_alias="e")[0]
+                    + f" as {property}"
+                    for property in self._extra_event_properties
+                ]
+            )
+            + (f", {self.DISTINCT_ID_TABLE_ALIAS}.person_id as person_id" if self._should_join_distinct_ids else "")
+            + (f", {self.EVENT_TABLE_ALIAS}.distinct_id as distinct_id" if self._aggregate_users_by_distinct_id else "")
+            + (
+                " ".join(
+                    f", {self.EVENT_TABLE_ALIAS}.{column_name} as {column_name}" for column_name in self._extra_fields
+                )
+            )
+            + (
+                " ".join(
+                    f", {self.PERSON_TABLE_ALIAS}.{column_name} as {column_name}"
+                    for column_name in self._extra_person_fields
+                )
+            )
+        )
+
     def _determine_should_join_distinct_ids(self) -> None:
         if self._entity.math == "dau" and not self._aggregate_users_by_distinct_id:
             self._should_join_distinct_ids = True
@@ -129,3 +134,84 @@ class TrendsEventQuery(ClickhouseEventQuery):
             extra_fields=self._extra_person_fields,
             entity=self._entity,
         )
+
+
+class TrendsEntitiesEventQuery(TrendsEventQuery):
+    """
+    Events of several entities that share their math, read in a single scan. Every event is repeated for each entity
+    it matches, tagged with that entity's position as `entity_index`.
+    """
+
+    _entities: List[Entity]
+
+    def __init__(self, entities: List[Entity], *args, **kwargs):
+        self._entities = entities
+        # Math (and with it, which tables need joining and the date range to read) is the same for every entity
+        super().__init__(entities[0], *args, **kwargs)
+
+    def get_query(self) -> Tuple[str, Dict[str, Any]]:
+        entity_conditions = [self._get_entity_condition(entity, index) for index, entity in enumerate(self._entities)]
+        # :TRICKY: Entities can overlap (e.g. the same event with different property filters), so rows are tagged with
+        # every matching entity rather than the first one
+        _fields = (
+            f"arrayJoin(arrayFilter((index, matches) -> matches, range({len(self._entities)}), "
+            f"[{', '.join(entity_conditions)}])) as entity_index, {self._get_fields()}"
+        )
+
+        date_query, date_params = self._get_date_filter()
+        self.params.update(date_params)
+
+        prop_query, prop_params = self._get_prop_groups(self._filter.property_groups)
+        self.params.update(prop_params)
+
+        person_query, person_params = self._get_person_query()
+        self.params.update(person_params)
+
+        groups_query, groups_params = self._get_groups_query()
+        self.params.update(groups_params)
+
+        query = f"""
+            SELECT {_fields} FROM events {self.EVENT_TABLE_ALIAS}
+            {self._get_distinct_id_query()}
+            {person_query}
+            {groups_query}
+            WHERE team_id = %(team_id)s
+            AND ({" OR ".join(entity_conditions)})
+            {date_query}
+            {prop_query}
+        """
+
+        return query, self.params
+
+    def _get_entity_condition(self, entity: Entity, index: int) -> str:
+        if entity.type == TREND_FILTER_TYPE_ACTIONS:
+            entity_query, entity_params = format_action_filter(
+                team_id=self._team_id,
+                action=entity.get_action(),
+                prepend=f"entity_{index}_action",
+                table_name=self.EVENT_TABLE_ALIAS,
+                person_properties_mode=PersonPropertiesMode.USING_PERSON_PROPERTIES_COLUMN,
+            )
+        else:
+            entity_query, entity_params = f"event = %(entity_{index}_event)s", {f"entity_{index}_event": entity.id}
+        self.params.update(entity_params)
+
+        # Entity property filters can't be pushed down into the person subquery, as they only apply to some rows
+        prop_query, prop_params = parse_prop_grouped_clauses(
+            team_id=self._team_id,
+            property_group=entity.property_groups,
+            prepend=f"entity_{index}",
+            table_name=self.EVENT_TABLE_ALIAS,
+            allow_denormalized_props=True,
+            person_properties_mode=PersonPropertiesMode.USING_PERSON_PROPERTIES_COLUMN,
+            person_id_joined_alias=f"{self.DISTINCT_ID_TABLE_ALIAS}.person_id",
+        )
+        self.params.update(prop_params)
+
+        return f"({entity_query} {prop_query})"
+
+    @cached_property
+    def _person_query(self):
+        return ClickhousePersonQuery(
+            self._filter, self._team_id, self._column_optimizer, extra_fields=self._extra_person_fields
+        )
@@ -1,12 +1,19 @@
-from datetime import timedelta
+from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple, Union
 
+from django.conf import settings
 from rest_framework.exceptions import ValidationError
 
 from ee.clickhouse.models.property import get_property_string_expr
 from ee.clickhouse.queries.util import format_ch_timestamp, get_earliest_timestamp
 from ee.clickhouse.sql.events import EVENT_JOIN_PERSON_SQL
-from posthog.constants import WEEKLY_ACTIVE
+from posthog.constants import (
+    MONTHLY_ACTIVE,
+    TRENDS_CUMULATIVE,
+    TRENDS_DISPLAY_BY_VALUE,
+    TRENDS_LIFECYCLE,
+    WEEKLY_ACTIVE,
+)
 from posthog.models.entity import Entity
 from posthog.models.filters import Filter, PathFilter
 from posthog.models.filters.utils import validate_group_type_index
@@ -54,13 +61,36 @@ def process_math(
     return aggregate_operation, join_condition, params
 
 
-def parse_response(stats: Dict, filter: Filter, additional_values: Dict = {}) -> Dict[str, Any]:
+class ResponseDateFormatter:
+    """
+    Formats the date column of trend results into `labels` and `days`.
+
+    Every series of a query shares the same date range, so the formatted lists are built once per distinct date column
+    and shared between series rather than re-running `strftime` for every breakdown value.
+    """
+
+    def __init__(self, filter: Filter):
+        self.labels_format = "%-d-%b-%Y{}".format(" %H:%M" if filter.interval == "hour" else "")
+        self.days_format = "%Y-%m-%d{}".format(" %H:%M:%S" if filter.interval == "hour" else "")
+        self._cache: Dict[Tuple[datetime, ...], Tuple[List[str], List[str]]] = {}
+
+    def format(self, dates: List[datetime]) -> Tuple[List[str], List[str]]:
+        key = tuple(dates)
+        if key not in self._cache:
+            self._cache[key] = (
+                [date.strftime(self.labels_format) for date in key],
+                [date.strftime(self.days_format) for date in key],
+            )
+        return self._cache[key]
+
+
+def parse_response(
+    stats: Dict, filter: Filter, additional_values: Dict = {}, date_formatter: Optional[ResponseDateFormatter] = None,
+) -> Dict[str, Any]:
     counts = stats[1]
-    dates = [item.strftime("%Y-%m-%d{}".format(", %H:%M" if filter.interval == "hour" else "")) for item in stats[0]]
-    labels = [item.strftime("%-d-%b-%Y{}".format(" %H:%M" if filter.interval == "hour" else "")) for item in stats[0]]
-    days = [item.strftime("%Y-%m-%d{}".format(" %H:%M:%S" if filter.interval == "hour" else "")) for item in stats[0]]
+    labels, days = (date_formatter or ResponseDateFormatter(filter)).format(stats[0])
     return {
-        "data": [float(c) for c in counts],
+        "data": list(map(float, counts)),
         "count": float(sum(counts)),
         "labels": labels,
         "days": days,
@@ -106,3 +136,27 @@ def enumerate_time_range(filter: Filter, seconds_in_interval: int) -> List[str]:
         time_range.append(date_from.strftime("%Y-%m-%d{}".format(" %H:%M:%S" if filter.interval == "hour" else "")))
         date_from += delta
     return time_range
+
+
+def can_combine_entities(filter: Filter) -> bool:
+    """
+    Whether the series of all entities can be read in a single scan of events (see `TrendsEntitiesEventQuery`) rather
+    than with a query per entity. They need to share their math and be plain time series, without breakdowns.
+    """
+    if not settings.TRENDS_COMBINE_ENTITIES or len(filter.entities) < 2:
+        return False
+
+    if (
+        filter.breakdown
+        or filter.formula
+        or filter.shown_as == TRENDS_LIFECYCLE
+        or filter.display in TRENDS_DISPLAY_BY_VALUE
+    ):
+        return False
+
+    if len({(entity.math, entity.math_property, entity.math_group_type_index) for entity in filter.entities}) > 1:
+        return False
+
+    math = filter.entities[0].math
+    # Active user math and cumulative DAU have their own query shapes
+    return math not in [WEEKLY_ACTIVE, MONTHLY_ACTIVE] and not (filter.display == TRENDS_CUMULATIVE and math == "dau")
@@ -1,5 +1,5 @@
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, Optional, Tuple
 
 from dateutil.relativedelta import relativedelta
@@ -7,13 +7,18 @@ from django.utils import timezone
 from rest_framework.exceptions import ValidationError
 
 from ee.clickhouse.client import sync_execute
-from ee.clickhouse.sql.events import GET_EARLIEST_TIMESTAMP_SQL
+from ee.clickhouse.materialized_columns.util import cache_for
+from ee.clickhouse.sql.events import GET_EARLIEST_TIMESTAMP_SQL, GET_TEAM_EARLIEST_TIMESTAMP_SQL
+from posthog.models.async_migration import is_async_migration_complete
 from posthog.models.event import DEFAULT_EARLIEST_TIME_DELTA
 from posthog.queries.base import TIME_IN_SECONDS
+from posthog.settings import BENCHMARK, TEST
 from posthog.types import FilterType
 
 EARLIEST_TIMESTAMP = "2015-01-01"
 
+earliest_timestamps_ready = TEST or BENCHMARK
+
 
 def parse_timestamps(filter: FilterType, team_id: int, table: str = "") -> Tuple[str, str, dict]:
     date_from = None
@@ -50,13 +55,31 @@ def format_ch_timestamp(timestamp: datetime, filter, default_hour_min: str = " 0
 
 
 def get_earliest_timestamp(team_id: int) -> datetime:
-    results = sync_execute(GET_EARLIEST_TIMESTAMP_SQL, {"team_id": team_id, "earliest_timestamp": EARLIEST_TIMESTAMP})
+    if is_earliest_timestamps_ready():
+        results = sync_execute(GET_TEAM_EARLIEST_TIMESTAMP_SQL, {"team_id": team_id})
+    else:
+        results = sync_execute(
+            GET_EARLIEST_TIMESTAMP_SQL, {"team_id": team_id, "earliest_timestamp": EARLIEST_TIMESTAMP}
+        )
     if len(results) > 0:
         return results[0][0]
     else:
         return timezone.now() - DEFAULT_EARLIEST_TIME_DELTA
 
 
+def is_earliest_timestamps_ready() -> bool:
+    global earliest_timestamps_ready
+
+    earliest_timestamps_ready = earliest_timestamps_ready or _fetch_earliest_timestamps_ready_cached()
+    return earliest_timestamps_ready
+
+
+# :TRICKY: Like with person_distinct_id2, negative responses are cached for a minute and a positive one forever.
+@cache_for(timedelta(minutes=1))
+def _fetch_earliest_timestamps_ready_cached() -> bool:
+    return is_async_migration_complete("0011_fill_earliest_timestamps")
+
+
 def get_time_diff(
     interval: str, start_time: Optional[datetime], end_time: Optional[datetime], team_id: int
 ) -> Tuple[int, int, bool]:
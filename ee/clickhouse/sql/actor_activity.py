@@ -0,0 +1,89 @@
+from django.conf import settings
+
+from ee.clickhouse.sql.clickhouse import STORAGE_POLICY
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+from ee.clickhouse.sql.table_engines import AggregatingMergeTree
+
+# Which distinct ids performed which events on each day, rolled up from events as they are inserted. Retention,
+# stickiness and lifecycle only need to know in which periods an actor was active, so for queries without property
+# filters this is read instead of events. Distinct ids are resolved to persons at query time, so merges are respected.
+
+ACTOR_ACTIVITY_TABLE = "actor_activity"
+
+ACTOR_ACTIVITY_TABLE_ENGINE = lambda: AggregatingMergeTree(ACTOR_ACTIVITY_TABLE)
+ACTOR_ACTIVITY_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    event VARCHAR,
+    day Date,
+    distinct_id VARCHAR,
+    first_timestamp SimpleAggregateFunction(min, DateTime64(6, 'UTC')),
+    event_count SimpleAggregateFunction(sum, UInt64)
+) ENGINE = {engine}
+PARTITION BY toYYYYMM(day)
+ORDER BY (team_id, event, day, distinct_id)
+{storage_policy}
+""".format(
+    table_name=ACTOR_ACTIVITY_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=ACTOR_ACTIVITY_TABLE_ENGINE(),
+    storage_policy=STORAGE_POLICY(),
+)
+
+ACTOR_ACTIVITY_SELECT_SQL = """
+SELECT
+    team_id,
+    event,
+    toDate(timestamp) AS day,
+    distinct_id,
+    min(timestamp) AS first_timestamp,
+    count() AS event_count
+FROM {database}.{source_table}
+{where}
+GROUP BY team_id, event, day, distinct_id
+"""
+
+# Events are sharded, so with replication every shard rolls up its own inserts into the replicated table
+ACTOR_ACTIVITY_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    table_name=ACTOR_ACTIVITY_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    database=settings.CLICKHOUSE_DATABASE,
+    select=ACTOR_ACTIVITY_SELECT_SQL.format(
+        database=settings.CLICKHOUSE_DATABASE, source_table=EVENTS_DATA_TABLE(), where=""
+    ),
+)
+
+TRUNCATE_ACTOR_ACTIVITY_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {ACTOR_ACTIVITY_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+DROP_ACTOR_ACTIVITY_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {ACTOR_ACTIVITY_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+# Stands in for `events` in retention, stickiness and lifecycle queries. `first_timestamp` is exposed as `timestamp`: it
+# falls in the same day, week or month as every other event of that actor on that day, and compares against range
+# bounds the same way as long as the lower bound is at midnight, so date filters on top of this stay exact.
+# Unmerged parts can hold several rows per actor and day, hence the GROUP BY.
+ACTOR_ACTIVITY_EVENTS_SQL = """
+SELECT
+    team_id,
+    event,
+    distinct_id,
+    min(first_timestamp) AS timestamp
+FROM actor_activity
+WHERE team_id = %(team_id)s
+{event_filter}
+{date_filter}
+GROUP BY team_id, event, day, distinct_id
+"""
+
+# Marks that there's nothing to backfill into `actor_activity`, e.g. on fresh installs. See 0006_fill_actor_activity
+COMMENT_ACTOR_ACTIVITY_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {ACTOR_ACTIVITY_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}' COMMENT COLUMN distinct_id 'skip_0006_fill_actor_activity'"
+)
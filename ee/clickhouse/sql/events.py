@@ -1,7 +1,7 @@
 from django.conf import settings
 
 from ee.clickhouse.sql.clickhouse import KAFKA_COLUMNS, STORAGE_POLICY, kafka_engine, trim_quotes_expr
-from ee.clickhouse.sql.table_engines import Distributed, ReplacingMergeTree, ReplicationScheme
+from ee.clickhouse.sql.table_engines import AggregatingMergeTree, Distributed, ReplacingMergeTree, ReplicationScheme
 from ee.kafka_client.topics import KAFKA_EVENTS
 
 EVENTS_DATA_TABLE = lambda: "sharded_events" if settings.CLICKHOUSE_REPLICATION else "events"
@@ -191,7 +191,7 @@ FROM
     events
 where team_id = %(team_id)s
 {conditions}
-ORDER BY toDate(timestamp) {order}, timestamp {order} {limit}
+ORDER BY toDate(timestamp) {order}, timestamp {order}, uuid {order} {limit}
 """
 
 SELECT_EVENT_BY_TEAM_AND_CONDITIONS_FILTERS_SQL = """
@@ -209,7 +209,7 @@ WHERE
 team_id = %(team_id)s
 {conditions}
 {filters}
-ORDER BY toDate(timestamp) {order}, timestamp {order} {limit}
+ORDER BY toDate(timestamp) {order}, timestamp {order}, uuid {order} {limit}
 """
 
 SELECT_ONE_EVENT_SQL = """
@@ -229,6 +229,76 @@ GET_EARLIEST_TIMESTAMP_SQL = """
 SELECT timestamp from events WHERE team_id = %(team_id)s AND timestamp > %(earliest_timestamp)s order by toDate(timestamp), timestamp limit 1
 """
 
+# The earliest timestamp of the events of each team, which its materialized view moves back whenever an older event is
+# ingested. Like with GET_EARLIEST_TIMESTAMP_SQL, timestamps before 2015 are ignored (see EARLIEST_TIMESTAMP)
+EARLIEST_TIMESTAMPS_TABLE = "events_earliest_timestamps"
+
+EARLIEST_TIMESTAMPS_TABLE_ENGINE = lambda: AggregatingMergeTree(EARLIEST_TIMESTAMPS_TABLE)
+EARLIEST_TIMESTAMPS_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    earliest_timestamp SimpleAggregateFunction(min, DateTime64(6, 'UTC'))
+) ENGINE = {engine}
+ORDER BY team_id
+""".format(
+    table_name=EARLIEST_TIMESTAMPS_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=EARLIEST_TIMESTAMPS_TABLE_ENGINE(),
+)
+
+EARLIEST_TIMESTAMPS_SELECT_SQL = """
+SELECT team_id, min(timestamp) AS earliest_timestamp
+FROM {database}.{source_table}
+WHERE timestamp > '2015-01-01'
+{where}
+GROUP BY team_id
+"""
+
+EARLIEST_TIMESTAMPS_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    table_name=EARLIEST_TIMESTAMPS_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    database=settings.CLICKHOUSE_DATABASE,
+    select=EARLIEST_TIMESTAMPS_SELECT_SQL.format(
+        database=settings.CLICKHOUSE_DATABASE, source_table=EVENTS_DATA_TABLE(), where=""
+    ),
+)
+
+TRUNCATE_EARLIEST_TIMESTAMPS_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {EARLIEST_TIMESTAMPS_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+# Marks that there's nothing to backfill into `events_earliest_timestamps`, e.g. on fresh installs.
+# See 0011_fill_earliest_timestamps
+COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {EARLIEST_TIMESTAMPS_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}' COMMENT COLUMN earliest_timestamp 'skip_0011_fill_earliest_timestamps'"
+)
+
+GET_TEAM_EARLIEST_TIMESTAMP_SQL = f"""
+SELECT min(earliest_timestamp) FROM {EARLIEST_TIMESTAMPS_TABLE} WHERE team_id = %(team_id)s GROUP BY team_id
+"""
+
+# Moves the earliest timestamp of a team forward again when a person's events are deleted, by recalculating it from
+# the events of other persons. Mutations don't affect rows inserted after them, so run this after the DELETE.
+DELETE_TEAM_EARLIEST_TIMESTAMP_SQL = f"ALTER TABLE {EARLIEST_TIMESTAMPS_TABLE} DELETE WHERE team_id = %(team_id)s"
+INSERT_TEAM_EARLIEST_TIMESTAMP_WITHOUT_PERSON_SQL = "INSERT INTO {table_name} {select}".format(
+    table_name=EARLIEST_TIMESTAMPS_TABLE,
+    select=EARLIEST_TIMESTAMPS_SELECT_SQL.format(
+        database=settings.CLICKHOUSE_DATABASE,
+        source_table="events",
+        where="""
+        AND team_id = %(team_id)s
+        AND distinct_id NOT IN (
+            SELECT distinct_id FROM person_distinct_id WHERE person_id=%(id)s AND team_id = %(team_id)s
+        )
+        """,
+    ),
+)
+
 NULL_SQL = """
 -- Creates zero values for all date axis ticks for the given date_from, date_to range
 SELECT toUInt16(0) AS total, {trunc_func}(toDateTime(%(date_to)s) - {interval_func}(number)) AS day_start
@@ -1,5 +1,6 @@
-from ee.clickhouse.sql.clickhouse import KAFKA_COLUMNS, STORAGE_POLICY, kafka_engine
-from ee.clickhouse.sql.table_engines import ReplacingMergeTree
+from ee.clickhouse.sql.clickhouse import KAFKA_COLUMNS, STORAGE_POLICY, kafka_engine, trim_quotes_expr
+from ee.clickhouse.sql.property_values import PROPERTY_VALUES_MAX_VALUE_LENGTH
+from ee.clickhouse.sql.table_engines import AggregatingMergeTree, ReplacingMergeTree
 from ee.kafka_client.topics import KAFKA_GROUPS
 from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
 
@@ -67,3 +68,146 @@ SELECT DISTINCT group_key
 FROM groups
 WHERE team_id = %(team_id)s AND group_type_index = %({group_type_index_var})s {filters}
 """
+
+
+# How many groups have each value of each property, kept up to date as groups are upserted, so filter suggestions don't
+# need to parse the properties of every group of a team. Every upsert writes all of the group's properties, so it counts
+# the group towards its new values and no longer towards the ones of the version it replaces. Values too long to be
+# suggested are counted as ''.
+
+GROUP_PROPERTY_VALUES_TABLE = "group_property_values"
+
+GROUP_PROPERTY_VALUES_TABLE_ENGINE = lambda: AggregatingMergeTree(GROUP_PROPERTY_VALUES_TABLE)
+GROUP_PROPERTY_VALUES_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    group_type_index UInt8,
+    property_key VARCHAR,
+    property_value VARCHAR,
+    group_count SimpleAggregateFunction(sum, Int64)
+) ENGINE = {engine}
+ORDER BY (team_id, group_type_index, property_key, property_value)
+{storage_policy}
+""".format(
+    table_name=GROUP_PROPERTY_VALUES_TABLE,
+    cluster=CLICKHOUSE_CLUSTER,
+    engine=GROUP_PROPERTY_VALUES_TABLE_ENGINE(),
+    storage_policy=STORAGE_POLICY(),
+)
+
+_GROUP_PROPERTY_VALUE_EXPR = "if(length({value}) <= {max_value_length}, {value}, '')".format(
+    value=trim_quotes_expr("kv.2"), max_value_length=PROPERTY_VALUES_MAX_VALUE_LENGTH
+)
+
+# Counts of the latest version of each group, used for backfilling and until that is done
+GROUP_PROPERTY_VALUES_SELECT_SQL = """
+SELECT
+    team_id,
+    group_type_index,
+    kv.1 AS property_key,
+    {property_value} AS property_value,
+    toInt64(count()) AS group_count
+FROM (
+    SELECT team_id, group_type_index, group_key, argMax(group_properties, _timestamp) AS group_properties
+    FROM {{database}}.{{source_table}}
+    {{where}}
+    GROUP BY team_id, group_type_index, group_key
+)
+ARRAY JOIN JSONExtractKeysAndValuesRaw(group_properties) AS kv
+GROUP BY team_id, group_type_index, property_key, property_value
+""".format(
+    property_value=_GROUP_PROPERTY_VALUE_EXPR
+)
+
+# Upserted groups are looked up in `groups` (which already holds them) to find the version each one replaces, i.e. the
+# latest older one, or a different one upserted in the same second. That's read through merge(), as within a
+# materialized view `groups` itself only holds the inserted rows. Versions older than what's already there and
+# redelivered ones don't change what a group has, so they aren't counted.
+GROUP_PROPERTY_VALUES_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS SELECT
+    team_id,
+    group_type_index,
+    kv.1 AS property_key,
+    {property_value} AS property_value,
+    sum(version.2) AS group_count
+FROM (
+    SELECT
+        upserted.team_id AS team_id,
+        upserted.group_type_index AS group_type_index,
+        upserted.group_properties AS group_properties,
+        argMaxIf(
+            previous.group_properties,
+            previous._timestamp,
+            previous._timestamp < upserted._timestamp
+            OR (previous._timestamp = upserted._timestamp AND previous.group_properties != upserted.group_properties)
+        ) AS previous_properties,
+        countIf(previous._timestamp > upserted._timestamp) = 0
+        AND countIf(
+            previous._timestamp = upserted._timestamp AND previous.group_properties = upserted.group_properties
+        ) = 1 AS is_latest
+    FROM {database}.{groups_table} AS upserted
+    JOIN (
+        SELECT team_id, group_type_index, group_key, group_properties, _timestamp
+        FROM merge('{database}', '^{groups_table}$')
+        WHERE (team_id, group_type_index, group_key) IN (
+            SELECT team_id, group_type_index, group_key FROM {database}.{groups_table}
+        )
+    ) AS previous
+    ON upserted.team_id = previous.team_id
+    AND upserted.group_type_index = previous.group_type_index
+    AND upserted.group_key = previous.group_key
+    GROUP BY upserted.team_id, upserted.group_type_index, upserted.group_key, upserted._timestamp, group_properties
+    HAVING is_latest
+)
+ARRAY JOIN [(group_properties, toInt64(1)), (previous_properties, toInt64(-1))] AS version
+ARRAY JOIN JSONExtractKeysAndValuesRaw(version.1) AS kv
+GROUP BY team_id, group_type_index, property_key, property_value
+HAVING group_count != 0
+""".format(
+    table_name=GROUP_PROPERTY_VALUES_TABLE,
+    cluster=CLICKHOUSE_CLUSTER,
+    database=CLICKHOUSE_DATABASE,
+    groups_table=GROUPS_TABLE,
+    property_value=_GROUP_PROPERTY_VALUE_EXPR,
+)
+
+TRUNCATE_GROUP_PROPERTY_VALUES_TABLE_SQL = (
+    f"TRUNCATE TABLE IF EXISTS {GROUP_PROPERTY_VALUES_TABLE} ON CLUSTER '{CLICKHOUSE_CLUSTER}'"
+)
+
+# Marks that there's nothing to backfill into `group_property_values`, e.g. on fresh installs.
+# See 0009_fill_group_property_values
+COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {GROUP_PROPERTY_VALUES_TABLE} ON CLUSTER '{CLICKHOUSE_CLUSTER}' COMMENT COLUMN property_value 'skip_0009_fill_group_property_values'"
+)
+
+# Until group_property_values has been backfilled, the latest version of the team's groups is counted instead
+GROUP_PROPERTY_VALUES_OF_GROUPS_SQL = "({})".format(
+    GROUP_PROPERTY_VALUES_SELECT_SQL.format(
+        database=CLICKHOUSE_DATABASE, source_table=GROUPS_TABLE, where="WHERE team_id = %(team_id)s"
+    )
+)
+
+SELECT_GROUP_PROPERTY_DEFINITIONS_SQL = """
+SELECT group_type_index, property_key AS key, sum(group_count) AS count
+FROM {source}
+WHERE team_id = %(team_id)s {filters}
+GROUP BY group_type_index, property_key
+HAVING count > 0
+ORDER BY group_type_index ASC, count DESC, key ASC
+LIMIT %(limit)s BY group_type_index
+"""
+
+SELECT_GROUP_PROPERTY_VALUES_SQL = """
+SELECT property_value AS value, sum(group_count) AS count
+FROM {source}
+WHERE team_id = %(team_id)s AND group_type_index = %(group_type_index)s AND property_key = %(key)s
+AND property_value != '' {filters}
+GROUP BY property_value
+HAVING count > 0
+ORDER BY count DESC, value ASC
+LIMIT %(limit)s
+"""
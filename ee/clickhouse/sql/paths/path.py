@@ -1,3 +1,7 @@
+from django.conf import settings
+
+from ee.clickhouse.sql.table_engines import Distributed, MergeTree, ReplicationScheme
+
 PATH_ARRAY_QUERY = """
     SELECT person_id,
             path,
@@ -6,7 +10,8 @@ PATH_ARRAY_QUERY = """
             event_in_session_index,
             concat(toString(event_in_session_index), '_', path) as path_key,
             if(event_in_session_index > 1, concat(toString(event_in_session_index-1), '_', prev_path), null) AS last_path_key,
-            path_dropoff_key
+            path_dropoff_key,
+            session_truncated
         FROM (
 
             SELECT person_id
@@ -15,6 +20,7 @@ PATH_ARRAY_QUERY = """
                 , joined_path_tuple.3 as prev_path
                 , event_in_session_index
                 , session_index
+                , session_truncated
                 , arrayPopFront(arrayPushBack(path_basic, '')) as path_basic_0
                 , arrayMap((x,y) -> if(x=y, 0, 1), path_basic, path_basic_0) as mapping
                 , arrayFilter((x,y) -> y, time, mapping) as timings
@@ -25,26 +31,128 @@ PATH_ARRAY_QUERY = """
                 , arrayDifference(limited_timings) as timings_diff
                 , arrayZip(limited_path, timings_diff, arrayPopBack(arrayPushFront(limited_path, '')) {extra_limited_path_tuple_elements}) as limited_path_timings
                 , concat(toString(length(limited_path)), '_', limited_path[-1]) as path_dropoff_key /* last path item */
-            FROM (
+            FROM ({session_paths_query})
+            ARRAY JOIN limited_path_timings AS joined_path_tuple, arrayEnumerate(limited_path_timings) AS event_in_session_index
+            {boundary_event_filter}
+            )
+"""
+
+# Splits the path events of each person into sessions. Sessions are numbered with window functions over the events
+# rather than by splitting an array of all events of the person, so that only up to PATHS_MAX_EVENTS_IN_SESSION events
+# of a session are ever collected. `session_truncated` flags sessions which had more.
+PATH_SESSIONS_QUERY = """
                 SELECT person_id
                     , path_time_tuple.1 as path_basic
                     , path_time_tuple.2 as time
                     {extra_path_time_tuple_select_statements}
                     , session_index
-                    , arrayZip(paths, timing, arrayDifference(timing) {extra_paths_tuple_elements}) as paths_tuple
-                    , {session_threshold_clause} as session_paths
+                    , session_truncated
                 FROM (
-                        SELECT person_id,
-                                groupArray(toUnixTimestamp64Milli(timestamp)) as timing,
-                                {extra_group_array_select_statements}
-                                groupArray(path_item) as paths
-                        FROM ({path_event_query})
-                        GROUP BY person_id
+                    SELECT person_id
+                        , session_index
+                        , groupArray(%(max_events_in_session)s)((path_item, timing, 0 {extra_session_tuple_elements})) as path_time_tuple
+                        , count() > %(max_events_in_session)s as session_truncated
+                    FROM (
+                        SELECT {session_event_columns}
+                            , timing
+                            , sum({session_threshold_clause}) OVER (PARTITION BY person_id ORDER BY timing ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW) as session_index
+                        FROM (
+                            SELECT {session_event_columns}
+                                , toUnixTimestamp64Milli(timestamp) as timing
+                                /* the first event of a person always starts a session */
+                                , toUnixTimestamp64Milli(timestamp) - toUnixTimestamp64Milli(lagInFrame(timestamp) OVER (PARTITION BY person_id ORDER BY timestamp ROWS BETWEEN 1 PRECEDING AND CURRENT ROW)) as time_since_previous_event
+                            FROM ({path_event_query})
                         )
-                /* this array join splits paths for a single personID per session */
-                ARRAY JOIN session_paths AS path_time_tuple, arrayEnumerate(session_paths) AS session_index
-            )
-            ARRAY JOIN limited_path_timings AS joined_path_tuple, arrayEnumerate(limited_path_timings) AS event_in_session_index
-            {boundary_event_filter}
-            )
+                    )
+                    GROUP BY person_id, session_index
+                    SETTINGS allow_experimental_window_functions = 1
+                )
+            """
+
+# Compacted session paths per person, filled by a paths query and reused by later queries over the same events which
+# only differ in how the paths are grouped, cut or limited. Each fill is read by its `fill_id` only.
+#
+# Fills and reads go through different pooled connections, so on a cluster both use the distributed `person_paths`
+# table and fills are inserted with `insert_distributed_sync` so they are complete on every shard once written.
+PERSON_PATHS_TABLE = "person_paths"
+PERSON_PATHS_DATA_TABLE = lambda: "sharded_person_paths" if settings.CLICKHOUSE_REPLICATION else PERSON_PATHS_TABLE
+
+PERSON_PATHS_TABLE_BASE_SQL = """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    fill_id UUID,
+    person_id UUID,
+    session_index UInt32,
+    path Array(VARCHAR),
+    timings Array(Int64),
+    truncated UInt8,
+    created_at DateTime
+) ENGINE = {engine}
+"""
+
+PERSON_PATHS_TABLE_ENGINE = lambda: MergeTree(PERSON_PATHS_DATA_TABLE(), replication_scheme=ReplicationScheme.SHARDED)
+PERSON_PATHS_TABLE_SQL = lambda: (
+    PERSON_PATHS_TABLE_BASE_SQL
+    + """ORDER BY (team_id, fill_id, person_id, session_index)
+{ttl}
+"""
+).format(
+    table_name=PERSON_PATHS_DATA_TABLE(),
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=PERSON_PATHS_TABLE_ENGINE(),
+    # Fills are only read for PATHS_PERSON_PATHS_CACHE_TTL seconds, this just drops them eventually
+    ttl="" if settings.TEST else "TTL created_at + INTERVAL 1 DAY",
+)
+
+# Distributed engine tables are only created if CLICKHOUSE_REPLICATED
+
+# This table is responsible for both writing fills to and reading them from sharded_person_paths
+DISTRIBUTED_PERSON_PATHS_TABLE_SQL = lambda: PERSON_PATHS_TABLE_BASE_SQL.format(
+    table_name=PERSON_PATHS_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=Distributed(data_table=PERSON_PATHS_DATA_TABLE(), sharding_key="sipHash64(person_id)"),
+)
+
+TRUNCATE_PERSON_PATHS_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {PERSON_PATHS_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+DROP_PERSON_PATHS_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {PERSON_PATHS_DATA_TABLE()} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+# Consecutive repeats are compacted the same way as in PATH_ARRAY_QUERY. Doing it before path groupings are applied
+# doesn't change the result, as grouping can only add repeats, which are compacted again when reading.
+INSERT_PERSON_PATHS_SQL = """
+INSERT INTO person_paths (team_id, fill_id, person_id, session_index, path, timings, truncated, created_at)
+SELECT %(team_id)s
+    , %(person_paths_fill_id)s
+    , person_id
+    , session_index
+    , arrayFilter((x,y)->y, path_basic, mapping) as compact_path
+    , arrayFilter((x,y) -> y, time, mapping) as compact_timings
+    , session_truncated
+    , now()
+FROM (
+    SELECT person_id
+        , path_basic
+        , time
+        , session_index
+        , session_truncated
+        , arrayMap((x,y) -> if(x=y, 0, 1), path_basic, arrayPopFront(arrayPushBack(path_basic, ''))) as mapping
+    FROM ({session_paths_query})
+)
 """
+
+# Reads the sessions of a fill in place of PATH_SESSIONS_QUERY
+PERSON_PATHS_SESSIONS_QUERY = """
+                SELECT person_id
+                    , {path_expression} as path_basic
+                    , timings as time
+                    , session_index
+                    , truncated as session_truncated
+                FROM person_paths
+                WHERE team_id = %(team_id)s
+                AND fill_id = %(person_paths_fill_id)s
+            """
@@ -1,5 +1,5 @@
 from ee.clickhouse.sql.clickhouse import KAFKA_COLUMNS, STORAGE_POLICY, kafka_engine
-from ee.clickhouse.sql.table_engines import CollapsingMergeTree, ReplacingMergeTree
+from ee.clickhouse.sql.table_engines import AggregatingMergeTree, CollapsingMergeTree, ReplacingMergeTree
 from ee.kafka_client.topics import KAFKA_PERSON, KAFKA_PERSON_DISTINCT_ID, KAFKA_PERSON_UNIQUE_ID
 from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
 
@@ -64,6 +64,67 @@ FROM {database}.kafka_{table_name}
     table_name=PERSONS_TABLE, cluster=CLICKHOUSE_CLUSTER, database=CLICKHOUSE_DATABASE,
 )
 
+# Persons collapsed to their latest version as parts merge, so that queries don't have to read and deduplicate every
+# version of every person in a team. Rows in parts which haven't been merged yet aren't collapsed, so queries still need
+# to GROUP BY id and merge the argMax states. Persons are deleted once any version is, like in `person`.
+PERSONS_LATEST_TABLE = "person_latest"
+
+PERSONS_LATEST_TABLE_ENGINE = lambda: AggregatingMergeTree(PERSONS_LATEST_TABLE)
+PERSONS_LATEST_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    id UUID,
+    team_id Int64,
+    created_at AggregateFunction(argMax, DateTime64, DateTime),
+    properties AggregateFunction(argMax, VARCHAR, DateTime),
+    is_identified AggregateFunction(argMax, Int8, DateTime),
+    is_deleted SimpleAggregateFunction(max, Int8),
+    _timestamp SimpleAggregateFunction(max, DateTime)
+) ENGINE = {engine}
+Order By (team_id, id)
+{storage_policy}
+""".format(
+    table_name=PERSONS_LATEST_TABLE,
+    cluster=CLICKHOUSE_CLUSTER,
+    engine=PERSONS_LATEST_TABLE_ENGINE(),
+    storage_policy=STORAGE_POLICY(),
+)
+
+# Source columns are qualified so they aren't mistaken for the (aggregated) aliases of the same name
+PERSONS_LATEST_SELECT_SQL = """
+SELECT
+id,
+team_id,
+argMaxState(person.created_at, person._timestamp) AS created_at,
+argMaxState(person.properties, person._timestamp) AS properties,
+argMaxState(person.is_identified, person._timestamp) AS is_identified,
+max(person.is_deleted) AS is_deleted,
+max(person._timestamp) AS _timestamp
+FROM {database}.person
+{where}
+GROUP BY team_id, id
+"""
+
+PERSONS_LATEST_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    table_name=PERSONS_LATEST_TABLE,
+    cluster=CLICKHOUSE_CLUSTER,
+    database=CLICKHOUSE_DATABASE,
+    select=PERSONS_LATEST_SELECT_SQL.format(database=CLICKHOUSE_DATABASE, where=""),
+)
+
+TRUNCATE_PERSONS_LATEST_TABLE_SQL = f"TRUNCATE TABLE IF EXISTS {PERSONS_LATEST_TABLE} ON CLUSTER '{CLICKHOUSE_CLUSTER}'"
+
+DROP_PERSONS_LATEST_TABLE_SQL = f"DROP TABLE IF EXISTS {PERSONS_LATEST_TABLE} ON CLUSTER '{CLICKHOUSE_CLUSTER}'"
+
+# Marks that there's nothing to backfill into `person_latest`, e.g. on fresh installs. See 0010_fill_person_latest
+COMMENT_PERSONS_LATEST_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {PERSONS_LATEST_TABLE} ON CLUSTER '{CLICKHOUSE_CLUSTER}' COMMENT COLUMN id 'skip_0010_fill_person_latest'"
+)
+
 GET_LATEST_PERSON_SQL = """
 SELECT * FROM person JOIN (
     SELECT id, max(_timestamp) as _timestamp, max(is_deleted) as is_deleted
@@ -76,6 +137,47 @@ WHERE team_id = %(team_id)s
   {query}
 """
 
+# Joins the collapsed persons and their distinct ids onto an actor query selecting person uuids as `actor_id`, for
+# serializing actors without going through postgres. Actors without a person get the column defaults, e.g. a zero id.
+# Distinct ids are listed in the order they were first seen, like `Person.distinct_ids`.
+# Until person_latest has been backfilled, persons are collapsed from all of their versions in `person` instead
+GET_ACTORS_WITH_PERSONS_SQL = """
+SELECT actors.*, person.id, person.created_at, person.properties, person.is_identified, pdi.distinct_ids
+FROM ({actor_query}) AS actors
+LEFT JOIN (
+    SELECT
+        id,
+        {person_fields}
+    FROM {person_table}
+    WHERE team_id = %(team_id)s
+    GROUP BY id
+    HAVING max(is_deleted) = 0
+) AS person ON person.id = actors.actor_id
+LEFT JOIN (
+    SELECT person_id, arrayMap(x -> x.2, arraySort(groupArray((first_seen, distinct_id)))) AS distinct_ids
+    FROM (
+        SELECT distinct_id, argMax(person_id, version) AS person_id, min(_timestamp) AS first_seen
+        FROM person_distinct_id2
+        WHERE team_id = %(team_id)s
+        GROUP BY distinct_id
+        HAVING argMax(is_deleted, version) = 0
+    )
+    GROUP BY person_id
+) AS pdi ON pdi.person_id = actors.actor_id
+"""
+
+PERSONS_LATEST_FIELDS_SQL = """
+        argMaxMerge(created_at) AS created_at,
+        argMaxMerge(properties) AS properties,
+        argMaxMerge(is_identified) AS is_identified
+"""
+
+PERSONS_FIELDS_SQL = """
+        argMax(created_at, _timestamp) AS created_at,
+        argMax(properties, _timestamp) AS properties,
+        argMax(is_identified, _timestamp) AS is_identified
+"""
+
 GET_LATEST_PERSON_ID_SQL = """
 (select id from (
     {latest_person_sql}
@@ -263,12 +365,17 @@ GROUP BY distinct_id
 """
 
 # Query to query distinct ids using the new table, will be used if 0003_fill_person_distinct_id2 migration is complete
+#
+# person_distinct_id2 is a ReplacingMergeTree on (team_id, distinct_id) versioned by `version`, so it already is the
+# deduplicated mapping. Reading it with FINAL merges any unmerged versions in primary key order as it reads the team's
+# range, rather than building a hash table of the team's whole identity history via GROUP BY.
+# :TRICKY: `is_deleted` must be checked after FINAL has picked the latest version, so it stays in WHERE (ClickHouse
+# does not move conditions to PREWHERE for FINAL queries).
 GET_TEAM_PERSON_DISTINCT_IDS_NEW_TABLE = """
-SELECT distinct_id, argMax(person_id, version) as person_id
-FROM person_distinct_id2
+SELECT distinct_id, person_id
+FROM person_distinct_id2 FINAL
 WHERE team_id = %(team_id)s %(extra_where)s
-GROUP BY distinct_id
-HAVING argMax(is_deleted, version) = 0
+AND is_deleted = 0
 """
 
 GET_PERSON_IDS_BY_FILTER = """
@@ -0,0 +1,219 @@
+from django.conf import settings
+
+from ee.clickhouse.sql.clickhouse import STORAGE_POLICY, trim_quotes_expr
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+from ee.clickhouse.sql.table_engines import AggregatingMergeTree, ReplacingMergeTree
+
+# Rolled up event property values used to serve property filter suggestions without scanning events.
+# Rows are summed per (team_id, property_type, property_key, property_value) as parts merge.
+
+PROPERTY_VALUES_TABLE = "property_values"
+
+# Values longer than this are not useful as suggestions and would only bloat the table
+PROPERTY_VALUES_MAX_VALUE_LENGTH = 256
+
+# Properties which are (close to) unique per event, and so would add a row per event without ever being suggested
+PROPERTY_VALUES_IGNORED_KEYS = [
+    "$insert_id",
+    "$time",
+    "$sent_at",
+    "$device_id",
+    "$session_id",
+    "$window_id",
+    "$pageview_id",
+    "$anon_distinct_id",
+    "distinct_id",
+    "token",
+    "$set",
+    "$set_once",
+    "$snapshot_data",
+]
+
+PROPERTY_VALUES_TABLE_ENGINE = lambda: AggregatingMergeTree(PROPERTY_VALUES_TABLE)
+PROPERTY_VALUES_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    property_type LowCardinality(VARCHAR),
+    property_key VARCHAR,
+    property_value VARCHAR,
+    count SimpleAggregateFunction(sum, UInt64),
+    last_seen SimpleAggregateFunction(max, DateTime)
+) ENGINE = {engine}
+ORDER BY (team_id, property_type, property_key, property_value)
+{ttl}
+{storage_policy}
+""".format(
+    table_name=PROPERTY_VALUES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=PROPERTY_VALUES_TABLE_ENGINE(),
+    # Suggestions only look at the last week of events, so anything older can go
+    ttl="" if settings.TEST else "TTL last_seen + INTERVAL 30 DAY",
+    storage_policy=STORAGE_POLICY(),
+)
+
+EVENT_PROPERTY_VALUES_SELECT_SQL = """
+SELECT
+team_id,
+'event' AS property_type,
+kv.1 AS property_key,
+{property_value} AS property_value,
+count() AS count,
+max(toDateTime(timestamp)) AS last_seen
+FROM {{database}}.{{source_table}}
+ARRAY JOIN JSONExtractKeysAndValuesRaw(properties) AS kv
+WHERE property_key NOT IN ({ignored_keys})
+AND property_value != ''
+AND length(property_value) <= {max_value_length}
+{{where}}
+GROUP BY team_id, property_key, property_value
+""".format(
+    property_value=trim_quotes_expr("kv.2"),
+    ignored_keys=", ".join(f"'{key}'" for key in PROPERTY_VALUES_IGNORED_KEYS),
+    max_value_length=PROPERTY_VALUES_MAX_VALUE_LENGTH,
+)
+
+# Events are sharded, so with replication every shard rolls up its own inserts into the replicated table
+EVENT_PROPERTY_VALUES_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS event_property_values_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    database=settings.CLICKHOUSE_DATABASE,
+    table_name=PROPERTY_VALUES_TABLE,
+    select=EVENT_PROPERTY_VALUES_SELECT_SQL.format(
+        database=settings.CLICKHOUSE_DATABASE, source_table=EVENTS_DATA_TABLE(), where=""
+    ),
+)
+
+# Person property values can't be summed up like event ones: persons change their properties, and a person who changed
+# or was deleted should no longer be counted towards their old value. So the latest value of every property of every
+# person is kept instead, and values are counted at query time. Every person update writes all of its properties, so
+# the latest version of each row is the value the person has now. Properties removed from a person altogether keep
+# their last value until the person is deleted.
+PERSON_PROPERTY_VALUES_TABLE = "person_property_values"
+
+PERSON_PROPERTY_VALUES_TABLE_ENGINE = lambda: ReplacingMergeTree(PERSON_PROPERTY_VALUES_TABLE, ver="_timestamp")
+PERSON_PROPERTY_VALUES_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    property_key VARCHAR,
+    person_id UUID,
+    property_value VARCHAR,
+    is_deleted Int8,
+    _timestamp DateTime
+) ENGINE = {engine}
+ORDER BY (team_id, property_key, person_id)
+{storage_policy}
+""".format(
+    table_name=PERSON_PROPERTY_VALUES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=PERSON_PROPERTY_VALUES_TABLE_ENGINE(),
+    storage_policy=STORAGE_POLICY(),
+)
+
+# Values which are too long to be suggested are still written (as '') so they replace whatever the person had before
+PERSON_PROPERTY_VALUES_SELECT_SQL = """
+SELECT
+team_id,
+kv.1 AS property_key,
+id AS person_id,
+if(length({property_value}) <= {max_value_length}, {property_value}, '') AS property_value,
+is_deleted,
+_timestamp
+FROM {{database}}.person
+ARRAY JOIN JSONExtractKeysAndValuesRaw(properties) AS kv
+WHERE property_key NOT IN ({ignored_keys})
+{{where}}
+""".format(
+    property_value=trim_quotes_expr("kv.2"),
+    ignored_keys=", ".join(f"'{key}'" for key in PROPERTY_VALUES_IGNORED_KEYS),
+    max_value_length=PROPERTY_VALUES_MAX_VALUE_LENGTH,
+)
+
+PERSON_PROPERTY_VALUES_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    table_name=PERSON_PROPERTY_VALUES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    database=settings.CLICKHOUSE_DATABASE,
+    select=PERSON_PROPERTY_VALUES_SELECT_SQL.format(database=settings.CLICKHOUSE_DATABASE, where=""),
+)
+
+TRUNCATE_PERSON_PROPERTY_VALUES_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {PERSON_PROPERTY_VALUES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+DROP_PERSON_PROPERTY_VALUES_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {PERSON_PROPERTY_VALUES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+TRUNCATE_PROPERTY_VALUES_TABLE_SQL = (
+    lambda: f"TRUNCATE TABLE IF EXISTS {PROPERTY_VALUES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+DROP_PROPERTY_VALUES_TABLE_SQL = (
+    lambda: f"DROP TABLE IF EXISTS {PROPERTY_VALUES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+SELECT_ROLLED_UP_PROP_VALUES_SQL = """
+SELECT
+    property_value,
+    sum(count) AS total
+FROM property_values
+WHERE
+    team_id = %(team_id)s AND
+    property_type = 'event' AND
+    property_key = %(key)s
+    {value_filter}
+GROUP BY property_value
+HAVING max(last_seen) >= %(last_seen_after)s
+ORDER BY total DESC
+LIMIT %(limit)s
+"""
+
+HAS_ROLLED_UP_PROP_VALUES_SQL = """
+SELECT 1
+FROM property_values
+WHERE
+    team_id = %(team_id)s AND
+    property_type = 'event' AND
+    property_key = %(key)s
+LIMIT 1
+"""
+
+# FINAL so that only the latest value of each person counts. Filters on the value have to apply after deduplication,
+# otherwise a person's old value could match and be counted, so they are in WHERE rather than PREWHERE.
+SELECT_PERSON_ROLLED_UP_PROP_VALUES_SQL = """
+SELECT
+    property_value,
+    count() AS total
+FROM person_property_values FINAL
+WHERE
+    team_id = %(team_id)s AND
+    property_key = %(key)s AND
+    is_deleted = 0 AND
+    property_value != ''
+    {value_filter}
+GROUP BY property_value
+ORDER BY total DESC
+LIMIT %(limit)s
+"""
+
+HAS_PERSON_ROLLED_UP_PROP_VALUES_SQL = """
+SELECT 1
+FROM person_property_values
+WHERE
+    team_id = %(team_id)s AND
+    property_key = %(key)s
+LIMIT 1
+"""
+
+# Marks that there's nothing to backfill into the rollups, e.g. on fresh installs. See 0005_fill_property_values
+COMMENT_PROPERTY_VALUES_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {PROPERTY_VALUES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}' COMMENT COLUMN property_value 'skip_0005_fill_property_values'"
+)
@@ -1,7 +1,8 @@
 from django.conf import settings
 
 from ee.clickhouse.sql.clickhouse import KAFKA_COLUMNS, kafka_engine, ttl_period
-from ee.clickhouse.sql.table_engines import Distributed, ReplacingMergeTree, ReplicationScheme
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+from ee.clickhouse.sql.table_engines import AggregatingMergeTree, Distributed, ReplacingMergeTree, ReplicationScheme
 from ee.kafka_client.topics import KAFKA_SESSION_RECORDING_EVENTS
 
 SESSION_RECORDING_EVENTS_DATA_TABLE = (
@@ -133,3 +134,163 @@ DROP_SESSION_RECORDING_EVENTS_TABLE_SQL = lambda: (
 UPDATE_RECORDINGS_TABLE_TTL_SQL = lambda: (
     f"ALTER TABLE {SESSION_RECORDING_EVENTS_DATA_TABLE()} MODIFY TTL toDate(created_at) + toIntervalWeek(%(weeks)s)"
 )
+
+
+# Per-session summary of recordings, rolled up from session_recording_events as they are inserted, so listing
+# recordings doesn't need to scan (and aggregate) the snapshot payloads themselves.
+SESSION_RECORDING_SUMMARIES_TABLE = "session_recording_summaries"
+
+SESSION_RECORDING_SUMMARIES_TABLE_ENGINE = lambda: AggregatingMergeTree(SESSION_RECORDING_SUMMARIES_TABLE)
+SESSION_RECORDING_SUMMARIES_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    session_id VARCHAR,
+    distinct_id SimpleAggregateFunction(any, VARCHAR),
+    window_ids SimpleAggregateFunction(groupUniqArrayArray, Array(VARCHAR)),
+    first_timestamp SimpleAggregateFunction(min, DateTime64(6, 'UTC')),
+    last_timestamp SimpleAggregateFunction(max, DateTime64(6, 'UTC')),
+    full_snapshot_count SimpleAggregateFunction(sum, UInt64),
+    click_count SimpleAggregateFunction(sum, UInt64),
+    keypress_count SimpleAggregateFunction(sum, UInt64)
+) ENGINE = {engine}
+ORDER BY (team_id, session_id)
+{ttl_period}
+""".format(
+    table_name=SESSION_RECORDING_SUMMARIES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=SESSION_RECORDING_SUMMARIES_TABLE_ENGINE(),
+    ttl_period=ttl_period("last_timestamp"),
+)
+
+# Snapshots are gzipped and chunked at capture, with rrweb interaction counts stored next to the chunks (on every chunk,
+# so only the first one is counted). Older, unchunked snapshots are single rrweb events which we can classify directly.
+_SNAPSHOT_INTERACTION_COUNT_EXPR = """if(
+        JSONHas(snapshot_data, 'chunk_id'),
+        if(JSONExtractInt(snapshot_data, 'chunk_index') = 0, JSONExtractUInt(snapshot_data, '{count_key}'), 0),
+        JSONExtractInt(snapshot_data, 'type') = 3 AND JSONExtractInt(snapshot_data, 'data', 'source') = {source}{extra_condition}
+    )"""
+
+SESSION_RECORDING_SUMMARIES_SELECT_SQL = """
+SELECT
+    team_id,
+    session_id,
+    any(distinct_id) AS distinct_id,
+    groupUniqArray(window_id) AS window_ids,
+    min(timestamp) AS first_timestamp,
+    max(timestamp) AS last_timestamp,
+    sum(JSONExtractBool(snapshot_data, 'has_full_snapshot')) AS full_snapshot_count,
+    sum({click_count}) AS click_count,
+    sum({keypress_count}) AS keypress_count
+FROM {{database}}.{{source_table}}
+{{where}}
+GROUP BY team_id, session_id
+""".format(
+    # rrweb IncrementalSource.MouseInteraction, MouseInteractions.Click
+    click_count=_SNAPSHOT_INTERACTION_COUNT_EXPR.format(
+        count_key="click_count", source=2, extra_condition=" AND JSONExtractInt(snapshot_data, 'data', 'type') = 2"
+    ),
+    # rrweb IncrementalSource.Input
+    keypress_count=_SNAPSHOT_INTERACTION_COUNT_EXPR.format(count_key="keypress_count", source=5, extra_condition=""),
+)
+
+SESSION_RECORDING_SUMMARIES_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    table_name=SESSION_RECORDING_SUMMARIES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    database=settings.CLICKHOUSE_DATABASE,
+    select=SESSION_RECORDING_SUMMARIES_SELECT_SQL.format(
+        database=settings.CLICKHOUSE_DATABASE, source_table=SESSION_RECORDING_EVENTS_DATA_TABLE(), where=""
+    ),
+)
+
+TRUNCATE_SESSION_RECORDING_SUMMARIES_TABLE_SQL = lambda: (
+    f"TRUNCATE TABLE IF EXISTS {SESSION_RECORDING_SUMMARIES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+DROP_SESSION_RECORDING_SUMMARIES_TABLE_SQL = lambda: (
+    f"DROP TABLE IF EXISTS {SESSION_RECORDING_SUMMARIES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+UPDATE_RECORDING_SUMMARIES_TABLE_TTL_SQL = lambda: (
+    f"ALTER TABLE {SESSION_RECORDING_SUMMARIES_TABLE} MODIFY TTL toDate(last_timestamp) + toIntervalWeek(%(weeks)s)"
+)
+
+# Marks that there's nothing to backfill into `session_recording_summaries`, e.g. on fresh installs.
+# See 0007_fill_session_recording_summaries
+COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {SESSION_RECORDING_SUMMARIES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}' COMMENT COLUMN session_id 'skip_0007_fill_session_recording_summaries'"
+)
+
+
+# Which events were seen in each session (by `$session_id`), rolled up from events as they are inserted, so recordings
+# can be filtered by the events performed in them without joining events against recordings.
+SESSION_EVENT_SUMMARIES_TABLE = "session_event_summaries"
+
+SESSION_EVENT_SUMMARIES_TABLE_ENGINE = lambda: AggregatingMergeTree(SESSION_EVENT_SUMMARIES_TABLE)
+SESSION_EVENT_SUMMARIES_TABLE_SQL = lambda: """
+CREATE TABLE IF NOT EXISTS {table_name} ON CLUSTER '{cluster}'
+(
+    team_id Int64,
+    event VARCHAR,
+    session_id VARCHAR,
+    event_count SimpleAggregateFunction(sum, UInt64),
+    first_timestamp SimpleAggregateFunction(min, DateTime64(6, 'UTC')),
+    last_timestamp SimpleAggregateFunction(max, DateTime64(6, 'UTC'))
+) ENGINE = {engine}
+ORDER BY (team_id, event, session_id)
+{ttl_period}
+""".format(
+    table_name=SESSION_EVENT_SUMMARIES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    engine=SESSION_EVENT_SUMMARIES_TABLE_ENGINE(),
+    ttl_period=ttl_period("last_timestamp"),
+)
+
+SESSION_EVENT_SUMMARIES_SELECT_SQL = """
+SELECT
+    team_id,
+    event,
+    JSONExtractString(properties, '$session_id') AS session_id,
+    count() AS event_count,
+    min(timestamp) AS first_timestamp,
+    max(timestamp) AS last_timestamp
+FROM {database}.{source_table}
+WHERE session_id != ''
+{where}
+GROUP BY team_id, event, session_id
+"""
+
+SESSION_EVENT_SUMMARIES_MV_SQL = lambda: """
+CREATE MATERIALIZED VIEW IF NOT EXISTS {table_name}_mv ON CLUSTER '{cluster}'
+TO {database}.{table_name}
+AS {select}
+""".format(
+    table_name=SESSION_EVENT_SUMMARIES_TABLE,
+    cluster=settings.CLICKHOUSE_CLUSTER,
+    database=settings.CLICKHOUSE_DATABASE,
+    select=SESSION_EVENT_SUMMARIES_SELECT_SQL.format(
+        database=settings.CLICKHOUSE_DATABASE, source_table=EVENTS_DATA_TABLE(), where=""
+    ),
+)
+
+TRUNCATE_SESSION_EVENT_SUMMARIES_TABLE_SQL = lambda: (
+    f"TRUNCATE TABLE IF EXISTS {SESSION_EVENT_SUMMARIES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+DROP_SESSION_EVENT_SUMMARIES_TABLE_SQL = lambda: (
+    f"DROP TABLE IF EXISTS {SESSION_EVENT_SUMMARIES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}'"
+)
+
+UPDATE_SESSION_EVENT_SUMMARIES_TABLE_TTL_SQL = lambda: (
+    f"ALTER TABLE {SESSION_EVENT_SUMMARIES_TABLE} MODIFY TTL toDate(last_timestamp) + toIntervalWeek(%(weeks)s)"
+)
+
+# Marks that there's nothing to backfill into `session_event_summaries`, e.g. on fresh installs.
+# See 0008_fill_session_event_summaries
+COMMENT_SESSION_EVENT_SUMMARIES_COLUMN_SQL = (
+    lambda: f"ALTER TABLE {SESSION_EVENT_SUMMARIES_TABLE} ON CLUSTER '{settings.CLICKHOUSE_CLUSTER}' COMMENT COLUMN session_id 'skip_0008_fill_session_event_summaries'"
+)
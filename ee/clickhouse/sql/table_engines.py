@@ -14,6 +14,7 @@ class ReplicationScheme(str, Enum):
 # Relevant documentation:
 # - https://clickhouse.com/docs/en/engines/table-engines/mergetree-family/
 # - https://clickhouse.com/docs/en/engines/table-engines/mergetree-family/replacingmergetree/
+# - https://clickhouse.com/docs/en/engines/table-engines/mergetree-family/aggregatingmergetree/
 # - https://clickhouse.com/docs/en/engines/table-engines/mergetree-family/replication/
 class MergeTreeEngine:
     ENGINE = ""
@@ -55,6 +56,11 @@ class MergeTreeEngine:
         return self.REPLICATED_ENGINE.format(zk_path=zk_path, replica_key=replica_key, **self.kwargs)
 
 
+class MergeTree(MergeTreeEngine):
+    ENGINE = "MergeTree()"
+    REPLICATED_ENGINE = "ReplicatedMergeTree('{zk_path}', '{replica_key}')"
+
+
 class ReplacingMergeTree(MergeTreeEngine):
     ENGINE = "ReplacingMergeTree({ver})"
     REPLICATED_ENGINE = "ReplicatedReplacingMergeTree('{zk_path}', '{replica_key}', {ver})"
@@ -65,6 +71,11 @@ class CollapsingMergeTree(MergeTreeEngine):
     REPLICATED_ENGINE = "ReplicatedCollapsingMergeTree('{zk_path}', '{replica_key}', {ver})"
 
 
+class AggregatingMergeTree(MergeTreeEngine):
+    ENGINE = "AggregatingMergeTree()"
+    REPLICATED_ENGINE = "ReplicatedAggregatingMergeTree('{zk_path}', '{replica_key}')"
+
+
 class Distributed:
     def __init__(self, data_table: str, sharding_key: str):
         self.data_table = data_table
@@ -73,6 +73,49 @@ FROM events e
 GROUP BY day_start, breakdown_value
 """
 
+# Single pass variant of BREAKDOWN_QUERY_SQL: rather than first querying the top breakdown values and then filtering the
+# series query by them, the top values are picked from the same aggregation.
+#
+# The inner query rolls up per (breakdown_value, day_start) totals into per breakdown_value totals (rows where
+# day_start is NULL), which are used for ranking. The zero filling is done over arrays, as the ticks no longer need
+# to be joined against a list of breakdown values.
+BREAKDOWN_SINGLE_PASS_QUERY_SQL = """
+WITH arrayConcat(
+    arrayMap(number -> toDateTime({interval}(toDateTime(%(date_to)s) - number * %(seconds_in_interval)s), 'UTC'), range({num_intervals})),
+    [toDateTime({interval}(toDateTime(%(date_from)s)), 'UTC')]
+) AS ticks
+SELECT
+    arraySort(arrayDistinct(arrayConcat(ticks, days))) as date,
+    arrayMap(day -> if(indexOf(days, day) = 0, 0, totals[indexOf(days, day)]), date) as data,
+    breakdown_value
+FROM (
+    SELECT
+        groupArrayIf(assumeNotNull(day_start), isNotNull(day_start)) as days,
+        groupArrayIf(total, isNotNull(day_start)) as totals,
+        anyIf(breakdown_rank, isNull(day_start)) as value_rank,
+        breakdown_value
+    FROM ({inner_sql})
+    WHERE isNotNull(breakdown_value)
+    GROUP BY breakdown_value
+    ORDER BY value_rank DESC, breakdown_value
+    LIMIT %(limit)s OFFSET %(offset)s
+)
+ORDER BY breakdown_value
+"""
+
+BREAKDOWN_SINGLE_PASS_INNER_SQL = """
+SELECT
+    {aggregate_operation} as total,
+    {rank_operation} as breakdown_rank,
+    toNullable(toDateTime({interval_annotation}(timestamp), 'UTC')) as day_start,
+    toNullable({breakdown_value}) as breakdown_value
+FROM events e
+{person_join}
+{groups_join}
+{breakdown_filter}
+GROUP BY breakdown_value, day_start WITH ROLLUP
+"""
+
 BREAKDOWN_CUMULATIVE_INNER_SQL = """
 SELECT
     {aggregate_operation} as total,
@@ -132,6 +175,20 @@ GROUP BY breakdown_value
 ORDER BY breakdown_value
 """
 
+BREAKDOWN_AGGREGATE_SINGLE_PASS_QUERY_SQL = """
+SELECT total, breakdown_value FROM (
+    SELECT {aggregate_operation} AS total, {rank_operation} AS breakdown_rank, {breakdown_value} AS breakdown_value
+    FROM events e
+    {person_join}
+    {groups_join}
+    {breakdown_filter}
+    GROUP BY breakdown_value
+    ORDER BY breakdown_rank DESC, breakdown_value
+    LIMIT %(limit)s OFFSET %(offset)s
+)
+ORDER BY breakdown_value
+"""
+
 BREAKDOWN_ACTIVE_USER_CONDITIONS_SQL = """
 WHERE e.team_id = %(team_id)s {event_filter} {filters} {parsed_date_from_prev_range} {parsed_date_to} {actions_query}
 """
@@ -142,6 +199,11 @@ WHERE e.team_id = %(team_id)s {event_filter} {filters} {parsed_date_from} {parse
   {actions_query}
 """
 
+BREAKDOWN_PROP_FILTER_SQL = """
+WHERE e.team_id = %(team_id)s {event_filter} {filters} {parsed_date_from} {parsed_date_to}
+  {actions_query}
+"""
+
 BREAKDOWN_COHORT_JOIN_SQL = """
 INNER JOIN (
     {cohort_queries}
@@ -30,3 +30,19 @@ CUMULATIVE_SQL = """
 SELECT person_id, min(timestamp) as timestamp
 FROM ({event_query}) GROUP BY person_id
 """
+
+# Like VOLUME_SQL and AGGREGATE_SQL, but for several entities read in one scan: the event query tags every event with
+# the indexes of the entities it matches as `entity_index`, and every entity gets its own zero filled series
+VOLUME_ENTITIES_SQL = """
+SELECT entity_index, {aggregate_operation} as data, toDateTime({interval}(timestamp), 'UTC') as date FROM ({event_query}) GROUP BY entity_index, {interval}(timestamp)
+"""
+
+AGGREGATE_ENTITIES_SQL = """
+SELECT entity_index, groupArray(day_start) as date, groupArray(count) as data FROM (
+    SELECT entity_index, SUM(total) AS count, day_start FROM (
+        SELECT entity_index, total, day_start FROM ({null_sql}) ARRAY JOIN range(%(num_entities)s) AS entity_index
+        UNION ALL {content_sql}
+    ) GROUP BY entity_index, day_start ORDER BY entity_index, day_start
+) GROUP BY entity_index ORDER BY entity_index
+SETTINGS timeout_before_checking_execution_speed = 60
+"""
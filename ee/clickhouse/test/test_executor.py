@@ -0,0 +1,39 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ee.clickhouse.executor import execute_concurrently
+from ee.clickhouse.util import ClickhouseTestMixin
+from posthog.exceptions import QueryDeadlineExceeded
+
+
+class ClickhouseExecutorTestCase(TestCase, ClickhouseTestMixin):
+    def test_results_are_returned_in_query_order(self):
+        queries = [("SELECT %(value)s", {"value": value}) for value in range(5)]
+
+        with self.settings(TEST=False):
+            results = execute_concurrently(queries)
+
+        self.assertEqual(results, [[(value,)] for value in range(5)])
+
+    def test_queries_run_in_order_in_tests(self):
+        with self.capture_select_queries() as queries:
+            execute_concurrently([("SELECT 1", {}), ("SELECT 2", {})])
+
+        self.assertEqual(queries, ["SELECT 1", "SELECT 2"])
+
+    def test_failing_query_raises(self):
+        with self.settings(TEST=False):
+            with self.assertRaises(Exception):
+                execute_concurrently([("SELECT 1", {}), ("SELECT * FROM non_existent_table", {})])
+
+    @patch("ee.clickhouse.executor._cancel_queries")
+    def test_deadline_kills_outstanding_queries(self, cancel_queries):
+        with self.settings(TEST=False):
+            with self.assertRaises(QueryDeadlineExceeded):
+                execute_concurrently([("SELECT 1", {}), ("SELECT sleep(2)", {})], deadline_seconds=0.5)
+
+        futures, query_ids = cancel_queries.call_args[0]
+        self.assertEqual(len(query_ids), 2)
+        self.assertTrue(futures[0].done())
+        self.assertFalse(futures[1].done())
@@ -6,12 +6,26 @@ from unittest.mock import patch
 import sqlparse
 
 from ee.clickhouse.client import ch_pool, sync_execute
-from ee.clickhouse.sql.events import DISTRIBUTED_EVENTS_TABLE_SQL, DROP_EVENTS_TABLE_SQL, EVENTS_TABLE_SQL
-from ee.clickhouse.sql.person import DROP_PERSON_TABLE_SQL, PERSONS_TABLE_SQL, TRUNCATE_PERSON_DISTINCT_ID_TABLE_SQL
+from ee.clickhouse.sql.actor_activity import TRUNCATE_ACTOR_ACTIVITY_TABLE_SQL
+from ee.clickhouse.sql.events import (
+    DISTRIBUTED_EVENTS_TABLE_SQL,
+    DROP_EVENTS_TABLE_SQL,
+    EVENTS_TABLE_SQL,
+    TRUNCATE_EARLIEST_TIMESTAMPS_TABLE_SQL,
+)
+from ee.clickhouse.sql.person import (
+    DROP_PERSON_TABLE_SQL,
+    PERSONS_TABLE_SQL,
+    TRUNCATE_PERSON_DISTINCT_ID_TABLE_SQL,
+    TRUNCATE_PERSONS_LATEST_TABLE_SQL,
+)
+from ee.clickhouse.sql.property_values import TRUNCATE_PERSON_PROPERTY_VALUES_TABLE_SQL
 from ee.clickhouse.sql.session_recording_events import (
     DISTRIBUTED_SESSION_RECORDING_EVENTS_TABLE_SQL,
     DROP_SESSION_RECORDING_EVENTS_TABLE_SQL,
     SESSION_RECORDING_EVENTS_TABLE_SQL,
+    TRUNCATE_SESSION_EVENT_SUMMARIES_TABLE_SQL,
+    TRUNCATE_SESSION_RECORDING_SUMMARIES_TABLE_SQL,
 )
 from posthog.settings import CLICKHOUSE_REPLICATION
 from posthog.test.base import BaseTest, QueryMatchingTest
@@ -62,12 +76,18 @@ class ClickhouseDestroyTablesMixin(BaseTest):
     def setUp(self):
         super().setUp()
         sync_execute(DROP_EVENTS_TABLE_SQL())
+        sync_execute(TRUNCATE_EARLIEST_TIMESTAMPS_TABLE_SQL())
         sync_execute(EVENTS_TABLE_SQL())
         sync_execute(DROP_PERSON_TABLE_SQL)
         sync_execute(TRUNCATE_PERSON_DISTINCT_ID_TABLE_SQL)
         sync_execute(PERSONS_TABLE_SQL())
+        sync_execute(TRUNCATE_PERSONS_LATEST_TABLE_SQL)
+        sync_execute(TRUNCATE_PERSON_PROPERTY_VALUES_TABLE_SQL())
         sync_execute(DROP_SESSION_RECORDING_EVENTS_TABLE_SQL())
         sync_execute(SESSION_RECORDING_EVENTS_TABLE_SQL())
+        sync_execute(TRUNCATE_SESSION_RECORDING_SUMMARIES_TABLE_SQL())
+        sync_execute(TRUNCATE_SESSION_EVENT_SUMMARIES_TABLE_SQL())
+        sync_execute(TRUNCATE_ACTOR_ACTIVITY_TABLE_SQL())
         if CLICKHOUSE_REPLICATION:
             sync_execute(DISTRIBUTED_EVENTS_TABLE_SQL())
             sync_execute(DISTRIBUTED_SESSION_RECORDING_EVENTS_TABLE_SQL())
@@ -75,12 +95,18 @@ class ClickhouseDestroyTablesMixin(BaseTest):
     def tearDown(self):
         super().tearDown()
         sync_execute(DROP_EVENTS_TABLE_SQL())
+        sync_execute(TRUNCATE_EARLIEST_TIMESTAMPS_TABLE_SQL())
         sync_execute(EVENTS_TABLE_SQL())
         sync_execute(DROP_PERSON_TABLE_SQL)
         sync_execute(TRUNCATE_PERSON_DISTINCT_ID_TABLE_SQL)
         sync_execute(PERSONS_TABLE_SQL())
+        sync_execute(TRUNCATE_PERSONS_LATEST_TABLE_SQL)
+        sync_execute(TRUNCATE_PERSON_PROPERTY_VALUES_TABLE_SQL())
         sync_execute(DROP_SESSION_RECORDING_EVENTS_TABLE_SQL())
         sync_execute(SESSION_RECORDING_EVENTS_TABLE_SQL())
+        sync_execute(TRUNCATE_SESSION_RECORDING_SUMMARIES_TABLE_SQL())
+        sync_execute(TRUNCATE_SESSION_EVENT_SUMMARIES_TABLE_SQL())
+        sync_execute(TRUNCATE_ACTOR_ACTIVITY_TABLE_SQL())
         if CLICKHOUSE_REPLICATION:
             sync_execute(DISTRIBUTED_EVENTS_TABLE_SQL())
             sync_execute(DISTRIBUTED_SESSION_RECORDING_EVENTS_TABLE_SQL())
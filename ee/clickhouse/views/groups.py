@@ -1,19 +1,39 @@
 from collections import defaultdict
+from datetime import timedelta
 from typing import Dict, List, cast
 
+from django.core.cache import cache
 from rest_framework import mixins, request, response, serializers, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import CursorPagination
 from rest_framework.permissions import IsAuthenticated
 
 from ee.clickhouse.client import sync_execute
+from ee.clickhouse.materialized_columns.util import cache_for
 from ee.clickhouse.queries.related_actors_query import RelatedActorsQuery
-from ee.clickhouse.sql.clickhouse import trim_quotes_expr
+from ee.clickhouse.sql.groups import (
+    GROUP_PROPERTY_VALUES_OF_GROUPS_SQL,
+    GROUP_PROPERTY_VALUES_TABLE,
+    SELECT_GROUP_PROPERTY_DEFINITIONS_SQL,
+    SELECT_GROUP_PROPERTY_VALUES_SQL,
+)
 from posthog.api.routing import StructuredViewSetMixin
+from posthog.models.async_migration import is_async_migration_complete
 from posthog.models.group import Group
 from posthog.models.group_type_mapping import GroupTypeMapping
 from posthog.permissions import ProjectMembershipNecessaryPermissions, TeamMemberAccessPermission
+from posthog.settings import BENCHMARK, TEST
+from posthog.utils import generate_cache_key, get_safe_cache, should_refresh
+
+# Default and maximum number of results
+GROUP_PROPERTY_DEFINITIONS_LIMIT = 1000  # per group type
+GROUP_PROPERTY_VALUES_LIMIT = 50
+# Related actors are looked up over the last 90 days of events, so a few minutes of staleness isn't noticeable
+RELATED_ACTORS_CACHE_TTL = 5 * 60
+
+# The counts only cover all groups once 0009_fill_group_property_values has backfilled them
+group_property_values_ready = TEST or BENCHMARK
 
 
 class GroupTypeSerializer(serializers.ModelSerializer):
@@ -78,21 +98,27 @@ class ClickhouseGroupsView(StructuredViewSetMixin, mixins.ListModelMixin, viewse
         group_type_index = request.GET.get("group_type_index")
         id = request.GET["id"]
 
-        results = RelatedActorsQuery(self.team.pk, group_type_index, id).run()
+        cache_key = generate_cache_key(f"related_actors_{self.team.pk}_{group_type_index}_{id}")
+        results = None if should_refresh(request) else get_safe_cache(cache_key)
+        if results is None:
+            results = RelatedActorsQuery(self.team.pk, group_type_index, id).run()
+            cache.set(cache_key, results, RELATED_ACTORS_CACHE_TTL)
         return response.Response(results)
 
     @action(methods=["GET"], detail=False)
     def property_definitions(self, request: request.Request, **kw):
+        filters = ""
+        params = {"team_id": self.team.pk, "limit": _get_limit(request, GROUP_PROPERTY_DEFINITIONS_LIMIT)}
+        if request.GET.get("group_type_index") is not None:
+            filters += "AND group_type_index = %(group_type_index)s "
+            params["group_type_index"] = request.GET["group_type_index"]
+        if request.GET.get("search"):
+            filters += "AND property_key ILIKE %(search)s "
+            params["search"] = "{}%".format(_escape_like(request.GET["search"]))
+
         rows = sync_execute(
-            f"""
-            SELECT group_type_index, tupleElement(keysAndValues, 1) as key, count(*) as count
-            FROM groups
-            ARRAY JOIN JSONExtractKeysAndValuesRaw(group_properties) as keysAndValues
-            WHERE team_id = %(team_id)s
-            GROUP BY group_type_index, tupleElement(keysAndValues, 1)
-            ORDER BY group_type_index ASC, count DESC, key ASC
-            """,
-            {"team_id": self.team.pk},
+            SELECT_GROUP_PROPERTY_DEFINITIONS_SQL.format(source=_get_group_property_values_source(), filters=filters),
+            params,
         )
 
         group_type_index_to_properties = defaultdict(list)
@@ -103,16 +129,45 @@ class ClickhouseGroupsView(StructuredViewSetMixin, mixins.ListModelMixin, viewse
 
     @action(methods=["GET"], detail=False)
     def property_values(self, request: request.Request, **kw):
+        filters = ""
+        params = {
+            "team_id": self.team.pk,
+            "group_type_index": request.GET["group_type_index"],
+            "key": request.GET["key"],
+            "limit": _get_limit(request, GROUP_PROPERTY_VALUES_LIMIT),
+        }
+        if request.GET.get("value"):
+            filters = "AND property_value ILIKE %(value)s"
+            params["value"] = "{}%".format(_escape_like(request.GET["value"]))
+
         rows = sync_execute(
-            f"""
-            SELECT {trim_quotes_expr("tupleElement(keysAndValues, 2)")} as value
-            FROM groups
-            ARRAY JOIN JSONExtractKeysAndValuesRaw(group_properties) as keysAndValues
-            WHERE team_id = %(team_id)s AND group_type_index = %(group_type_index)s AND tupleElement(keysAndValues, 1) = %(key)s
-            GROUP BY tupleElement(keysAndValues, 2)
-            ORDER BY value ASC
-        """,
-            {"team_id": self.team.pk, "group_type_index": request.GET["group_type_index"], "key": request.GET["key"]},
+            SELECT_GROUP_PROPERTY_VALUES_SQL.format(source=_get_group_property_values_source(), filters=filters), params
         )
 
-        return response.Response([{"name": name[0]} for name in rows])
+        return response.Response([{"name": name} for name, _ in rows])
+
+
+def _get_group_property_values_source() -> str:
+    global group_property_values_ready
+
+    group_property_values_ready = group_property_values_ready or _fetch_group_property_values_ready_cached()
+    return GROUP_PROPERTY_VALUES_TABLE if group_property_values_ready else GROUP_PROPERTY_VALUES_OF_GROUPS_SQL
+
+
+# :TRICKY: Like with person_distinct_id2, negative responses are cached for a minute and a positive one forever.
+@cache_for(timedelta(minutes=1))
+def _fetch_group_property_values_ready_cached() -> bool:
+    return is_async_migration_complete("0009_fill_group_property_values")
+
+
+def _get_limit(request: request.Request, max_limit: int) -> int:
+    try:
+        limit = int(request.GET.get("limit", max_limit))
+    except ValueError:
+        raise ValidationError({"limit": "A valid integer is required."})
+    return max(1, min(limit, max_limit))
+
+
+def _escape_like(value: str) -> str:
+    "Escapes characters with a special meaning in LIKE patterns, so that prefixes are matched literally"
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
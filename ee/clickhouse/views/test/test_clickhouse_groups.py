@@ -1,7 +1,10 @@
+from datetime import datetime
+from unittest.mock import patch
 from uuid import UUID, uuid4
 
 from freezegun.api import freeze_time
 
+from ee.clickhouse.client import sync_execute
 from ee.clickhouse.models.event import create_event
 from ee.clickhouse.models.group import create_group
 from ee.clickhouse.util import ClickhouseTestMixin, snapshot_clickhouse_queries
@@ -176,6 +179,20 @@ class ClickhouseTestGroupsApi(ClickhouseTestMixin, APIBaseTest):
             ],
         )
 
+    @freeze_time("2021-05-10")
+    def test_related_groups_are_cached(self):
+        self._create_related_groups_data()
+        url = f"/api/projects/{self.team.id}/groups/related?id=0::0&group_type_index=0"
+
+        response = self.client.get(url).json()
+        with self.capture_select_queries() as queries:
+            self.assertEqual(self.client.get(url).json(), response)
+        self.assertEqual(queries, [])
+
+        with self.capture_select_queries() as queries:
+            self.assertEqual(self.client.get(f"{url}&refresh=true").json(), response)
+        self.assertEqual(len(queries), 1)
+
     def test_property_definitions(self):
         create_group(
             team_id=self.team.pk,
@@ -196,6 +213,25 @@ class ClickhouseTestGroupsApi(ClickhouseTestMixin, APIBaseTest):
             },
         )
 
+    def test_property_definitions_search_and_limit(self):
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "finance"})
+        create_group(
+            team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "tech", "name": "a"}
+        )
+        # Upserting a group again doesn't count it twice
+        create_group(
+            team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "tech", "name": "b"}
+        )
+        create_group(team_id=self.team.pk, group_type_index=1, group_key="company:1", properties={"industry": "a"})
+
+        response = self.client.get(f"/api/projects/{self.team.id}/groups/property_definitions?search=ind").json()
+        self.assertEqual(response, {"0": [{"name": "industry", "count": 2}], "1": [{"name": "industry", "count": 1}]})
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_definitions?group_type_index=0&limit=1"
+        ).json()
+        self.assertEqual(response, {"0": [{"name": "industry", "count": 2}]})
+
     def test_property_values(self):
         create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "finance"})
         create_group(team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "technology"})
@@ -206,6 +242,121 @@ class ClickhouseTestGroupsApi(ClickhouseTestMixin, APIBaseTest):
         self.assertEqual(len(response), 2)
         self.assertEqual(response, [{"name": "finance"}, {"name": "technology"}])
 
+    def test_property_values_search_and_limit(self):
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "finance"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "fintech"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:7", properties={"industry": "fintech"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:8", properties={"industry": "technology"})
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0&value=Fin"
+        ).json()
+        self.assertEqual(response, [{"name": "fintech"}, {"name": "finance"}])
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0&limit=1"
+        ).json()
+        self.assertEqual(response, [{"name": "fintech"}])
+
+    def test_property_values_of_upserted_groups(self):
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"name": "a"})
+        create_group(
+            team_id=self.team.pk,
+            group_type_index=0,
+            group_key="org:6",
+            properties={"name": "a"},
+            timestamp=datetime(2021, 1, 1),
+        )
+        # Changed groups only count towards their new value
+        create_group(
+            team_id=self.team.pk,
+            group_type_index=0,
+            group_key="org:6",
+            properties={"name": "b"},
+            timestamp=datetime(2021, 1, 2),
+        )
+        create_group(
+            team_id=self.team.pk,
+            group_type_index=0,
+            group_key="org:7",
+            properties={"name": "c"},
+            timestamp=datetime(2021, 1, 1),
+        )
+        # Properties removed from a group no longer count
+        create_group(
+            team_id=self.team.pk, group_type_index=0, group_key="org:7", properties={}, timestamp=datetime(2021, 1, 2)
+        )
+        # Versions older than the latest one don't change anything
+        create_group(
+            team_id=self.team.pk,
+            group_type_index=0,
+            group_key="org:6",
+            properties={"name": "d"},
+            timestamp=datetime(2020, 12, 1),
+        )
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=name&group_type_index=0"
+        ).json()
+        self.assertEqual(response, [{"name": "a"}, {"name": "b"}])
+
+        response = self.client.get(f"/api/projects/{self.team.id}/groups/property_definitions").json()
+        self.assertEqual(response, {"0": [{"name": "name", "count": 2}]})
+
+    @patch("ee.clickhouse.views.groups.group_property_values_ready", False)
+    def test_property_values_count_groups_until_backfilled(self):
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "finance"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "tech"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:7", properties={"industry": "tech"})
+        # As if the groups were upserted before the counts existed
+        sync_execute("TRUNCATE TABLE group_property_values")
+
+        with self.capture_select_queries() as queries:
+            response = self.client.get(
+                f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0"
+            ).json()
+        self.assertEqual(response, [{"name": "tech"}, {"name": "finance"}])
+        self.assertNotIn("FROM group_property_values", queries[0])
+
+        response = self.client.get(f"/api/projects/{self.team.id}/groups/property_definitions").json()
+        self.assertEqual(response, {"0": [{"name": "industry", "count": 3}]})
+
+    def test_property_values_search_is_literal(self):
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "fin_tech"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "fintech"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:7", properties={"industry": "100%"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:8", properties={"industry": "1000"})
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0&value=fin_"
+        ).json()
+        self.assertEqual(response, [{"name": "fin_tech"}])
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0&value=100%25"
+        ).json()
+        self.assertEqual(response, [{"name": "100%"}])
+
+        response = self.client.get(f"/api/projects/{self.team.id}/groups/property_definitions?search=_").json()
+        self.assertEqual(response, {})
+
+    def test_property_values_invalid_limit(self):
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "finance"})
+        create_group(team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "tech"})
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0&limit=abc"
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(f"/api/projects/{self.team.id}/groups/property_definitions?limit=abc")
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get(
+            f"/api/projects/{self.team.id}/groups/property_values/?key=industry&group_type_index=0&limit=-1"
+        ).json()
+        self.assertEqual(response, [{"name": "finance"}])
+
     def test_empty_property_values(self):
         create_group(team_id=self.team.pk, group_type_index=0, group_key="org:5", properties={"industry": "finance"})
         create_group(team_id=self.team.pk, group_type_index=0, group_key="org:6", properties={"industry": "technology"})
@@ -8,7 +8,7 @@ from ee.clickhouse.models.group import create_group
 from ee.clickhouse.queries.stickiness.clickhouse_stickiness import ClickhouseStickiness
 from ee.clickhouse.queries.util import get_earliest_timestamp
 from ee.clickhouse.util import ClickhouseTestMixin, snapshot_clickhouse_queries
-from posthog.api.test.test_stickiness import get_stickiness_time_series_ok, stickiness_test_factory
+from posthog.api.test.test_stickiness import get_stickiness_ok, get_stickiness_time_series_ok, stickiness_test_factory
 from posthog.api.test.test_trends import get_people_from_url_ok
 from posthog.models.action import Action
 from posthog.models.action_step import ActionStep
@@ -121,3 +121,37 @@ class TestClickhouseStickiness(ClickhouseTestMixin, stickiness_test_factory(Clic
         assert sorted([p["id"] for p in week1_actors]) == sorted(["org:0", "org:2"])
         assert sorted([p["id"] for p in week2_actors]) == sorted([])
         assert sorted([p["id"] for p in week3_actors]) == sorted(["org:1"])
+
+    def test_multiple_entities_match_separate_queries(self):
+        self._create_multiple_people()
+        watched_movie = _create_action(team=self.team, name="watch movie action", event_name="watched movie")
+
+        entities = {
+            "events": [
+                {"id": "watched movie", "order": 0},
+                {"id": "watched movie", "order": 1, "properties": [{"key": "$browser", "value": "Chrome"}]},
+                {"id": "other event", "order": 2},
+            ],
+            "actions": [{"id": watched_movie.pk, "order": 3}],
+        }
+        base_request = {"shown_as": "Stickiness", "date_from": "2020-01-01", "date_to": "2020-01-08"}
+
+        with freeze_time("2020-01-08T13:01:01Z"):
+            combined = get_stickiness_ok(client=self.client, team=self.team, request={**base_request, **entities})[
+                "result"
+            ]
+            separate = [
+                get_stickiness_ok(client=self.client, team=self.team, request={**base_request, entity_type: [entity]})[
+                    "result"
+                ][0]
+                for entity_type, entity in [
+                    ("events", entities["events"][0]),
+                    ("events", entities["events"][1]),
+                    ("events", entities["events"][2]),
+                    ("actions", entities["actions"][0]),
+                ]
+            ]
+
+        self.assertEqual([series["label"] for series in combined], [series["label"] for series in separate])
+        self.assertEqual([series["data"] for series in combined], [series["data"] for series in separate])
+        self.assertEqual([series["count"] for series in combined], [4, 3, 0, 4])
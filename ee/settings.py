@@ -90,6 +90,30 @@ MATERIALIZE_COLUMNS_BACKFILL_PERIOD_DAYS = get_from_env("MATERIALIZE_COLUMNS_BAC
 # Maximum number of columns to materialize at once. Avoids running into resource bottlenecks (storage + ingest + backfilling).
 MATERIALIZE_COLUMNS_MAX_AT_ONCE = get_from_env("MATERIALIZE_COLUMNS_MAX_AT_ONCE", 10, type_cast=int)
 
+# Funnel correlation over all properties of persons/groups or events first estimates from a sample which properties
+# are worth correlating, then only computes contingency tables for up to this many of them
+FUNNEL_CORRELATION_MAX_PROPERTIES = get_from_env("FUNNEL_CORRELATION_MAX_PROPERTIES", 100, type_cast=int)
+# Share of events (or of funnel actors, for person and group properties) used for the estimate
+FUNNEL_CORRELATION_SAMPLE_RATE = get_from_env("FUNNEL_CORRELATION_SAMPLE_RATE", 0.1, type_cast=float)
+# Resource limits for correlation queries. Aggregations spill to disk past half of the memory limit
+FUNNEL_CORRELATION_MAX_MEMORY_USAGE = get_from_env(
+    "FUNNEL_CORRELATION_MAX_MEMORY_USAGE", 10 * 1024 * 1024 * 1024, type_cast=int
+)
+FUNNEL_CORRELATION_MAX_EXECUTION_TIME = get_from_env("FUNNEL_CORRELATION_MAX_EXECUTION_TIME", 180, type_cast=int)
+
+# Paths queries keep the compacted per-person session paths they read for this many seconds, so that queries over the
+# same events which only change start/end points, step limit, groupings or edge limits don't read events again.
+# Until they expire, such queries don't see events ingested since the paths were kept. 0 disables this
+PATHS_PERSON_PATHS_CACHE_TTL = get_from_env("PATHS_PERSON_PATHS_CACHE_TTL", 0 if TEST else 10 * 60, type_cast=int)
+# Paths queries only collect this many events of each session. Longer sessions (mostly bots) are cut short, which is
+# counted by the `paths_query_truncated_edges` metric
+PATHS_MAX_EVENTS_IN_SESSION = get_from_env("PATHS_MAX_EVENTS_IN_SESSION", 1000, type_cast=int)
+# Retention, stickiness and lifecycle read per day actor activity from `actor_activity` instead of events when filters
+# allow for it, once the 0006_fill_actor_activity async migration has backfilled it
+ACTOR_ACTIVITY_ROLLUP_ENABLED = get_from_env("ACTOR_ACTIVITY_ROLLUP_ENABLED", True, type_cast=str_to_bool)
+# Trends with several series sharing their math read events once for all of them rather than once per series
+TRENDS_COMBINE_ENTITIES = get_from_env("TRENDS_COMBINE_ENTITIES", True, type_cast=str_to_bool)
+
 # Topic to write events to between clickhouse
 KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC: str = os.getenv(
     "KAFKA_EVENTS_PLUGIN_INGESTION_TOPIC", DEFAULT_KAFKA_EVENTS_PLUGIN_INGESTION
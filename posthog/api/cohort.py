@@ -186,9 +186,7 @@ class CohortViewSet(StructuredViewSetMixin, viewsets.ModelViewSet):
 
         query, params = ClickhousePersonQuery(filter, team.pk, cohort=cohort).get_query()
 
-        raw_result = sync_execute(query, params)
-        actor_ids = [row[0] for row in raw_result]
-        actors, serialized_actors = get_people(team.pk, actor_ids)
+        _, actors, serialized_actors = get_people(team.pk, f"SELECT id AS actor_id FROM ({query})", params)
 
         _should_paginate = should_paginate(actors, filter.limit)
         next_url = format_query_params_absolute_url(request, filter.offset + filter.limit) if _should_paginate else None
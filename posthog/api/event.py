@@ -1,9 +1,20 @@
 import json
 import urllib
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
+from dateutil.parser import isoparse
 from django.db.models.query import Prefetch
+from django.http import StreamingHttpResponse
 from django.utils.timezone import now
 from rest_framework import mixins, request, response, serializers, viewsets
 from rest_framework.decorators import action
@@ -13,7 +24,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.settings import api_settings
 from rest_framework_csv import renderers as csvrenderers
 
-from ee.clickhouse.client import sync_execute
+from ee.clickhouse.client import sync_execute, sync_execute_iter
 from ee.clickhouse.models.action import format_action_filter
 from ee.clickhouse.models.event import ClickhouseEventSerializer, determine_event_conditions
 from ee.clickhouse.models.person import get_persons_by_distinct_ids
@@ -27,6 +38,7 @@ from ee.clickhouse.sql.events import (
 )
 from posthog.api.documentation import PropertiesSerializer, extend_schema
 from posthog.api.routing import StructuredViewSetMixin
+from posthog.helpers.streaming_export import EXPORT_FORMAT_CSV, chunked, streaming_export_response
 from posthog.models import Element, Filter, Person
 from posthog.models.action import Action
 from posthog.models.team import Team
@@ -64,14 +76,22 @@ class EventViewSet(StructuredViewSetMixin, mixins.RetrieveModelMixin, mixins.Lis
     CSV_EXPORT_DEFAULT_LIMIT = 3_500
     CSV_EXPORT_MAXIMUM_LIMIT = 100_000
 
-    def _build_next_url(self, request: request.Request, last_event_timestamp: datetime) -> str:
+    # Rows read from ClickHouse (and resolved to persons) at a time when streaming an export
+    STREAMING_EXPORT_BLOCK_SIZE = 10_000
+
+    # Lookback windows (in days) tried in turn when listing events without an `after` bound
+    EVENTS_LIST_WINDOWS_DAYS = [1, 7, 30, 365]
+
+    def _build_next_url(self, request: request.Request, last_event: List) -> str:
         params = request.GET.dict()
         reverse = request.GET.get("orderBy", "-timestamp") != "-timestamp"
-        timestamp = last_event_timestamp.astimezone().isoformat()
+        timestamp = last_event[3].astimezone().isoformat()
         if reverse:
             params["after"] = timestamp
+            params["after_uuid"] = str(last_event[0])
         else:
             params["before"] = timestamp
+            params["before_uuid"] = str(last_event[0])
         return request.build_absolute_uri(f"{request.path}?{urllib.parse.urlencode(params)}")
 
     def _parse_order_by(self, request: request.Request) -> List[str]:
@@ -97,17 +117,13 @@ class EventViewSet(StructuredViewSetMixin, mixins.RetrieveModelMixin, mixins.Lis
 
         query_result = self._query_events_list(filter, team, request, limit=limit)
 
-        # Retry the query without the 1 day optimization
-        if len(query_result) < limit and not request.GET.get("after"):
-            query_result = self._query_events_list(filter, team, request, long_date_from=True, limit=limit)
-
         result = ClickhouseEventSerializer(
             query_result[0:limit], many=True, context={"people": self._get_people(query_result, team),},
         ).data
 
         next_url: Optional[str] = None
         if not is_csv_request and len(query_result) > limit:
-            next_url = self._build_next_url(request, query_result[limit - 1][3])
+            next_url = self._build_next_url(request, query_result[limit - 1])
 
         return response.Response({"next": next_url, "results": result})
 
@@ -121,21 +137,17 @@ class EventViewSet(StructuredViewSetMixin, mixins.RetrieveModelMixin, mixins.Lis
                 distinct_to_person[distinct_id] = person
         return distinct_to_person
 
-    def _query_events_list(
-        self, filter: Filter, team: Team, request: request.Request, long_date_from: bool = False, limit: int = 100
-    ) -> List:
-        limit += 1
-        limit_sql = "LIMIT %(limit)s"
+    def _events_list_query(
+        self, filter: Filter, team: Team, request: request.Request
+    ) -> Optional[Tuple[Callable[[str, str], str], str, Dict[str, Any]]]:
+        """
+        Returns a function rendering the events list query for given extra conditions and limit clause, the base
+        conditions, and the query params. None means the query can't match anything.
+        """
         order = "DESC" if self._parse_order_by(self.request)[0] == "-timestamp" else "ASC"
 
         conditions, condition_params = determine_event_conditions(
-            team,
-            {
-                "after": (now() - timedelta(days=1)).isoformat(),
-                "before": (now() + timedelta(seconds=5)).isoformat(),
-                **request.GET.dict(),
-            },
-            long_date_from,
+            team, {"before": (now() + timedelta(seconds=5)).isoformat(), **request.GET.dict()}
         )
         prop_filters, prop_filter_params = parse_prop_grouped_clauses(
             team_id=team.pk, property_group=filter.property_groups, has_person_id_joined=False
@@ -145,25 +157,89 @@ class EventViewSet(StructuredViewSetMixin, mixins.RetrieveModelMixin, mixins.Lis
             try:
                 action = Action.objects.get(pk=request.GET["action_id"], team_id=team.pk)
             except Action.DoesNotExist:
-                return []
+                return None
             if action.steps.count() == 0:
-                return []
+                return None
             action_query, params = format_action_filter(team_id=team.pk, action=action)
             prop_filters += " AND {}".format(action_query)
             prop_filter_params = {**prop_filter_params, **params}
 
-        if prop_filters != "":
-            return sync_execute(
-                SELECT_EVENT_BY_TEAM_AND_CONDITIONS_FILTERS_SQL.format(
+        def render(conditions: str, limit_sql: str) -> str:
+            if prop_filters != "":
+                return SELECT_EVENT_BY_TEAM_AND_CONDITIONS_FILTERS_SQL.format(
                     conditions=conditions, limit=limit_sql, filters=prop_filters, order=order
-                ),
-                {"team_id": team.pk, "limit": limit, **condition_params, **prop_filter_params},
-            )
-        else:
-            return sync_execute(
-                SELECT_EVENT_BY_TEAM_AND_CONDITIONS_SQL.format(conditions=conditions, limit=limit_sql, order=order),
-                {"team_id": team.pk, "limit": limit, **condition_params},
+                )
+            return SELECT_EVENT_BY_TEAM_AND_CONDITIONS_SQL.format(conditions=conditions, limit=limit_sql, order=order)
+
+        return render, conditions, {"team_id": team.pk, **condition_params, **prop_filter_params}
+
+    def _query_events_list(self, filter: Filter, team: Team, request: request.Request, limit: int = 100) -> List:
+        limit += 1
+        limit_sql = "LIMIT %(limit)s"
+
+        events_query = self._events_list_query(filter, team, request)
+        if events_query is None:
+            return []
+        render, conditions, params = events_query
+
+        # An explicit lower bound (or oldest-first ordering) already defines the slice to read
+        if request.GET.get("after") or self._parse_order_by(self.request)[0] != "-timestamp":
+            return sync_execute(render(conditions, limit_sql), {**params, "limit": limit})
+
+        # Walk back from the upper bound in geometrically growing, non-overlapping windows until we have a full page,
+        # so sparse teams run one or two cheap queries instead of falling back to scanning their whole history
+        upper_bound = isoparse(params["before"])
+        window_to: Optional[datetime] = None
+        results: List = []
+        for window_days in self.EVENTS_LIST_WINDOWS_DAYS + [None]:
+            window_conditions = conditions
+            window_params: Dict[str, Any] = {**params, "limit": limit - len(results)}
+            if window_to is not None:
+                window_conditions += " AND timestamp < %(window_to)s"
+                window_params["window_to"] = window_to.strftime("%Y-%m-%d %H:%M:%S.%f")
+            if window_days is not None:
+                window_from = upper_bound - timedelta(days=window_days)
+                window_conditions += " AND timestamp >= %(window_from)s"
+                window_params["window_from"] = window_from.strftime("%Y-%m-%d %H:%M:%S.%f")
+
+            results.extend(sync_execute(render(window_conditions, limit_sql), window_params))
+            if len(results) >= limit or window_days is None:
+                break
+            window_to = window_from
+        return results
+
+    @action(methods=["GET"], detail=False)
+    def export(self, request: request.Request, **kwargs) -> StreamingHttpResponse:
+        """
+        Streams every matching event (or up to `limit`) as CSV or NDJSON (`export_format`), gzipped when
+        `compress=gzip`, without the row cap of the paginated CSV export.
+        """
+        team = self.team
+        filter = Filter(request=request, team=team)
+        limit = int(request.GET["limit"]) if request.GET.get("limit") else None
+        events_query = self._events_list_query(filter, team, request)
+
+        def rows() -> Generator[Dict[str, Any], None, None]:
+            if events_query is None:
+                return
+            render, conditions, params = events_query
+            query_result = sync_execute_iter(
+                render(conditions, "LIMIT %(limit)s" if limit is not None else ""),
+                {**params, "limit": limit},
+                settings={"max_block_size": self.STREAMING_EXPORT_BLOCK_SIZE},
             )
+            for block in chunked(query_result, self.STREAMING_EXPORT_BLOCK_SIZE):
+                yield from ClickhouseEventSerializer(
+                    block, many=True, context={"people": self._get_people(block, team)}
+                ).data
+
+        return streaming_export_response(
+            rows(),
+            columns=["id", "event", "timestamp", "distinct_id", "properties", "elements_chain", "person"],
+            filename="events",
+            export_format=request.GET.get("export_format", EXPORT_FORMAT_CSV),
+            compress=request.GET.get("compress") == "gzip",
+        )
 
     def retrieve(
         self, request: request.Request, pk: Optional[Union[int, str]] = None, *args: Any, **kwargs: Any
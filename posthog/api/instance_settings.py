@@ -81,9 +81,15 @@ class InstanceSettingsSerializer(serializers.Serializer):
 
             # TODO: Move to top-level imports once CH is moved out of `ee`
             from ee.clickhouse.client import sync_execute
-            from ee.clickhouse.sql.session_recording_events import UPDATE_RECORDINGS_TABLE_TTL_SQL
+            from ee.clickhouse.sql.session_recording_events import (
+                UPDATE_RECORDING_SUMMARIES_TABLE_TTL_SQL,
+                UPDATE_RECORDINGS_TABLE_TTL_SQL,
+                UPDATE_SESSION_EVENT_SUMMARIES_TABLE_TTL_SQL,
+            )
 
             sync_execute(UPDATE_RECORDINGS_TABLE_TTL_SQL(), {"weeks": new_value_parsed})
+            sync_execute(UPDATE_RECORDING_SUMMARIES_TABLE_TTL_SQL(), {"weeks": new_value_parsed})
+            sync_execute(UPDATE_SESSION_EVENT_SUMMARIES_TABLE_TTL_SQL(), {"weeks": new_value_parsed})
 
         setattr(config, instance.key, new_value_parsed)
         instance.value = new_value_parsed
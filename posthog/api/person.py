@@ -3,6 +3,7 @@ from typing import (
     Any,
     Callable,
     Dict,
+    Generator,
     List,
     Optional,
     Tuple,
@@ -13,6 +14,7 @@ from typing import (
 
 from django.db.models import Q
 from django.db.models.query import Prefetch
+from django.http import StreamingHttpResponse
 from django_filters import rest_framework as filters
 from rest_framework import request, response, serializers, viewsets
 from rest_framework.decorators import action
@@ -52,10 +54,12 @@ from posthog.constants import (
     FunnelVizType,
 )
 from posthog.decorators import cached_function
+from posthog.helpers.streaming_export import EXPORT_FORMAT_CSV, streaming_export_response
 from posthog.models import Cohort, Filter, Person, User
 from posthog.models.filters.path_filter import PathFilter
 from posthog.models.filters.retention_filter import RetentionFilter
 from posthog.models.filters.stickiness_filter import StickinessFilter
+from posthog.models.person import get_person_display_name
 from posthog.permissions import ProjectMembershipNecessaryPermissions, TeamMemberAccessPermission
 from posthog.tasks.split_person import split_person
 from posthog.utils import convert_property_value, format_query_params_absolute_url, is_anonymous_id, relative_date_parse
@@ -69,12 +73,7 @@ class PersonCursorPagination(CursorPagination):
 
 
 def get_person_name(person: Person) -> str:
-    if person.properties.get("email"):
-        return person.properties["email"]
-    if len(person.distinct_ids) > 0:
-        # Prefer non-UUID distinct IDs (presumably from user identification) over UUIDs
-        return sorted(person.distinct_ids, key=is_anonymous_id)[0]
-    return person.pk
+    return get_person_display_name(person.properties, person.distinct_ids) or person.pk
 
 
 class PersonSerializer(serializers.HyperlinkedModelSerializer):
@@ -184,6 +183,9 @@ class PersonViewSet(StructuredViewSetMixin, viewsets.ModelViewSet):
     retention_class = ClickhouseRetention
     stickiness_class = ClickhouseStickiness
 
+    # Persons loaded from Postgres at a time when streaming an export
+    STREAMING_EXPORT_BLOCK_SIZE = 1_000
+
     def paginate_queryset(self, queryset):
         if self.request.accepted_renderer.format == "csv" or not self.paginator:
             return None
@@ -201,10 +203,7 @@ class PersonViewSet(StructuredViewSetMixin, viewsets.ModelViewSet):
             raise NotFound(detail="Person not found.")
 
     def get_queryset(self):
-        queryset = super().get_queryset()
-        queryset = self.filterset_class(self.request.GET, queryset=queryset, team_id=self.team.id).qs
-        queryset = queryset.prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
-        queryset = queryset.only("id", "created_at", "properties", "uuid")
+        queryset = self._get_filtered_queryset()
 
         is_csv_request = self.request.accepted_renderer.format == "csv"
         if is_csv_request:
@@ -212,6 +211,40 @@ class PersonViewSet(StructuredViewSetMixin, viewsets.ModelViewSet):
 
         return queryset
 
+    def _get_filtered_queryset(self):
+        queryset = super().get_queryset()
+        queryset = self.filterset_class(self.request.GET, queryset=queryset, team_id=self.team.id).qs
+        queryset = queryset.prefetch_related(Prefetch("persondistinctid_set", to_attr="distinct_ids_cache"))
+        return queryset.only("id", "created_at", "properties", "uuid")
+
+    @action(methods=["GET"], detail=False)
+    def export(self, request: request.Request, **kwargs) -> StreamingHttpResponse:
+        """
+        Streams every matching person as CSV or NDJSON (`export_format`), gzipped when `compress=gzip`, without the
+        row cap of the paginated CSV export.
+        """
+        # Not capped like the paginated CSV export, whichever renderer was negotiated
+        queryset = self._get_filtered_queryset().order_by("-id")
+
+        def rows() -> Generator[Dict[str, Any], None, None]:
+            # Keyset over the primary key so each block is a cheap index range scan, however deep into the export
+            last_id: Optional[int] = None
+            while True:
+                block_queryset = queryset if last_id is None else queryset.filter(id__lt=last_id)
+                block = list(block_queryset[: self.STREAMING_EXPORT_BLOCK_SIZE])
+                if not block:
+                    return
+                yield from self.get_serializer(block, many=True).data
+                last_id = block[-1].id
+
+        return streaming_export_response(
+            rows(),
+            columns=["id", "uuid", "name", "distinct_ids", "created_at", "properties"],
+            filename="persons",
+            export_format=request.GET.get("export_format", EXPORT_FORMAT_CSV),
+            compress=request.GET.get("compress") == "gzip",
+        )
+
     @action(methods=["GET", "POST"], detail=False)
     def funnel(self, request: request.Request, **kwargs) -> response.Response:
         if request.user.is_anonymous or not self.team:
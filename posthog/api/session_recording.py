@@ -1,5 +1,6 @@
 import dataclasses
-from typing import Any, Union
+import urllib.parse
+from typing import Any, Dict, Optional, Union
 
 from rest_framework import exceptions, request, response, serializers, viewsets
 from rest_framework.decorators import action
@@ -10,6 +11,7 @@ from ee.clickhouse.queries.session_recordings.clickhouse_session_recording impor
 from ee.clickhouse.queries.session_recordings.clickhouse_session_recording_list import ClickhouseSessionRecordingList
 from posthog.api.person import PersonSerializer
 from posthog.api.routing import StructuredViewSetMixin
+from posthog.constants import SESSION_RECORDINGS_BEFORE_SESSION_ID, SESSION_RECORDINGS_BEFORE_START_TIME
 from posthog.models import Filter, PersonDistinctId
 from posthog.models.filters.session_recordings_filter import SessionRecordingsFilter
 from posthog.models.person import Person
@@ -62,9 +64,19 @@ class SessionRecordingViewSet(StructuredViewSetMixin, viewsets.GenericViewSet):
             request=request, team=self.team, session_recording_id=session_recording_id
         ).get_metadata()
 
+    def _build_next_url(self, request: request.Request, last_recording: Dict[str, Any]) -> str:
+        params = request.GET.dict()
+        params.pop("offset", None)
+        params[SESSION_RECORDINGS_BEFORE_START_TIME] = last_recording["start_time"].isoformat()
+        params[SESSION_RECORDINGS_BEFORE_SESSION_ID] = last_recording["session_id"]
+        return request.build_absolute_uri(f"{request.path}?{urllib.parse.urlencode(params)}")
+
     def list(self, request: request.Request, *args: Any, **kwargs: Any) -> Response:
         filter = SessionRecordingsFilter(request=request)
         (session_recordings, more_recordings_available) = self._get_session_recording_list(filter)
+        next_url: Optional[str] = None
+        if more_recordings_available:
+            next_url = self._build_next_url(request, session_recordings[-1])
 
         if not request.user.is_authenticated:  # for mypy
             raise exceptions.NotAuthenticated()
@@ -102,7 +114,13 @@ class SessionRecordingViewSet(StructuredViewSetMixin, viewsets.GenericViewSet):
             )
         )
 
-        return Response({"results": session_recording_serializer_with_person, "has_next": more_recordings_available})
+        return Response(
+            {
+                "results": session_recording_serializer_with_person,
+                "has_next": more_recordings_available,
+                "next": next_url,
+            }
+        )
 
     # Returns meta data about the recording
     def retrieve(self, request: request.Request, *args: Any, **kwargs: Any) -> response.Response:
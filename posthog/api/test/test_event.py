@@ -1,3 +1,4 @@
+import gzip
 import json
 import uuid
 from datetime import datetime
@@ -324,7 +325,7 @@ class TestEvents(ClickhouseTestMixin, APIBaseTest):
             self.assertEqual(len(page2["results"]), 100)
             self.assertEqual(
                 unquote(page2["next"]),
-                f"http://testserver/api/projects/{self.team.id}/events/?distinct_id=1&before=2020-12-30T12:03:53.829294+00:00",
+                f"http://testserver/api/projects/{self.team.id}/events/?distinct_id=1&before=2020-12-30T12:03:53.829294+00:00&before_uuid={page2['results'][-1]['id']}",
             )
 
             page3 = self.client.get(page2["next"]).json()
@@ -383,6 +384,48 @@ class TestEvents(ClickhouseTestMixin, APIBaseTest):
             self.assertEqual(len(page3["results"]), 3)
             self.assertIsNone(page3["next"])
 
+    def test_pagination_with_identical_timestamps(self):
+        with freeze_time("2021-10-10T12:03:03.829294Z"):
+            _create_person(team=self.team, distinct_ids=["1"])
+            event_ids = [
+                _create_event(team=self.team, event="some event", distinct_id="1", timestamp=timezone.now())
+                for _ in range(5)
+            ]
+
+            response = self.client.get(f"/api/projects/{self.team.id}/events/?distinct_id=1&limit=2").json()
+            self.assertEqual(len(response["results"]), 2)
+            self.assertIn("before_uuid=", unquote(response["next"]))
+
+            page2 = self.client.get(response["next"]).json()
+            page3 = self.client.get(page2["next"]).json()
+            self.assertIsNone(page3["next"])
+
+            seen_ids = [event["id"] for page in [response, page2, page3] for event in page["results"]]
+            self.assertEqual(len(seen_ids), 5)
+            self.assertCountEqual(seen_ids, event_ids)
+
+    def test_list_finds_sparse_events_outside_first_window(self):
+        with freeze_time("2021-10-10T12:03:03.829294Z"):
+            _create_person(team=self.team, distinct_ids=["1"])
+            for days_ago in [0, 3, 20, 200, 700]:
+                _create_event(
+                    team=self.team,
+                    event="some event",
+                    distinct_id="1",
+                    timestamp=timezone.now() - relativedelta(days=days_ago),
+                )
+
+            response = self.client.get(f"/api/projects/{self.team.id}/events/?distinct_id=1&limit=4").json()
+            self.assertEqual(len(response["results"]), 4)
+            self.assertIsNotNone(response["next"])
+            self.assertGreater(
+                parser.parse(response["results"][0]["timestamp"]), parser.parse(response["results"][-1]["timestamp"])
+            )
+
+            page2 = self.client.get(response["next"]).json()
+            self.assertEqual(len(page2["results"]), 1)
+            self.assertIsNone(page2["next"])
+
     def test_ascending_order_timestamp(self):
         for idx in range(10):
             _create_event(
@@ -485,6 +528,35 @@ class TestEvents(ClickhouseTestMixin, APIBaseTest):
             "CSV export should return up to CSV_EXPORT_MAXIMUM_LIMIT events (+ headers row)",
         )
 
+    @patch("posthog.api.event.EventViewSet.STREAMING_EXPORT_BLOCK_SIZE", 5)
+    def test_events_streaming_export(self):
+        _create_person(properties={"email": "tim@posthog.com"}, team=self.team, distinct_ids=["2"])
+        with freeze_time("2012-01-15T04:01:34.000Z"):
+            for _ in range(12):
+                _create_event(team=self.team, event="5th action", distinct_id="2", properties={"$os": "Windows 95"})
+            _create_event(team=self.team, event="other action", distinct_id="2")
+
+            response = self.client.get(f"/api/projects/{self.team.id}/events/export/?event=5th%20action")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response["Content-Type"], "text/csv")
+            lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+            self.assertEqual(len(lines), 13)
+            self.assertEqual(lines[0], "id,event,timestamp,distinct_id,properties,elements_chain,person")
+            self.assertIn("tim@posthog.com", lines[1])
+
+            response = self.client.get(f"/api/projects/{self.team.id}/events/export/?export_format=ndjson&limit=3")
+            rows = [json.loads(line) for line in b"".join(response.streaming_content).decode("utf-8").splitlines()]
+            self.assertEqual(len(rows), 3)
+            self.assertEqual(rows[0]["properties"], {"$os": "Windows 95"})
+
+            response = self.client.get(f"/api/projects/{self.team.id}/events/export/?compress=gzip")
+            self.assertEqual(response["Content-Type"], "application/gzip")
+            self.assertEqual(len(gzip.decompress(b"".join(response.streaming_content)).splitlines()), 14)
+
+    def test_events_streaming_export_invalid_format(self):
+        response = self.client.get(f"/api/projects/{self.team.id}/events/export/?export_format=xml")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_get_event_by_id(self):
         event_id = _create_event(team=self.team, event="event", distinct_id="1", timestamp=timezone.now())
 
@@ -435,6 +435,30 @@ class TestPerson(ClickhouseTestMixin, APIBaseTest):
         )
         self.assertEqual(len(response.content.splitlines()), 2)
 
+    @mock.patch("posthog.api.person.PersonViewSet.STREAMING_EXPORT_BLOCK_SIZE", 2)
+    def test_streaming_export(self):
+        for index in range(5):
+            _create_person(team=self.team, distinct_ids=[str(index)], properties={"$os": "Windows", "index": index})
+        _create_person(team=self.team, distinct_ids=["mac"], properties={"$os": "Mac OS X"})
+
+        response = self.client.get("/api/person/export/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 7)
+        self.assertEqual(lines[0], "id,uuid,name,distinct_ids,created_at,properties")
+
+        response = self.client.get(
+            "/api/person/export/?export_format=ndjson&properties=%s"
+            % json.dumps([{"key": "$os", "value": "Windows", "type": "person"}])
+        )
+        rows = [json.loads(line) for line in b"".join(response.streaming_content).decode("utf-8").splitlines()]
+        self.assertEqual([row["properties"]["index"] for row in rows], [4, 3, 2, 1, 0])
+
+        for url in ["/api/person/export.csv", "/api/person/export/?format=csv"]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(b"".join(response.streaming_content).decode("utf-8").splitlines()), 7)
+
     def test_pagination_limit(self):
         for index in range(0, 20):
             _create_person(
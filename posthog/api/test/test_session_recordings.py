@@ -129,6 +129,25 @@ def factory_test_session_recordings_api(session_recording_event_factory):
             self.assertEqual(second_session["viewed"], False)
             self.assertEqual(second_session["person"]["id"], p.pk)
 
+        def test_get_session_recordings_next_page(self):
+            Person.objects.create(team=self.team, distinct_ids=["user"], properties={"email": "bob@bob.com"})
+            base_time = now() - relativedelta(days=1)
+            self.create_snapshot("user", "1", base_time)
+            self.create_snapshot("user", "2", base_time + relativedelta(seconds=10))
+            self.create_snapshot("user", "3", base_time + relativedelta(seconds=20))
+
+            response = self.client.get(f"/api/projects/{self.team.id}/session_recordings?limit=2")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response_data = response.json()
+            self.assertEqual([recording["id"] for recording in response_data["results"]], ["3", "2"])
+            self.assertEqual(response_data["has_next"], True)
+            self.assertIn("before_session_id=2", response_data["next"])
+
+            response_data = self.client.get(response_data["next"]).json()
+            self.assertEqual([recording["id"] for recording in response_data["results"]], ["1"])
+            self.assertEqual(response_data["has_next"], False)
+            self.assertIsNone(response_data["next"])
+
         def test_session_recordings_dont_leak_teams(self):
             another_team = Team.objects.create(organization=self.organization)
             Person.objects.create(
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from functools import cached_property
+
+from django.utils import timezone
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.property_values import (
+    EVENT_PROPERTY_VALUES_SELECT_SQL,
+    PERSON_PROPERTY_VALUES_SELECT_SQL,
+    PERSON_PROPERTY_VALUES_TABLE,
+    PROPERTY_VALUES_TABLE,
+)
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill the `property_values` and `person_property_values` rollups, which serve property filter suggestions, with
+events and persons ingested before their materialized views were created.
+
+Until this has run, suggestions for keys which were seen since the views were created only include values seen since
+then, and keys which weren't are served by scanning events or persons like before.
+
+The migration strategy:
+
+    1. Events are rolled up one day at a time, for the 30 days `property_values` keeps event values for. Only events
+       ingested before the materialized view was created are read, as later ones have been rolled up already.
+    2. Persons are copied team by team. Every version of every person is inserted, as `person_property_values` only
+       keeps the latest one anyway, so persons updated since the materialized view was created aren't a concern.
+"""
+
+EVENT_PROPERTY_VALUES_BACKFILL_DAYS = 30
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the rollups used for property filter suggestions."
+
+    depends_on = "0004_replicated_schema"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": PROPERTY_VALUES_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0005_fill_property_values" not in comments
+
+    @cached_property
+    def operations(self):
+        today = timezone.now().date()
+        days = [today - timedelta(days=n) for n in range(EVENT_PROPERTY_VALUES_BACKFILL_DAYS, -1, -1)]
+        return [self.fill_events_operation(day) for day in days] + [
+            self.fill_persons_operation(team_id) for team_id in self._team_ids
+        ]
+
+    def fill_events_operation(self, day):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=PROPERTY_VALUES_TABLE,
+                select=EVENT_PROPERTY_VALUES_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE,
+                    source_table="events",
+                    where=f"""
+                    AND toDate(timestamp) = toDate('{day.isoformat()}')
+                    AND _timestamp < (
+                        SELECT min(metadata_modification_time) FROM system.tables
+                        WHERE database = '{CLICKHOUSE_DATABASE}' AND name = 'event_property_values_mv'
+                    )
+                    """,
+                ),
+            ),
+            rollback=None,
+        )
+
+    def fill_persons_operation(self, team_id: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=PERSON_PROPERTY_VALUES_TABLE,
+                select=PERSON_PROPERTY_VALUES_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE, where=f"AND team_id = {team_id}"
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _team_ids(self):
+        return list(sorted(row[0] for row in sync_execute("SELECT DISTINCT team_id FROM person")))
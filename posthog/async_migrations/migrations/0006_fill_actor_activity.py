@@ -0,0 +1,87 @@
+from functools import cached_property
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.actor_activity import ACTOR_ACTIVITY_SELECT_SQL, ACTOR_ACTIVITY_TABLE
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill the `actor_activity` rollup, which retention, stickiness and lifecycle read instead of events where they can,
+with events ingested before its materialized view was created.
+
+First time retention looks at all of an actor's history, so every event ever ingested needs to be rolled up. Queries
+keep reading events until this migration has completed.
+
+The migration strategy:
+
+    1. Events are rolled up one partition (month) at a time, to keep memory usage and the time each query takes bounded.
+    2. Only events ingested before the materialized view was created are read, as later ones have been rolled up
+       already.
+"""
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the per day actor activity rollup used by retention, stickiness and lifecycle."
+
+    depends_on = "0005_fill_property_values"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": ACTOR_ACTIVITY_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0006_fill_actor_activity" not in comments
+
+    @cached_property
+    def operations(self):
+        return [self.fill_partition_operation(partition) for partition in self._partitions]
+
+    def fill_partition_operation(self, partition: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=ACTOR_ACTIVITY_TABLE,
+                select=ACTOR_ACTIVITY_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE,
+                    source_table="events",
+                    where=f"""
+                    WHERE toYYYYMM(timestamp) = {partition}
+                    AND _timestamp < (
+                        SELECT min(metadata_modification_time) FROM system.tables
+                        WHERE database = '{CLICKHOUSE_DATABASE}' AND name = '{ACTOR_ACTIVITY_TABLE}_mv'
+                    )
+                    """,
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _partitions(self):
+        # Events may be sharded, in which case every shard can hold parts of any partition
+        return list(
+            sorted(
+                row[0]
+                for row in sync_execute(
+                    """
+                    SELECT DISTINCT toUInt32(partition)
+                    FROM clusterAllReplicas(%(cluster)s, system, parts)
+                    WHERE database = %(database)s AND table = %(table)s AND active
+                    """,
+                    {"cluster": CLICKHOUSE_CLUSTER, "database": CLICKHOUSE_DATABASE, "table": EVENTS_DATA_TABLE()},
+                )
+            )
+        )
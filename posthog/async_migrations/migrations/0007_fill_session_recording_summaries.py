@@ -0,0 +1,96 @@
+from functools import cached_property
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.session_recording_events import (
+    SESSION_RECORDING_EVENTS_DATA_TABLE,
+    SESSION_RECORDING_SUMMARIES_SELECT_SQL,
+    SESSION_RECORDING_SUMMARIES_TABLE,
+)
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill `session_recording_summaries`, which the recordings list reads instead of session_recording_events, with
+recordings ingested before its materialized view was created.
+
+Summarizing a recording means parsing every snapshot of it, so doing it for all recordings at once would read (and
+hold) the whole of session_recording_events. The recordings list keeps reading session_recording_events until this
+migration has completed.
+
+The migration strategy:
+
+    1. Snapshots are summarized one partition (day) at a time. Recordings spanning several days get a partial summary
+       row per day, which are combined when reading just like the ones written by the materialized view.
+    2. Only snapshots ingested before the materialized view was created are read, as later ones have been summarized
+       already.
+"""
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the per session summaries of recordings used by the recordings list."
+
+    depends_on = "0006_fill_actor_activity"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": SESSION_RECORDING_SUMMARIES_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0007_fill_session_recording_summaries" not in comments
+
+    @cached_property
+    def operations(self):
+        return [self.fill_partition_operation(partition) for partition in self._partitions]
+
+    def fill_partition_operation(self, partition: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=SESSION_RECORDING_SUMMARIES_TABLE,
+                select=SESSION_RECORDING_SUMMARIES_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE,
+                    source_table="session_recording_events",
+                    where=f"""
+                    WHERE toYYYYMMDD(timestamp) = {partition}
+                    AND _timestamp < (
+                        SELECT min(metadata_modification_time) FROM system.tables
+                        WHERE database = '{CLICKHOUSE_DATABASE}' AND name = '{SESSION_RECORDING_SUMMARIES_TABLE}_mv'
+                    )
+                    """,
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _partitions(self):
+        # Recordings may be sharded, in which case every shard can hold parts of any partition
+        return list(
+            sorted(
+                row[0]
+                for row in sync_execute(
+                    """
+                    SELECT DISTINCT toUInt32(partition)
+                    FROM clusterAllReplicas(%(cluster)s, system, parts)
+                    WHERE database = %(database)s AND table = %(table)s AND active
+                    """,
+                    {
+                        "cluster": CLICKHOUSE_CLUSTER,
+                        "database": CLICKHOUSE_DATABASE,
+                        "table": SESSION_RECORDING_EVENTS_DATA_TABLE(),
+                    },
+                )
+            )
+        )
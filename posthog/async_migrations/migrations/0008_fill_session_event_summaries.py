@@ -0,0 +1,101 @@
+from functools import cached_property
+
+from constance import config
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+from ee.clickhouse.sql.session_recording_events import SESSION_EVENT_SUMMARIES_SELECT_SQL, SESSION_EVENT_SUMMARIES_TABLE
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill `session_event_summaries`, which the recordings list reads to filter recordings by the events performed in
+them, with events ingested before its materialized view was created.
+
+Events older than recordings are kept for (see RECORDINGS_TTL_WEEKS) only matter for recordings which have expired, so
+they aren't read at all. The recordings list keeps joining events against recordings until this migration has completed.
+
+The migration strategy:
+
+    1. Events are summarized one partition (month) at a time, starting with the one holding the oldest unexpired
+       recordings, to keep memory usage and the time each query takes bounded.
+    2. Only events ingested before the materialized view was created are read, as later ones have been summarized
+       already.
+"""
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the per session summaries of events used to filter recordings."
+
+    depends_on = "0007_fill_session_recording_summaries"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": SESSION_EVENT_SUMMARIES_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0008_fill_session_event_summaries" not in comments
+
+    @cached_property
+    def operations(self):
+        return [self.fill_partition_operation(partition) for partition in self._partitions]
+
+    def fill_partition_operation(self, partition: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=SESSION_EVENT_SUMMARIES_TABLE,
+                select=SESSION_EVENT_SUMMARIES_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE,
+                    source_table="events",
+                    where=f"""
+                    AND toYYYYMM(timestamp) = {partition}
+                    AND timestamp >= now() - toIntervalWeek({self._weeks})
+                    AND _timestamp < (
+                        SELECT min(metadata_modification_time) FROM system.tables
+                        WHERE database = '{CLICKHOUSE_DATABASE}' AND name = '{SESSION_EVENT_SUMMARIES_TABLE}_mv'
+                    )
+                    """,
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _weeks(self) -> int:
+        return int(config.RECORDINGS_TTL_WEEKS)
+
+    @cached_property
+    def _partitions(self):
+        # Events may be sharded, in which case every shard can hold parts of any partition
+        return list(
+            sorted(
+                row[0]
+                for row in sync_execute(
+                    """
+                    SELECT DISTINCT toUInt32(partition)
+                    FROM clusterAllReplicas(%(cluster)s, system, parts)
+                    WHERE database = %(database)s AND table = %(table)s AND active
+                    AND toUInt32(partition) >= toYYYYMM(now() - toIntervalWeek(%(weeks)s))
+                    """,
+                    {
+                        "cluster": CLICKHOUSE_CLUSTER,
+                        "database": CLICKHOUSE_DATABASE,
+                        "table": EVENTS_DATA_TABLE(),
+                        "weeks": self._weeks,
+                    },
+                )
+            )
+        )
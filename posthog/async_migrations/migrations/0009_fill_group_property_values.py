@@ -0,0 +1,71 @@
+from functools import cached_property
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.groups import GROUP_PROPERTY_VALUES_SELECT_SQL, GROUP_PROPERTY_VALUES_TABLE, GROUPS_TABLE
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill `group_property_values`, which group property filter suggestions are served from, with groups upserted before
+its materialized view was created. Suggestions keep counting the groups of a team directly until this migration has
+completed.
+
+The migration strategy:
+
+    1. Groups are counted one team at a time, as the groups table isn't partitioned.
+    2. Each group is counted by its latest version upserted before the materialized view was created. Later upserts
+       were counted by the view, which also took that version's values out of the counts.
+"""
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the per value counts of group properties used for filter suggestions."
+
+    depends_on = "0008_fill_session_event_summaries"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": GROUP_PROPERTY_VALUES_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0009_fill_group_property_values" not in comments
+
+    @cached_property
+    def operations(self):
+        return [self.fill_team_operation(team_id) for team_id in self._team_ids]
+
+    def fill_team_operation(self, team_id: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=GROUP_PROPERTY_VALUES_TABLE,
+                select=GROUP_PROPERTY_VALUES_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE,
+                    source_table=GROUPS_TABLE,
+                    where=f"""
+                    WHERE team_id = {team_id}
+                    AND _timestamp < (
+                        SELECT min(metadata_modification_time) FROM system.tables
+                        WHERE database = '{CLICKHOUSE_DATABASE}' AND name = '{GROUP_PROPERTY_VALUES_TABLE}_mv'
+                    )
+                    """,
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _team_ids(self):
+        return [row[0] for row in sync_execute(f"SELECT DISTINCT team_id FROM {GROUPS_TABLE} ORDER BY team_id")]
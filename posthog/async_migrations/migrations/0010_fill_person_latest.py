@@ -0,0 +1,71 @@
+from functools import cached_property
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.person import PERSONS_LATEST_SELECT_SQL, PERSONS_LATEST_TABLE
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill `person_latest`, which person queries read instead of collapsing every version of every person in `person`,
+with persons written before its materialized view was created. Queries keep reading `person` until this migration has
+completed.
+
+The migration strategy:
+
+    1. Persons are collapsed one team at a time, as the person table isn't partitioned, to keep memory usage and the
+       time each query takes bounded.
+    2. Only versions written before the materialized view was created are read, as later ones have been rolled up
+       already. The argMax states of both are merged when reading.
+"""
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the pre-collapsed person_latest table used by person queries."
+
+    depends_on = "0009_fill_group_property_values"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": PERSONS_LATEST_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0010_fill_person_latest" not in comments
+
+    @cached_property
+    def operations(self):
+        return [self.fill_team_operation(team_id) for team_id in self._team_ids]
+
+    def fill_team_operation(self, team_id: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=PERSONS_LATEST_TABLE,
+                select=PERSONS_LATEST_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE,
+                    where=f"""
+                    WHERE person.team_id = {team_id}
+                    AND person._timestamp < (
+                        SELECT min(metadata_modification_time) FROM system.tables
+                        WHERE database = '{CLICKHOUSE_DATABASE}' AND name = '{PERSONS_LATEST_TABLE}_mv'
+                    )
+                    """,
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _team_ids(self):
+        return list(sorted(row[0] for row in sync_execute("SELECT DISTINCT team_id FROM person")))
@@ -0,0 +1,77 @@
+from functools import cached_property
+
+from ee.clickhouse.client import sync_execute
+from ee.clickhouse.sql.events import EARLIEST_TIMESTAMPS_SELECT_SQL, EARLIEST_TIMESTAMPS_TABLE, EVENTS_DATA_TABLE
+from posthog.async_migrations.definition import AsyncMigrationDefinition, AsyncMigrationOperationSQL
+from posthog.constants import AnalyticsDBMS
+from posthog.settings import CLICKHOUSE_CLUSTER, CLICKHOUSE_DATABASE
+
+"""
+Migration summary:
+
+Backfill `events_earliest_timestamps`, which "All time" insights read the earliest event of a team from instead of
+searching events for it, with events ingested before its materialized view was created. Insights keep searching events
+until this migration has completed.
+
+The migration strategy:
+
+    1. Events are summarized one partition (month) at a time, to keep memory usage and the time each query takes
+       bounded.
+    2. Events ingested after the materialized view was created are read again, as the earliest timestamps are minimums
+       and reading an event twice doesn't change them.
+"""
+
+
+class Migration(AsyncMigrationDefinition):
+
+    description = "Backfill the earliest event timestamp of each team used by all time insights."
+
+    depends_on = "0010_fill_person_latest"
+
+    posthog_min_version = "1.33.0"
+
+    def is_required(self):
+        rows = sync_execute(
+            """
+            SELECT comment
+            FROM system.columns
+            WHERE database = %(database)s AND table = %(table)s
+        """,
+            {"database": CLICKHOUSE_DATABASE, "table": EARLIEST_TIMESTAMPS_TABLE},
+        )
+
+        comments = [row[0] for row in rows]
+        return "skip_0011_fill_earliest_timestamps" not in comments
+
+    @cached_property
+    def operations(self):
+        return [self.fill_partition_operation(partition) for partition in self._partitions]
+
+    def fill_partition_operation(self, partition: int):
+        return AsyncMigrationOperationSQL(
+            database=AnalyticsDBMS.CLICKHOUSE,
+            sql="INSERT INTO {table_name} {select}".format(
+                table_name=EARLIEST_TIMESTAMPS_TABLE,
+                select=EARLIEST_TIMESTAMPS_SELECT_SQL.format(
+                    database=CLICKHOUSE_DATABASE, source_table="events", where=f"AND toYYYYMM(timestamp) = {partition}",
+                ),
+            ),
+            rollback=None,
+        )
+
+    @cached_property
+    def _partitions(self):
+        # Events may be sharded, in which case every shard can hold parts of any partition
+        return list(
+            sorted(
+                row[0]
+                for row in sync_execute(
+                    """
+                    SELECT DISTINCT toUInt32(partition)
+                    FROM clusterAllReplicas(%(cluster)s, system, parts)
+                    WHERE database = %(database)s AND table = %(table)s AND active
+                    """,
+                    {"cluster": CLICKHOUSE_CLUSTER, "database": CLICKHOUSE_DATABASE, "table": EVENTS_DATA_TABLE()},
+                )
+            )
+        )
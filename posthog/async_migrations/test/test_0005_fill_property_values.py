@@ -0,0 +1,109 @@
+import json
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+import pytest
+from django.utils import timezone
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0005_fill_property_values"
+
+
+@pytest.mark.ee
+class Test0005FillPropertyValues(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE property_values COMMENT COLUMN property_value 'dont_skip_0005'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.property_values import COMMENT_PROPERTY_VALUES_COLUMN_SQL
+
+        sync_execute(COMMENT_PROPERTY_VALUES_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute("ALTER TABLE property_values COMMENT COLUMN property_value 'skip_0005_fill_property_values'")
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.models.event import create_event
+        from ee.clickhouse.models.person import create_person
+
+        old_ingestion = datetime(2020, 1, 1)
+        self.insert_event(properties={"$browser": "Chrome"}, timestamp=timezone.now(), _timestamp=old_ingestion)
+        self.insert_event(
+            properties={"$browser": "Chrome"}, timestamp=timezone.now() - timedelta(days=3), _timestamp=old_ingestion
+        )
+        self.insert_event(properties={"$browser": "Safari"}, timestamp=timezone.now(), _timestamp=old_ingestion)
+        # Older than property_values keeps event values for
+        self.insert_event(
+            properties={"$browser": "Opera"}, timestamp=timezone.now() - timedelta(days=60), _timestamp=old_ingestion
+        )
+
+        person = create_person(team_id=self.team.pk, properties={"email": "old@posthog.com"}, timestamp=old_ingestion)
+        create_person(
+            team_id=self.team.pk,
+            uuid=person,
+            properties={"email": "new@posthog.com"},
+            timestamp=old_ingestion + timedelta(days=1),
+        )
+
+        # As if all of the above was ingested before the materialized views existed
+        sync_execute("TRUNCATE TABLE property_values")
+        sync_execute("TRUNCATE TABLE person_property_values")
+
+        # Rolled up by the materialized view, so shouldn't be backfilled again
+        create_event(
+            event_uuid=uuid4(), event="$pageview", team=self.team, distinct_id="1", properties={"$browser": "Firefox"}
+        )
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        event_rows = sync_execute(
+            """
+            SELECT property_value, sum(count) FROM property_values
+            WHERE team_id = %(team_id)s AND property_key = '$browser'
+            GROUP BY property_value ORDER BY property_value
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(event_rows, [("Chrome", 2), ("Firefox", 1), ("Safari", 1)])
+
+        person_rows = sync_execute(
+            """
+            SELECT person_id, property_value FROM person_property_values FINAL
+            WHERE team_id = %(team_id)s AND property_key = 'email'
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(person_rows, [(UUID(person), "new@posthog.com")])
+
+    def insert_event(self, properties, timestamp, _timestamp):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+
+        sync_execute(
+            f"""
+            INSERT INTO {EVENTS_DATA_TABLE()} (uuid, event, properties, timestamp, team_id, distinct_id, _timestamp)
+            SELECT %(uuid)s, '$pageview', %(properties)s, %(timestamp)s, %(team_id)s, '1', %(_timestamp)s
+            """,
+            {
+                "uuid": str(uuid4()),
+                "properties": json.dumps(properties),
+                "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "team_id": self.team.pk,
+                "_timestamp": _timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
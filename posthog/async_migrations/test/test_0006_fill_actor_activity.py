@@ -0,0 +1,89 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0006_fill_actor_activity"
+
+
+@pytest.mark.ee
+class Test0006FillActorActivity(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE actor_activity COMMENT COLUMN distinct_id 'dont_skip_0006'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.actor_activity import COMMENT_ACTOR_ACTIVITY_COLUMN_SQL
+
+        sync_execute(COMMENT_ACTOR_ACTIVITY_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute("ALTER TABLE actor_activity COMMENT COLUMN distinct_id 'skip_0006_fill_actor_activity'")
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.models.event import create_event
+
+        old_ingestion = datetime(2020, 1, 1)
+        # Spread over several partitions
+        self.insert_event(distinct_id="1", timestamp=datetime(2019, 11, 5, 10), _timestamp=old_ingestion)
+        self.insert_event(distinct_id="1", timestamp=datetime(2019, 11, 5, 12), _timestamp=old_ingestion)
+        self.insert_event(distinct_id="1", timestamp=datetime(2019, 12, 1), _timestamp=old_ingestion)
+        self.insert_event(distinct_id="2", timestamp=datetime(2019, 12, 1), _timestamp=old_ingestion)
+
+        # As if all of the above was ingested before the materialized view existed
+        sync_execute("TRUNCATE TABLE actor_activity")
+
+        # Rolled up by the materialized view, so shouldn't be backfilled again
+        create_event(
+            event_uuid=uuid4(), event="$pageview", team=self.team, distinct_id="1", timestamp=datetime(2019, 12, 1)
+        )
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        rows = sync_execute(
+            """
+            SELECT day, distinct_id, min(first_timestamp), sum(event_count) FROM actor_activity
+            WHERE team_id = %(team_id)s
+            GROUP BY day, distinct_id
+            ORDER BY day, distinct_id
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(
+            [(str(day), distinct_id, count) for day, distinct_id, _, count in rows],
+            [("2019-11-05", "1", 2), ("2019-12-01", "1", 2), ("2019-12-01", "2", 1)],
+        )
+        self.assertEqual(rows[0][2].replace(tzinfo=None), datetime(2019, 11, 5, 10))
+
+    def insert_event(self, distinct_id, timestamp, _timestamp):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+
+        sync_execute(
+            f"""
+            INSERT INTO {EVENTS_DATA_TABLE()} (uuid, event, properties, timestamp, team_id, distinct_id, _timestamp)
+            SELECT %(uuid)s, '$pageview', '{{}}', %(timestamp)s, %(team_id)s, %(distinct_id)s, %(_timestamp)s
+            """,
+            {
+                "uuid": str(uuid4()),
+                "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "team_id": self.team.pk,
+                "distinct_id": distinct_id,
+                "_timestamp": _timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
@@ -0,0 +1,108 @@
+import json
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0007_fill_session_recording_summaries"
+
+
+@pytest.mark.ee
+class Test0007FillSessionRecordingSummaries(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE session_recording_summaries COMMENT COLUMN session_id 'dont_skip_0007'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.session_recording_events import COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL
+
+        sync_execute(COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute(
+            "ALTER TABLE session_recording_summaries COMMENT COLUMN session_id 'skip_0007_fill_session_recording_summaries'"
+        )
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.models.session_recording_event import create_session_recording_event
+
+        old_ingestion = datetime(2020, 1, 1)
+        # Recording "1" spans several partitions
+        self.insert_snapshot(
+            "1", timestamp=datetime(2019, 12, 1, 23, 59), has_full_snapshot=True, _timestamp=old_ingestion
+        )
+        self.insert_snapshot(
+            "1", timestamp=datetime(2019, 12, 2, 0, 1), has_full_snapshot=False, _timestamp=old_ingestion
+        )
+        self.insert_snapshot("2", timestamp=datetime(2019, 12, 2, 10), has_full_snapshot=True, _timestamp=old_ingestion)
+
+        # As if all of the above was ingested before the materialized view existed
+        sync_execute("TRUNCATE TABLE session_recording_summaries")
+
+        # Summarized by the materialized view, so shouldn't be backfilled again
+        create_session_recording_event(
+            uuid=uuid4(),
+            team_id=self.team.pk,
+            distinct_id="user",
+            timestamp=datetime(2019, 12, 2, 10, 1),
+            session_id="2",
+            window_id="1",
+            snapshot_data={"has_full_snapshot": True},
+        )
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        rows = sync_execute(
+            """
+            SELECT session_id, min(first_timestamp), max(last_timestamp), sum(full_snapshot_count)
+            FROM session_recording_summaries
+            WHERE team_id = %(team_id)s
+            GROUP BY session_id
+            ORDER BY session_id
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(
+            [
+                (session_id, first.replace(tzinfo=None), last.replace(tzinfo=None), count)
+                for session_id, first, last, count in rows
+            ],
+            [
+                ("1", datetime(2019, 12, 1, 23, 59), datetime(2019, 12, 2, 0, 1), 1),
+                ("2", datetime(2019, 12, 2, 10), datetime(2019, 12, 2, 10, 1), 2),
+            ],
+        )
+
+    def insert_snapshot(self, session_id, timestamp, has_full_snapshot, _timestamp):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.session_recording_events import SESSION_RECORDING_EVENTS_DATA_TABLE
+
+        sync_execute(
+            f"""
+            INSERT INTO {SESSION_RECORDING_EVENTS_DATA_TABLE()} (uuid, timestamp, team_id, distinct_id, session_id, window_id, snapshot_data, created_at, _timestamp)
+            SELECT %(uuid)s, %(timestamp)s, %(team_id)s, 'user', %(session_id)s, '1', %(snapshot_data)s, %(timestamp)s, %(_timestamp)s
+            """,
+            {
+                "uuid": str(uuid4()),
+                "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "team_id": self.team.pk,
+                "session_id": session_id,
+                "snapshot_data": json.dumps({"has_full_snapshot": has_full_snapshot}),
+                "_timestamp": _timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
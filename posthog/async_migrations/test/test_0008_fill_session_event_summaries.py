@@ -0,0 +1,96 @@
+import json
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0008_fill_session_event_summaries"
+
+
+@pytest.mark.ee
+class Test0008FillSessionEventSummaries(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE session_event_summaries COMMENT COLUMN session_id 'dont_skip_0008'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.session_recording_events import COMMENT_SESSION_EVENT_SUMMARIES_COLUMN_SQL
+
+        sync_execute(COMMENT_SESSION_EVENT_SUMMARIES_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute(
+            "ALTER TABLE session_event_summaries COMMENT COLUMN session_id 'skip_0008_fill_session_event_summaries'"
+        )
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.models.event import create_event
+
+        now = datetime.utcnow().replace(microsecond=0)
+        old_ingestion = datetime(2020, 1, 1)
+        self.insert_event("$pageview", "1", timestamp=now - timedelta(days=1), _timestamp=old_ingestion)
+        self.insert_event("$pageview", "1", timestamp=now - timedelta(days=1, hours=1), _timestamp=old_ingestion)
+        self.insert_event("$autocapture", "2", timestamp=now - timedelta(days=2), _timestamp=old_ingestion)
+        # Without a session, or only relevant to long expired recordings
+        self.insert_event("$pageview", "", timestamp=now - timedelta(days=1), _timestamp=old_ingestion)
+        self.insert_event("$pageview", "3", timestamp=now - timedelta(weeks=30), _timestamp=old_ingestion)
+
+        # As if all of the above was ingested before the materialized view existed
+        sync_execute("TRUNCATE TABLE session_event_summaries")
+
+        # Summarized by the materialized view, so shouldn't be backfilled again
+        create_event(
+            event_uuid=uuid4(),
+            event="$pageview",
+            team=self.team,
+            distinct_id="user",
+            timestamp=now - timedelta(hours=1),
+            properties={"$session_id": "1"},
+        )
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        rows = sync_execute(
+            """
+            SELECT session_id, event, sum(event_count) FROM session_event_summaries
+            WHERE team_id = %(team_id)s
+            GROUP BY session_id, event
+            ORDER BY session_id, event
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(rows, [("1", "$pageview", 3), ("2", "$autocapture", 1)])
+
+    def insert_event(self, event, session_id, timestamp, _timestamp):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.events import EVENTS_DATA_TABLE
+
+        sync_execute(
+            f"""
+            INSERT INTO {EVENTS_DATA_TABLE()} (uuid, event, properties, timestamp, team_id, distinct_id, _timestamp)
+            SELECT %(uuid)s, %(event)s, %(properties)s, %(timestamp)s, %(team_id)s, 'user', %(_timestamp)s
+            """,
+            {
+                "uuid": str(uuid4()),
+                "event": event,
+                "properties": json.dumps({"$session_id": session_id} if session_id else {}),
+                "timestamp": timestamp.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                "team_id": self.team.pk,
+                "_timestamp": _timestamp.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+        )
@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0009_fill_group_property_values"
+
+
+@pytest.mark.ee
+class Test0009FillGroupPropertyValues(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE group_property_values COMMENT COLUMN property_value 'dont_skip_0009'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.groups import COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL
+
+        sync_execute(COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute(
+            "ALTER TABLE group_property_values COMMENT COLUMN property_value 'skip_0009_fill_group_property_values'"
+        )
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.models.group import create_group
+
+        create_group(self.team.pk, 0, "org:1", {"industry": "finance"}, timestamp=datetime(2020, 1, 1))
+        create_group(self.team.pk, 0, "org:1", {"industry": "tech"}, timestamp=datetime(2020, 1, 2))
+        create_group(self.team.pk, 0, "org:2", {"industry": "tech", "name": "b"}, timestamp=datetime(2020, 1, 1))
+        create_group(self.team.pk, 1, "company:1", {"industry": "finance"}, timestamp=datetime(2020, 1, 1))
+
+        # As if all of the above was upserted before the materialized view existed
+        sync_execute("TRUNCATE TABLE group_property_values")
+
+        # Counted by the materialized view, which also takes the earlier version out of the counts
+        create_group(self.team.pk, 0, "org:2", {"industry": "finance", "name": "b"})
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        rows = sync_execute(
+            """
+            SELECT group_type_index, property_key, property_value, sum(group_count) AS count
+            FROM group_property_values
+            WHERE team_id = %(team_id)s
+            GROUP BY group_type_index, property_key, property_value
+            HAVING count != 0
+            ORDER BY group_type_index, property_key, property_value
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(
+            rows,
+            [
+                (0, "industry", "finance", 1),
+                (0, "industry", "tech", 1),
+                (0, "name", "b", 1),
+                (1, "industry", "finance", 1),
+            ],
+        )
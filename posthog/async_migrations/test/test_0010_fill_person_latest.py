@@ -0,0 +1,63 @@
+from datetime import datetime
+from uuid import UUID
+
+import pytest
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0010_fill_person_latest"
+
+
+@pytest.mark.ee
+class Test0010FillPersonLatest(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE person_latest COMMENT COLUMN id 'dont_skip_0010'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.person import COMMENT_PERSONS_LATEST_COLUMN_SQL
+
+        sync_execute(COMMENT_PERSONS_LATEST_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute("ALTER TABLE person_latest COMMENT COLUMN id 'skip_0010_fill_person_latest'")
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.models.person import create_person
+
+        changed_person = create_person(team_id=self.team.pk, properties={"a": 1}, timestamp=datetime(2020, 1, 1))
+        other_person = create_person(team_id=self.team.pk, properties={"a": 2}, timestamp=datetime(2020, 1, 1))
+
+        # As if all of the above was written before the materialized view existed
+        sync_execute("TRUNCATE TABLE person_latest")
+
+        # Rolled up by the materialized view, and newer than what's backfilled
+        create_person(team_id=self.team.pk, uuid=changed_person, properties={"a": 3})
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        rows = sync_execute(
+            """
+            SELECT id, argMaxMerge(properties) FROM person_latest
+            WHERE team_id = %(team_id)s
+            GROUP BY id
+            ORDER BY id
+            """,
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(
+            sorted(rows), sorted([(UUID(changed_person), '{"a": 3}'), (UUID(other_person), '{"a": 2}')]),
+        )
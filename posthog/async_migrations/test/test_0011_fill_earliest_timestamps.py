@@ -0,0 +1,64 @@
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+import pytz
+
+from posthog.async_migrations.runner import start_async_migration
+from posthog.async_migrations.setup import get_async_migration_definition, setup_async_migrations
+from posthog.test.base import BaseTest
+
+MIGRATION_NAME = "0011_fill_earliest_timestamps"
+
+
+@pytest.mark.ee
+class Test0011FillEarliestTimestamps(BaseTest):
+    def setUp(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.migration = get_async_migration_definition(MIGRATION_NAME)
+        sync_execute("ALTER TABLE events_earliest_timestamps COMMENT COLUMN earliest_timestamp 'dont_skip_0011'")
+
+    def tearDown(self):
+        from ee.clickhouse.client import sync_execute
+        from ee.clickhouse.sql.events import COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL
+
+        sync_execute(COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL())
+
+    def test_is_required(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.assertTrue(self.migration.is_required())
+
+        sync_execute(
+            "ALTER TABLE events_earliest_timestamps COMMENT COLUMN earliest_timestamp 'skip_0011_fill_earliest_timestamps'"
+        )
+        self.assertFalse(self.migration.is_required())
+
+    def test_migration(self):
+        from ee.clickhouse.client import sync_execute
+
+        self.create_event(datetime(2020, 3, 1))
+        self.create_event(datetime(2020, 1, 4, 14, 10))
+        self.create_event(datetime(2014, 1, 1))
+
+        # As if all of the above was ingested before the materialized view existed
+        sync_execute("TRUNCATE TABLE events_earliest_timestamps")
+
+        # Rolled up by the materialized view, and read again by the migration
+        self.create_event(datetime(2021, 1, 1))
+
+        setup_async_migrations()
+        migration_successful = start_async_migration(MIGRATION_NAME)
+        self.assertTrue(migration_successful)
+
+        rows = sync_execute(
+            "SELECT min(earliest_timestamp) FROM events_earliest_timestamps WHERE team_id = %(team_id)s",
+            {"team_id": self.team.pk},
+        )
+        self.assertEqual(rows, [(datetime(2020, 1, 4, 14, 10, tzinfo=pytz.UTC),)])
+
+    def create_event(self, timestamp):
+        from ee.clickhouse.models.event import create_event
+
+        create_event(event_uuid=uuid4(), event="$pageview", team=self.team, distinct_id="1", timestamp=timestamp)
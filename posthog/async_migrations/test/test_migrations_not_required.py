@@ -1,5 +1,13 @@
 from ee.clickhouse.client import sync_execute
-from ee.clickhouse.sql.person import COMMENT_DISTINCT_ID_COLUMN_SQL
+from ee.clickhouse.sql.actor_activity import COMMENT_ACTOR_ACTIVITY_COLUMN_SQL
+from ee.clickhouse.sql.events import COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL
+from ee.clickhouse.sql.groups import COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL
+from ee.clickhouse.sql.person import COMMENT_DISTINCT_ID_COLUMN_SQL, COMMENT_PERSONS_LATEST_COLUMN_SQL
+from ee.clickhouse.sql.property_values import COMMENT_PROPERTY_VALUES_COLUMN_SQL
+from ee.clickhouse.sql.session_recording_events import (
+    COMMENT_SESSION_EVENT_SUMMARIES_COLUMN_SQL,
+    COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL,
+)
 from posthog.async_migrations.setup import ALL_ASYNC_MIGRATIONS
 from posthog.test.base import BaseTest
 
@@ -12,6 +20,13 @@ from posthog.test.base import BaseTest
 class TestAsyncMigrationsNotRequired(BaseTest):
     def setUp(self):
         sync_execute(COMMENT_DISTINCT_ID_COLUMN_SQL())
+        sync_execute(COMMENT_PROPERTY_VALUES_COLUMN_SQL())
+        sync_execute(COMMENT_ACTOR_ACTIVITY_COLUMN_SQL())
+        sync_execute(COMMENT_SESSION_RECORDING_SUMMARIES_COLUMN_SQL())
+        sync_execute(COMMENT_SESSION_EVENT_SUMMARIES_COLUMN_SQL())
+        sync_execute(COMMENT_GROUP_PROPERTY_VALUES_COLUMN_SQL())
+        sync_execute(COMMENT_PERSONS_LATEST_COLUMN_SQL())
+        sync_execute(COMMENT_EARLIEST_TIMESTAMPS_COLUMN_SQL())
 
     def test_async_migrations_not_required_on_fresh_instances(self):
         for name, migration in ALL_ASYNC_MIGRATIONS.items():
@@ -14,40 +14,75 @@ from posthog.test.base import TestMixin
 def create_clickhouse_tables(num_tables: int):
     # Reset clickhouse tables to default before running test
     # Mostly so that test runs locally work correctly
+    from ee.clickhouse.sql.actor_activity import ACTOR_ACTIVITY_MV_SQL, ACTOR_ACTIVITY_TABLE_SQL
     from ee.clickhouse.sql.cohort import CREATE_COHORTPEOPLE_TABLE_SQL
     from ee.clickhouse.sql.dead_letter_queue import DEAD_LETTER_QUEUE_TABLE_SQL
     from ee.clickhouse.sql.events import DISTRIBUTED_EVENTS_TABLE_SQL, EVENTS_TABLE_SQL
-    from ee.clickhouse.sql.groups import GROUPS_TABLE_SQL
+    from ee.clickhouse.sql.groups import GROUP_PROPERTY_VALUES_MV_SQL, GROUP_PROPERTY_VALUES_TABLE_SQL, GROUPS_TABLE_SQL
+    from ee.clickhouse.sql.paths.path import DISTRIBUTED_PERSON_PATHS_TABLE_SQL, PERSON_PATHS_TABLE_SQL
     from ee.clickhouse.sql.person import (
         PERSON_DISTINCT_ID2_TABLE_SQL,
         PERSON_STATIC_COHORT_TABLE_SQL,
         PERSONS_DISTINCT_ID_TABLE_SQL,
+        PERSONS_LATEST_MV_SQL,
+        PERSONS_LATEST_TABLE_SQL,
         PERSONS_TABLE_SQL,
     )
     from ee.clickhouse.sql.plugin_log_entries import PLUGIN_LOG_ENTRIES_TABLE_SQL
+    from ee.clickhouse.sql.property_values import (
+        EVENT_PROPERTY_VALUES_MV_SQL,
+        PERSON_PROPERTY_VALUES_MV_SQL,
+        PERSON_PROPERTY_VALUES_TABLE_SQL,
+        PROPERTY_VALUES_TABLE_SQL,
+    )
     from ee.clickhouse.sql.session_recording_events import (
         DISTRIBUTED_SESSION_RECORDING_EVENTS_TABLE_SQL,
+        SESSION_EVENT_SUMMARIES_MV_SQL,
+        SESSION_EVENT_SUMMARIES_TABLE_SQL,
         SESSION_RECORDING_EVENTS_TABLE_SQL,
+        SESSION_RECORDING_SUMMARIES_MV_SQL,
+        SESSION_RECORDING_SUMMARIES_TABLE_SQL,
     )
 
     # REMEMBER TO ADD ANY NEW CLICKHOUSE TABLES TO THIS ARRAY!
     TABLES_TO_CREATE_DROP = [
         EVENTS_TABLE_SQL(),
         PERSONS_TABLE_SQL(),
+        PERSONS_LATEST_TABLE_SQL(),
+        PERSONS_LATEST_MV_SQL(),
         PERSONS_DISTINCT_ID_TABLE_SQL(),
         PERSON_DISTINCT_ID2_TABLE_SQL(),
         PERSON_STATIC_COHORT_TABLE_SQL(),
         SESSION_RECORDING_EVENTS_TABLE_SQL(),
+        SESSION_RECORDING_SUMMARIES_TABLE_SQL(),
+        SESSION_RECORDING_SUMMARIES_MV_SQL(),
+        SESSION_EVENT_SUMMARIES_TABLE_SQL(),
+        SESSION_EVENT_SUMMARIES_MV_SQL(),
         PLUGIN_LOG_ENTRIES_TABLE_SQL(),
         CREATE_COHORTPEOPLE_TABLE_SQL(),
         KAFKA_DEAD_LETTER_QUEUE_TABLE_SQL(),
         DEAD_LETTER_QUEUE_TABLE_SQL(),
         DEAD_LETTER_QUEUE_TABLE_MV_SQL,
         GROUPS_TABLE_SQL(),
+        GROUP_PROPERTY_VALUES_TABLE_SQL(),
+        GROUP_PROPERTY_VALUES_MV_SQL(),
+        PROPERTY_VALUES_TABLE_SQL(),
+        EVENT_PROPERTY_VALUES_MV_SQL(),
+        PERSON_PROPERTY_VALUES_TABLE_SQL(),
+        PERSON_PROPERTY_VALUES_MV_SQL(),
+        PERSON_PATHS_TABLE_SQL(),
+        ACTOR_ACTIVITY_TABLE_SQL(),
+        ACTOR_ACTIVITY_MV_SQL(),
     ]
 
     if settings.CLICKHOUSE_REPLICATION:
-        TABLES_TO_CREATE_DROP.extend([DISTRIBUTED_EVENTS_TABLE_SQL(), DISTRIBUTED_SESSION_RECORDING_EVENTS_TABLE_SQL()])
+        TABLES_TO_CREATE_DROP.extend(
+            [
+                DISTRIBUTED_EVENTS_TABLE_SQL(),
+                DISTRIBUTED_SESSION_RECORDING_EVENTS_TABLE_SQL(),
+                DISTRIBUTED_PERSON_PATHS_TABLE_SQL(),
+            ]
+        )
 
     if num_tables == len(TABLES_TO_CREATE_DROP):
         return
@@ -59,32 +94,51 @@ def create_clickhouse_tables(num_tables: int):
 def reset_clickhouse_tables():
     # Reset clickhouse tables to default before running test
     # Mostly so that test runs locally work correctly
+    from ee.clickhouse.sql.actor_activity import TRUNCATE_ACTOR_ACTIVITY_TABLE_SQL
     from ee.clickhouse.sql.cohort import TRUNCATE_COHORTPEOPLE_TABLE_SQL
     from ee.clickhouse.sql.dead_letter_queue import TRUNCATE_DEAD_LETTER_QUEUE_TABLE_SQL
     from ee.clickhouse.sql.events import TRUNCATE_EVENTS_TABLE_SQL
-    from ee.clickhouse.sql.groups import TRUNCATE_GROUPS_TABLE_SQL
+    from ee.clickhouse.sql.groups import TRUNCATE_GROUP_PROPERTY_VALUES_TABLE_SQL, TRUNCATE_GROUPS_TABLE_SQL
+    from ee.clickhouse.sql.paths.path import TRUNCATE_PERSON_PATHS_TABLE_SQL
     from ee.clickhouse.sql.person import (
         TRUNCATE_PERSON_DISTINCT_ID2_TABLE_SQL,
         TRUNCATE_PERSON_DISTINCT_ID_TABLE_SQL,
         TRUNCATE_PERSON_STATIC_COHORT_TABLE_SQL,
         TRUNCATE_PERSON_TABLE_SQL,
+        TRUNCATE_PERSONS_LATEST_TABLE_SQL,
     )
     from ee.clickhouse.sql.plugin_log_entries import TRUNCATE_PLUGIN_LOG_ENTRIES_TABLE_SQL
-    from ee.clickhouse.sql.session_recording_events import TRUNCATE_SESSION_RECORDING_EVENTS_TABLE_SQL
+    from ee.clickhouse.sql.property_values import (
+        TRUNCATE_PERSON_PROPERTY_VALUES_TABLE_SQL,
+        TRUNCATE_PROPERTY_VALUES_TABLE_SQL,
+    )
+    from ee.clickhouse.sql.session_recording_events import (
+        TRUNCATE_SESSION_EVENT_SUMMARIES_TABLE_SQL,
+        TRUNCATE_SESSION_RECORDING_EVENTS_TABLE_SQL,
+        TRUNCATE_SESSION_RECORDING_SUMMARIES_TABLE_SQL,
+    )
 
     # REMEMBER TO ADD ANY NEW CLICKHOUSE TABLES TO THIS ARRAY!
     TABLES_TO_CREATE_DROP = [
         TRUNCATE_EVENTS_TABLE_SQL(),
+        TRUNCATE_ACTOR_ACTIVITY_TABLE_SQL(),
         TRUNCATE_PERSON_TABLE_SQL,
+        TRUNCATE_PERSONS_LATEST_TABLE_SQL,
         TRUNCATE_PERSON_DISTINCT_ID_TABLE_SQL,
         TRUNCATE_PERSON_DISTINCT_ID2_TABLE_SQL,
         TRUNCATE_PERSON_STATIC_COHORT_TABLE_SQL,
         TRUNCATE_SESSION_RECORDING_EVENTS_TABLE_SQL(),
+        TRUNCATE_SESSION_RECORDING_SUMMARIES_TABLE_SQL(),
+        TRUNCATE_SESSION_EVENT_SUMMARIES_TABLE_SQL(),
         TRUNCATE_PLUGIN_LOG_ENTRIES_TABLE_SQL,
         TRUNCATE_COHORTPEOPLE_TABLE_SQL,
         TRUNCATE_DEAD_LETTER_QUEUE_TABLE_SQL,
         TRUNCATE_DEAD_LETTER_QUEUE_TABLE_MV_SQL,
         TRUNCATE_GROUPS_TABLE_SQL,
+        TRUNCATE_GROUP_PROPERTY_VALUES_TABLE_SQL,
+        TRUNCATE_PROPERTY_VALUES_TABLE_SQL(),
+        TRUNCATE_PERSON_PROPERTY_VALUES_TABLE_SQL(),
+        TRUNCATE_PERSON_PATHS_TABLE_SQL(),
     ]
 
     for item in TABLES_TO_CREATE_DROP:
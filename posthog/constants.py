@@ -26,6 +26,8 @@ TREND_FILTER_TYPE_ACTIONS = "actions"
 TREND_FILTER_TYPE_EVENTS = "events"
 
 SESSION_RECORDINGS_FILTER_TYPE_DURATION = "session_recording_duration"
+SESSION_RECORDINGS_BEFORE_START_TIME = "before_start_time"
+SESSION_RECORDINGS_BEFORE_SESSION_ID = "before_session_id"
 
 TRENDS_CUMULATIVE = "ActionsLineGraphCumulative"
 TRENDS_LINEAR = "ActionsLineGraph"
@@ -160,6 +162,7 @@ PATH_DROPOFF_KEY = "path_dropoff_key"
 PATH_EDGE_LIMIT = "edge_limit"
 PATH_MIN_EDGE_WEIGHT = "min_edge_weight"
 PATH_MAX_EDGE_WEIGHT = "max_edge_weight"
+PATH_SAMPLE_RATE = "path_sample_rate"
 AGGREGATION_GROUP_TYPE_INDEX = "aggregation_group_type_index"
 
 BREAKDOWN_TYPES = Literal["event", "person", "cohort", "group"]
@@ -34,6 +34,12 @@ class EstimatedQueryExecutionTimeTooLong(APIException):
     default_detail = "Estimated query execution time is too long"
 
 
+class QueryDeadlineExceeded(APIException):
+    status_code = status.HTTP_504_GATEWAY_TIMEOUT
+    default_detail = "Query took too long to run and was cancelled"
+    default_code = "query_deadline_exceeded"
+
+
 class ExceptionContext(TypedDict):
     request: HttpRequest
 
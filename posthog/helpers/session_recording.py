@@ -4,13 +4,17 @@ import gzip
 import json
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import DefaultDict, Dict, Generator, List, Optional
+from typing import DefaultDict, Dict, Generator, List, Optional, Tuple
 
 from sentry_sdk.api import capture_exception, capture_message
 
 from posthog.models import utils
 
 FULL_SNAPSHOT = 2
+INCREMENTAL_SNAPSHOT = 3
+MOUSE_INTERACTION_SOURCE = 2
+INPUT_SOURCE = 5
+MOUSE_INTERACTION_CLICK = 2
 
 Event = Dict
 SnapshotData = Dict
@@ -64,6 +68,7 @@ def compress_and_chunk_snapshots(events: List[Event], chunk_size=512 * 1024) ->
     data_list = [event["properties"]["$snapshot_data"] for event in events]
     session_id = events[0]["properties"]["$session_id"]
     has_full_snapshot = any(snapshot_data["type"] == FULL_SNAPSHOT for snapshot_data in data_list)
+    click_count, keypress_count = count_interactions(data_list)
     window_id = events[0]["properties"].get("$window_id")
 
     compressed_data = compress_to_string(json.dumps(data_list))
@@ -84,11 +89,28 @@ def compress_and_chunk_snapshots(events: List[Event], chunk_size=512 * 1024) ->
                     "data": chunk,
                     "compression": "gzip-base64",
                     "has_full_snapshot": has_full_snapshot,
+                    # Summarised here as clickhouse can't look inside the compressed data
+                    "click_count": click_count,
+                    "keypress_count": keypress_count,
                 },
             },
         }
 
 
+def count_interactions(data_list: List[SnapshotData]) -> Tuple[int, int]:
+    "Counts clicks and inputs (i.e. keypresses) in a list of rrweb events"
+    click_count, keypress_count = 0, 0
+    for snapshot_data in data_list:
+        if snapshot_data.get("type") != INCREMENTAL_SNAPSHOT:
+            continue
+        data = snapshot_data.get("data", {})
+        if data.get("source") == MOUSE_INTERACTION_SOURCE and data.get("type") == MOUSE_INTERACTION_CLICK:
+            click_count += 1
+        elif data.get("source") == INPUT_SOURCE:
+            keypress_count += 1
+    return click_count, keypress_count
+
+
 def chunk_string(string: str, chunk_length: int) -> List[str]:
     """Split a string into chunk_length-sized elements. Reversal operation: `''.join()`."""
     return [string[0 + offset : chunk_length + offset] for offset in range(0, len(string), chunk_length)]
@@ -0,0 +1,99 @@
+import csv
+import json
+import zlib
+from itertools import islice
+from typing import Any, Dict, Generator, Iterable, Iterator, List, TypeVar
+
+from django.http import StreamingHttpResponse
+from django.utils.cache import add_never_cache_headers
+from rest_framework.exceptions import ValidationError
+
+T = TypeVar("T")
+
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_NDJSON = "ndjson"
+EXPORT_FORMATS = {
+    EXPORT_FORMAT_CSV: "text/csv",
+    EXPORT_FORMAT_NDJSON: "application/x-ndjson",
+}
+GZIP_CONTENT_TYPE = "application/gzip"
+
+# Flush compressed output in chunks of roughly this size rather than per row
+OUTPUT_CHUNK_SIZE = 64 * 1024
+
+
+class _Echo:
+    """File-like object that hands back whatever is written to it, so `csv.writer` can format one row at a time."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def chunked(iterable: Iterable[T], size: int) -> Generator[List[T], None, None]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _format_value(value: Any) -> Any:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def render_csv(rows: Iterable[Dict[str, Any]], columns: List[str]) -> Generator[str, None, None]:
+    """
+    Unlike `PaginatedCSVRenderer` we can't look at every row to work out the header before writing, so columns are
+    fixed upfront and nested values (e.g. properties) are written as JSON.
+    """
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow([_format_value(row.get(column)) for column in columns])
+
+
+def render_ndjson(rows: Iterable[Dict[str, Any]]) -> Generator[str, None, None]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def gzip_stream(lines: Iterable[str]) -> Generator[bytes, None, None]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    buffer: List[bytes] = []
+    buffered = 0
+    for line in lines:
+        encoded = line.encode("utf-8")
+        buffer.append(encoded)
+        buffered += len(encoded)
+        if buffered >= OUTPUT_CHUNK_SIZE:
+            compressed = compressor.compress(b"".join(buffer))
+            buffer, buffered = [], 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b"".join(buffer)) + compressor.flush()
+
+
+def streaming_export_response(
+    rows: Iterator[Dict[str, Any]], columns: List[str], filename: str, export_format: str, compress: bool = False
+) -> StreamingHttpResponse:
+    """
+    Streams `rows` back as CSV or newline delimited JSON, optionally gzipped, so exports run in constant memory
+    however many rows they contain.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError(f"export_format must be one of: {', '.join(EXPORT_FORMATS)}")
+
+    lines = render_csv(rows, columns) if export_format == EXPORT_FORMAT_CSV else render_ndjson(rows)
+    filename = f"{filename}.{export_format}"
+    if compress:
+        response = StreamingHttpResponse(gzip_stream(lines), content_type=GZIP_CONTENT_TYPE)
+        filename += ".gz"
+    else:
+        response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[export_format])
+
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    add_never_cache_headers(response)
+    return response
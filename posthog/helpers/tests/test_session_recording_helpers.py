@@ -87,6 +87,8 @@ def test_compression_and_chunking(raw_snapshot_events, mocker: MockerFixture):
                     "compression": "gzip-base64",
                     "data": "H4sIAAAAAAAC//v/L5qhmkGJoYShkqGAIRXIsmJQYDBi0AGSSgxpDPlACBFTYkhiSGQoAtK1YFlMXcZYdVUB5UuAOkH6YhkAxKw6nnAAAAA=",
                     "has_full_snapshot": True,
+                    "click_count": 0,
+                    "keypress_count": 0,
                 },
                 "distinct_id": "abc123",
             },
@@ -118,6 +120,32 @@ def test_has_full_snapshot_property(raw_snapshot_events):
     assert not compressed[0]["properties"]["$snapshot_data"]["has_full_snapshot"]
 
 
+def test_interaction_counts(raw_snapshot_events):
+    raw_snapshot_events[1]["properties"]["$snapshot_data"] = {"type": 3, "data": {"source": 2, "type": 2}}
+    raw_snapshot_events.append(
+        {
+            **raw_snapshot_events[1],
+            "properties": {
+                **raw_snapshot_events[1]["properties"],
+                "$snapshot_data": {"type": 3, "data": {"source": 5}},
+            },
+        }
+    )
+    raw_snapshot_events.append(
+        {
+            **raw_snapshot_events[1],
+            "properties": {
+                **raw_snapshot_events[1]["properties"],
+                "$snapshot_data": {"type": 3, "data": {"source": 2, "type": 0}},
+            },
+        }
+    )
+
+    compressed = list(compress_and_chunk_snapshots(raw_snapshot_events))
+    assert compressed[0]["properties"]["$snapshot_data"]["click_count"] == 1
+    assert compressed[0]["properties"]["$snapshot_data"]["keypress_count"] == 1
+
+
 def test_decompress_uncompressed_events_returns_unmodified_events(raw_snapshot_events):
     snapshot_data_tagged_with_window_id = []
     raw_snapshot_data = []
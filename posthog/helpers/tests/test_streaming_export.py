@@ -0,0 +1,31 @@
+import gzip
+
+from posthog.helpers.streaming_export import chunked, gzip_stream, render_csv, render_ndjson
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 2)) == []
+
+
+def test_render_csv_writes_fixed_columns_and_json_encodes_nested_values():
+    rows = [{"id": 1, "properties": {"a": "b"}, "ignored": True}, {"id": 2}]
+
+    assert "".join(render_csv(rows, ["id", "properties"])).splitlines() == [
+        "id,properties",
+        '1,"{""a"": ""b""}"',
+        "2,",
+    ]
+
+
+def test_render_ndjson():
+    assert list(render_ndjson([{"id": 1}, {"id": 2}])) == ['{"id": 1}\n', '{"id": 2}\n']
+
+
+def test_gzip_stream_round_trips_large_output():
+    lines = [f"row {index}\n" for index in range(50_000)]
+
+    chunks = list(gzip_stream(lines))
+
+    assert len(chunks) > 1
+    assert gzip.decompress(b"".join(chunks)).decode("utf-8") == "".join(lines)
@@ -45,6 +45,15 @@ class BaseFilter(BaseParamMixin):
 
     def with_data(self, overrides: Dict[str, Any]):
         "Allow making copy of filter whilst preserving the class"
+        # Filters are never mutated once built, so if nothing changes this filter (and all it has parsed) can be reused
+        if all(key in self._data and self._data[key] == value for key, value in overrides.items()):
+            return self
         return type(self)(data={**self._data, **overrides}, **self.kwargs)
 
+    def __eq__(self, other: Any) -> bool:
+        return type(self) == type(other) and self._data == other._data and self.kwargs == other.kwargs
+
+    def __hash__(self) -> int:
+        return hash((type(self), json.dumps(self._data, sort_keys=True, default=str)))
+
     __repr__ = sane_repr("_data", "kwargs", include_id=False)
@@ -14,6 +14,7 @@ from posthog.constants import (
     PATH_MAX_EDGE_WEIGHT,
     PATH_MIN_EDGE_WEIGHT,
     PATH_REPLACEMENTS,
+    PATH_SAMPLE_RATE,
     PATH_START_KEY,
     PATH_TYPE,
     PATHS_EXCLUDE_EVENTS,
@@ -272,3 +273,21 @@ class PathLimitsMixin(BaseParamMixin):
             result[PATH_MAX_EDGE_WEIGHT] = self.max_edge_weight
 
         return result
+
+
+class PathSampleRateMixin(BaseParamMixin):
+    @cached_property
+    def path_sample_rate(self) -> Optional[float]:
+        raw_value = self._data.get(PATH_SAMPLE_RATE, None)
+        if not raw_value:
+            return None
+        try:
+            sample_rate = float(raw_value)
+        except ValueError:
+            return None
+        # Sampling everything is the same as not sampling at all
+        return sample_rate if 0 < sample_rate < 1 else None
+
+    @include_dict
+    def path_sample_rate_to_dict(self):
+        return {PATH_SAMPLE_RATE: self.path_sample_rate} if self.path_sample_rate else {}
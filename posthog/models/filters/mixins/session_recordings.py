@@ -1,7 +1,16 @@
+import datetime
 import json
-from typing import Optional
+from typing import Optional, Tuple
 
-from posthog.constants import PERSON_UUID_FILTER, SESSION_RECORDINGS_FILTER_TYPE_DURATION
+import pytz
+from dateutil.parser import isoparse
+
+from posthog.constants import (
+    PERSON_UUID_FILTER,
+    SESSION_RECORDINGS_BEFORE_SESSION_ID,
+    SESSION_RECORDINGS_BEFORE_START_TIME,
+    SESSION_RECORDINGS_FILTER_TYPE_DURATION,
+)
 from posthog.models.filters.mixins.common import BaseParamMixin
 from posthog.models.filters.mixins.utils import cached_property
 from posthog.models.property import Property
@@ -21,3 +30,19 @@ class SessionRecordingsMixin(BaseParamMixin):
             filter_data = json.loads(duration_filter_data_str)
             return Property(**filter_data)
         return None
+
+    @cached_property
+    def recordings_cursor(self) -> Optional[Tuple[datetime.datetime, str]]:
+        """
+        (start_time, session_id) of the last recording on the previous page, in UTC.
+        Recordings are listed newest first, so the next page starts strictly before it.
+        """
+        before_start_time = self._data.get(SESSION_RECORDINGS_BEFORE_START_TIME, None)
+        before_session_id = self._data.get(SESSION_RECORDINGS_BEFORE_SESSION_ID, None)
+        if not before_start_time or not before_session_id:
+            return None
+
+        start_time = isoparse(before_start_time) if isinstance(before_start_time, str) else before_start_time
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=pytz.utc)
+        return start_time.astimezone(pytz.utc), str(before_session_id)
@@ -1,13 +1,26 @@
-from functools import lru_cache
+from functools import wraps
 from typing import Callable, Optional, TypeVar, Union
 
 from posthog.utils import str_to_bool
 
 T = TypeVar("T")
 
+CACHED_PROPERTIES_ATTR = "_cached_properties"
+
 # can't use cached_property directly from functools because of 3.7 compatibilty
+# Values are kept on the instance rather than in a `lru_cache(maxsize=1)` keyed on it: a single-slot cache is evicted
+# every time another instance is read (e.g. a filter and its compare filter), which re-parsed values over and over.
 def cached_property(func: Callable[..., T]) -> T:
-    return property(lru_cache(maxsize=1)(func))  # type: ignore
+    key = func.__qualname__
+
+    @wraps(func)
+    def getter(self):
+        cache = self.__dict__.setdefault(CACHED_PROPERTIES_ATTR, {})
+        if key not in cache:
+            cache[key] = func(self)
+        return cache[key]
+
+    return property(getter)  # type: ignore
 
 
 def include_dict(f):
@@ -26,6 +26,7 @@ from posthog.models.filters.mixins.paths import (
     PathLimitsMixin,
     PathPersonsMixin,
     PathReplacementMixin,
+    PathSampleRateMixin,
     PathStepLimitMixin,
     PropTypeDerivedMixin,
     StartPointMixin,
@@ -61,6 +62,7 @@ class PathFilter(
     LimitMixin,
     OffsetMixin,
     PathLimitsMixin,
+    PathSampleRateMixin,
     GroupsAggregationMixin,
     FunnelCorrelationMixin,  # Typing pain because ColumnOptimizer expects a uniform filter
     SimplifyFilterMixin,
@@ -39,6 +39,23 @@ class TestFilter(BaseTest):
             list(filter.to_dict().keys()), ["events", "display", "compare", "insight", "date_from", "interval"],
         )
 
+    def test_parsed_values_are_kept_per_filter(self):
+        filter = Filter(data={"events": [{"id": "$pageview"}]})
+        other_filter = Filter(data={"events": [{"id": "$autocapture"}]})
+
+        entities = filter.entities
+        self.assertEqual(other_filter.entities[0].id, "$autocapture")
+        self.assertIs(filter.entities, entities)
+
+    def test_with_data_and_equality(self):
+        filter = Filter(data={"events": [{"id": "$pageview"}], "interval": "day"})
+
+        self.assertIs(filter.with_data({"interval": "day"}), filter)
+        self.assertEqual(filter.with_data({"interval": "week"}).interval, "week")
+        self.assertEqual(filter, Filter(data={"interval": "day", "events": [{"id": "$pageview"}]}))
+        self.assertEqual(hash(filter), hash(Filter(data={"interval": "day", "events": [{"id": "$pageview"}]})))
+        self.assertNotEqual(filter, filter.with_data({"interval": "week"}))
+
     def test_simplify_test_accounts(self):
         self.team.test_account_filters = [
             {"key": "email", "value": "@posthog.com", "operator": "not_icontains", "type": "person"}
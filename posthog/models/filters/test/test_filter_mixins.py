@@ -1,4 +1,5 @@
 from posthog.models.filters.mixins.funnel import FunnelWindowDaysMixin
+from posthog.models.filters.path_filter import PathFilter
 from posthog.test.base import BaseTest
 
 
@@ -15,3 +16,13 @@ class TestFilterMixins(BaseTest):
     def test_funnel_window_days_to_milliseconds(self):
         one_day = FunnelWindowDaysMixin.milliseconds_from_days(1)
         self.assertEqual(one_day, 86_400_000)
+
+    def test_path_sample_rate(self):
+        self.assertEqual(PathFilter(data={"path_sample_rate": 0.1}).path_sample_rate, 0.1)
+        self.assertEqual(PathFilter(data={"path_sample_rate": "0.5"}).path_sample_rate, 0.5)
+        self.assertEqual(PathFilter(data={"path_sample_rate": 0.1}).to_dict()["path_sample_rate"], 0.1)
+
+        for sample_rate in [None, "", 0, -0.5, 1, "1", 2, "abc"]:
+            filter = PathFilter(data={"path_sample_rate": sample_rate})
+            self.assertIsNone(filter.path_sample_rate)
+            self.assertNotIn("path_sample_rate", filter.to_dict())
@@ -1,9 +1,10 @@
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional
 
 from django.db import models, transaction
 from django.utils import timezone
 
 from posthog.models.utils import UUIDT
+from posthog.utils import is_anonymous_id
 
 
 class PersonManager(models.Manager):
@@ -114,3 +115,12 @@ class PersonDistinctId(models.Model):
 
     # current version of the id, used to sync with ClickHouse and collapse rows correctly for new clickhouse table
     version: models.BigIntegerField = models.BigIntegerField(null=True, blank=True)
+
+
+def get_person_display_name(properties: Dict[str, Any], distinct_ids: List[str]) -> Optional[str]:
+    if properties.get("email"):
+        return properties["email"]
+    if len(distinct_ids) > 0:
+        # Prefer non-UUID distinct IDs (presumably from user identification) over UUIDs
+        return sorted(distinct_ids, key=is_anonymous_id)[0]
+    return None
@@ -449,6 +449,33 @@ def factory_session_recordings_list_test(
             self.assertEqual(session_recordings[0]["session_id"], "1")
             self.assertEqual(more_recordings_available, False)
 
+        @freeze_time("2021-01-21T20:00:00.000Z")
+        def test_pagination_with_cursor(self):
+            Person.objects.create(team=self.team, distinct_ids=["user"], properties={"email": "bla"})
+            self.create_snapshot("user", "1", self.base_time)
+            self.create_snapshot("user", "2", self.base_time + relativedelta(seconds=10))
+            # Recordings starting at the same time are ordered by session_id
+            self.create_snapshot("user", "3", self.base_time + relativedelta(seconds=10))
+
+            filter = SessionRecordingsFilter(team=self.team, data={"limit": 2})
+            session_recording_list_instance = session_recording_list(filter=filter, team=self.team)
+            (session_recordings, more_recordings_available) = session_recording_list_instance.run()
+            self.assertEqual([recording["session_id"] for recording in session_recordings], ["3", "2"])
+            self.assertEqual(more_recordings_available, True)
+
+            filter = SessionRecordingsFilter(
+                team=self.team,
+                data={
+                    "limit": 2,
+                    "before_start_time": session_recordings[-1]["start_time"].isoformat(),
+                    "before_session_id": session_recordings[-1]["session_id"],
+                },
+            )
+            session_recording_list_instance = session_recording_list(filter=filter, team=self.team)
+            (session_recordings, more_recordings_available) = session_recording_list_instance.run()
+            self.assertEqual([recording["session_id"] for recording in session_recordings], ["1"])
+            self.assertEqual(more_recordings_available, False)
+
         @freeze_time("2021-01-21T20:00:00.000Z")
         def test_recording_without_fullsnapshot_dont_appear(self):
             Person.objects.create(team=self.team, distinct_ids=["user"], properties={"email": "bla"})
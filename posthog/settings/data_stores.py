@@ -89,6 +89,12 @@ CLICKHOUSE_ASYNC = get_from_env("CLICKHOUSE_ASYNC", False, type_cast=str_to_bool
 
 CLICKHOUSE_CONN_POOL_MIN = get_from_env("CLICKHOUSE_CONN_POOL_MIN", 20, type_cast=int)
 CLICKHOUSE_CONN_POOL_MAX = get_from_env("CLICKHOUSE_CONN_POOL_MAX", 1000, type_cast=int)
+# Queries fanned out by a single request (e.g. one per trends series) run on a shared thread pool. It is capped at half
+# the connection pool so requests running their own queries can always get a connection.
+CLICKHOUSE_QUERY_EXECUTOR_WORKERS = min(
+    get_from_env("CLICKHOUSE_QUERY_EXECUTOR_WORKERS", 16, type_cast=int), max(1, CLICKHOUSE_CONN_POOL_MAX // 2)
+)
+CLICKHOUSE_QUERY_DEADLINE_SECONDS = get_from_env("CLICKHOUSE_QUERY_DEADLINE_SECONDS", 300, type_cast=int)
 
 CLICKHOUSE_STABLE_HOST = get_from_env("CLICKHOUSE_STABLE_HOST", CLICKHOUSE_HOST)
 
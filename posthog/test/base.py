@@ -252,6 +252,13 @@ class QueryMatchingTest:
             query,
         )
 
+        # Replace person uuid lookups for clickhouse
+        query = re.sub(
+            r"""(IN |in |arrayJoin\()\['[0-9a-f-]{36}'(, '[0-9a-f-]{36}')*\]""",
+            r"""\1['00000000-0000-0000-0000-000000000000', '00000000-0000-0000-0000-000000000001' /* ... */]""",
+            query,
+        )
+
         assert sqlparse.format(query, reindent=True) == self.snapshot, "\n".join(self.snapshot.get_assert_diff())
         if params is not None:
             del params["team_id"]  # Changes every run
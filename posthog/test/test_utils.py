@@ -12,6 +12,7 @@ from posthog.models import EventDefinition
 from posthog.settings.utils import get_from_env
 from posthog.test.base import BaseTest
 from posthog.utils import (
+    PeopleUrlBuilder,
     format_query_params_absolute_url,
     get_available_timezones_with_offsets,
     get_default_event_name,
@@ -70,6 +71,20 @@ class TestGeneralUtils(TestCase):
         for start_url, params, expected in test_to_expected:
             self.assertEqual(expected, format_query_params_absolute_url(Request(build_req, start_url), *params))
 
+    def test_people_url_builder_patches_base_params(self):
+        people_urls = PeopleUrlBuilder(
+            "api/person/retention/", {"insight": "RETENTION", "selected_interval": 3, "breakdown_values": ["x"]}
+        )
+
+        self.assertEqual(
+            people_urls.params({"breakdown_values": (1,), "selected_interval": None}),
+            {"insight": "RETENTION", "breakdown_values": "[1]"},
+        )
+        self.assertEqual(
+            people_urls.url({"selected_interval": 5}),
+            "api/person/retention/?insight=RETENTION&selected_interval=5&breakdown_values=%5B%22x%22%5D",
+        )
+
     @patch("os.getenv")
     def test_fetching_env_var_parsed_as_int(self, mock_env):
         mock_env.return_value = ""
@@ -26,7 +26,7 @@ from typing import (
     Union,
     cast,
 )
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlencode, urljoin, urlparse
 
 import lzstring
 import pytz
@@ -904,6 +904,29 @@ def encode_get_request_params(data: Dict[str, Any]) -> Dict[str, str]:
     }
 
 
+class PeopleUrlBuilder:
+    """
+    Builds people URLs for many result rows (retention cohorts, trend data points) off one base set of params.
+
+    The base params are encoded once, so only the few keys varying per row are encoded on each call. Overriding a key
+    with `None` drops it from the URL, the same as a falsy value being left out of `Filter.to_dict`.
+    """
+
+    def __init__(self, path: str, base_params: Dict[str, Any]) -> None:
+        self._path = path
+        self._base_params = encode_get_request_params(base_params)
+
+    def params(self, overrides: Dict[str, Any]) -> Dict[str, str]:
+        params = {**self._base_params, **encode_get_request_params(overrides)}
+        for key, value in overrides.items():
+            if value is None:
+                params.pop(key, None)
+        return params
+
+    def url(self, overrides: Dict[str, Any]) -> str:
+        return f"{self._path}?{urlencode(self.params(overrides))}"
+
+
 class DataclassJSONEncoder(json.JSONEncoder):
     def default(self, o):
         if dataclasses.is_dataclass(o):